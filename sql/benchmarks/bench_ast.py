@@ -0,0 +1,111 @@
+"""
+Benchmark the size of parsed and rewritten ASTs, and the time to build them.
+
+Reports, over the test query corpus and over a generated wide query, the
+number of node objects in each tree, the bytes each tree holds once
+parsing is done, and the time to parse.  The wide query is also rewritten
+for PUMS, and the size of the rewritten tree and the time to rewrite it
+are reported.
+
+    python benchmarks/bench_ast.py --columns 300 --repeat 5
+
+Run from the sql folder with smartnoise-sql installed.
+"""
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+from os.path import dirname, join
+
+import pandas as pd
+
+from snsql import Privacy, from_df
+from snsql._ast.tokens import Sql
+from snsql.metadata import Metadata
+from snsql.sql.parse import QueryParser
+
+from bench_parse import load_queries
+
+meta_path = join(dirname(__file__), "..", "..", "datasets", "PUMS.yaml")
+
+aggregates = ["SUM(age)", "AVG(age)", "VAR(age)", "STD(age)", "COUNT(age)", "COUNT(*)", "AVG(income)"]
+
+def wide_query(columns):
+    select = ", ".join([f"{aggregates[i % len(aggregates)]} * {i + 1} AS c{i}" for i in range(columns)])
+    return f"SELECT educ, sex, {select} FROM PUMS.PUMS GROUP BY educ, sex"
+
+def count_nodes(tree):
+    # every distinct object in the tree, including tokens
+    seen = set()
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        if node is None or id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, Sql):
+            stack.extend(node.children())
+    return len(seen)
+
+def retained(build):
+    """Returns what build returns, and the bytes it still holds after collection."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+def timed(build, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        build()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def parseable(queries):
+    parser = QueryParser()
+    trees = []
+    for query in queries:
+        try:
+            trees.append((query, parser.query(query)))
+        except Exception:
+            pass  # corpus queries that are meant to fail
+    return trees
+
+def main(columns, repeat):
+    parser = QueryParser()
+    corpus = parseable(load_queries())
+    nodes = [count_nodes(tree) for _, tree in corpus]
+    sizes = [retained(lambda: parser.query(query))[1] for query, _ in corpus]
+    times = [timed(lambda: parser.query(query), repeat) for query, _ in corpus]
+    print(f"{'trees':<28}{'count':>8}{'nodes':>10}{'bytes':>12}{'ms':>10}")
+    print(
+        f"{'corpus (mean per tree)':<28}{len(corpus):>8}{statistics.mean(nodes):>10.1f}"
+        f"{statistics.mean(sizes):>12.0f}{statistics.mean(times):>10.3f}"
+    )
+
+    query = wide_query(columns)
+    tree, size = retained(lambda: parser.query(query))
+    ms = timed(lambda: parser.query(query), repeat)
+    print(f"{f'wide, {columns} columns':<28}{1:>8}{count_nodes(tree):>10}{size:>12}{ms:>10.3f}")
+
+    meta = Metadata.from_file(meta_path)
+    df = pd.DataFrame(columns=[c.name for c in meta["PUMS.PUMS"].columns()])
+    reader = from_df(df, metadata=meta, privacy=Privacy(epsilon=1.0, delta=0.01))
+    reader.query_cache.max_size = 0
+    reader._rewrite(query)  # fill the noise scale cache
+    (subquery, rewritten), size = retained(lambda: reader._rewrite(query))
+    ms = timed(lambda: reader._rewrite(query), repeat)
+    print(f"{'wide, rewritten':<28}{1:>8}{count_nodes(rewritten):>10}{size:>12}{ms:>10.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--columns", type=int, default=300, help="number of output columns in the wide query")
+    parser.add_argument("--repeat", type=int, default=3, help="number of times to time each query")
+    args = parser.parse_args()
+    main(args.columns, args.repeat)
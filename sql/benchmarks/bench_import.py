@@ -0,0 +1,85 @@
+"""
+Benchmark the startup cost of importing snsql.
+
+Each entry point is run in a fresh interpreter with ``python -X importtime``,
+and the time it took is reported, along with the cumulative import times of
+the slowest third-party packages it pulled in.  Times are the median over
+``--repeat`` runs.
+
+Heavy dependencies are loaded on first use: pandas with the pandas reader or
+``execute_df``, the SQL and XPath parsers (and the ANTLR runtime) with the
+first query, OpenDP with the first scale search or noise release, and each
+engine reader with its first connection.  ``--check`` fails if an entry point
+loads a module it shouldn't, or if ``--budget-ms`` is given and the median
+time of ``import snsql`` exceeds it.
+
+    python benchmarks/bench_import.py --repeat 5 --check
+
+Run from the sql folder with smartnoise-sql installed.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+# entry point, and the modules it must not load
+entry_points = [
+    ("import snsql", ["numpy", "pandas", "antlr4", "opendp", "yaml", "snsql.sql.private_reader"]),
+    ("from snsql import Privacy", ["pandas", "antlr4", "opendp", "yaml"]),
+    ("from snsql import from_connection", ["pandas", "antlr4", "opendp", "asyncio", "snsql.sql.reader.spark"]),
+    ("from snsql.sql.reader import PostgresReader", ["pandas", "antlr4", "opendp", "snsql.sql.reader.spark"]),
+]
+
+packages = ["numpy", "pandas", "antlr4", "opendp", "yaml", "asyncio"]
+
+def _import_times(stmt):
+    """
+    Returns the time in ms to run stmt, the cumulative import time in ms
+    of each module, and the names of the modules loaded.
+    """
+    code = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"{stmt}\n"
+        "print((time.perf_counter() - start) * 1000)\n"
+        "print('\\n'.join(sys.modules))"
+    )
+    res = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+    times = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header
+        name = name.strip()
+        times[name] = max(times.get(name, 0.0), int(cumulative) / 1000)
+    out = res.stdout.split()
+    return float(out[0]), times, set(out[1:])
+
+def main(repeat, check, budget_ms):
+    failures = []
+    print(f"{'entry point':<46}{'ms':>10}  {'slowest packages'}")
+    for stmt, forbidden in entry_points:
+        runs = [_import_times(stmt) for _ in range(repeat)]
+        total = statistics.median([ms for ms, _, _ in runs])
+        pkg_ms = dict((p, statistics.median([times.get(p, 0.0) for _, times, _ in runs])) for p in packages)
+        slowest = ", ".join([f"{p} {ms:.0f}" for p, ms in sorted(pkg_ms.items(), key=lambda kv: -kv[1]) if ms > 0][:3])
+        print(f"{stmt:<46}{total:>10.1f}  {slowest}")
+        loaded = runs[0][2]
+        for mod in forbidden:
+            if mod in loaded:
+                failures.append(f"{stmt!r} loaded {mod}")
+        if budget_ms is not None and stmt == "import snsql" and total > budget_ms:
+            failures.append(f"{stmt!r} took {total:.1f} ms, over the budget of {budget_ms} ms")
+    if check and failures:
+        print("\n".join(["FAIL: " + f for f in failures]))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="number of fresh interpreters per entry point")
+    parser.add_argument("--check", action="store_true", help="exit with an error if an entry point regresses")
+    parser.add_argument("--budget-ms", type=float, default=None, help="maximum median time for import snsql")
+    args = parser.parse_args()
+    main(args.repeat, args.check, args.budget_ms)
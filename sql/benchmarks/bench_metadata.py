@@ -0,0 +1,90 @@
+"""
+Benchmark loading and fingerprinting a large metadata catalog.
+
+Generates a catalog with many tables, writes it as YAML and as a JSON
+snapshot, and reports the time to load it with the pure Python YAML
+loader, with the default loader (libyaml when installed), from the file
+cache, and from the snapshot, along with the time to fingerprint it
+after editing one table, and to read the cached fingerprint.
+Lazy loads look up one table, and the file catalog reads that table from
+a folder with one file per table.
+
+    python benchmarks/bench_metadata.py --tables 2000 --repeat 3
+
+Run from the sql folder with smartnoise-sql installed.
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import yaml
+
+from snsql import metadata
+from snsql.metadata import Metadata, FileCatalog
+
+def catalog(tables):
+    columns = {
+        "pid": {"type": "int", "private_id": True},
+        "age": {"type": "int", "lower": 0, "upper": 100},
+        "sex": {"type": "string", "cardinality": 2},
+        "income": {"type": "float", "lower": 0.0, "upper": 500000.0},
+        "married": {"type": "boolean"},
+    }
+    schema = {f"T{i}": dict(rows=1000, max_ids=1, **columns) for i in range(tables)}
+    return {"Catalog": {"dbo": schema}, "engine": "pandas"}
+
+def timed(load, repeat):
+    times = []
+    for _ in range(repeat):
+        metadata.clear_file_cache()
+        start = time.perf_counter()
+        load()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+def main(tables, repeat):
+    folder = tempfile.mkdtemp()
+    yaml_path = os.path.join(folder, "catalog.yaml")
+    json_path = os.path.join(folder, "catalog.json")
+    with open(yaml_path, "w") as f:
+        yaml.dump(catalog(tables), f)
+    meta = Metadata.from_file(yaml_path)
+    meta.to_file(json_path, "Catalog")
+    FileCatalog.from_metadata(meta, os.path.join(folder, "tables"))
+
+    def pure_python():
+        with open(yaml_path) as f:
+            return metadata.CollectionYamlLoader(None)._create_metadata_object(yaml.load(f, Loader=yaml.SafeLoader))
+    def cached():
+        Metadata.from_file(yaml_path)
+        start = time.perf_counter()
+        Metadata.from_file(yaml_path)
+        return time.perf_counter() - start
+    def lazy(file):
+        return Metadata.from_file(file, lazy=True)["dbo.T0"]
+    def file_catalog():
+        catalog = FileCatalog(os.path.join(folder, "tables"))
+        return Metadata([], "pandas", dbname="Catalog", catalog=catalog)["dbo.T0"]
+
+    print(f"{'load':<28}{'ms':>10}")
+    print(f"{'yaml, SafeLoader':<28}{timed(pure_python, repeat):>10.1f}")
+    print(f"{'yaml, default loader':<28}{timed(lambda: Metadata.from_file(yaml_path), repeat):>10.1f}")
+    print(f"{'yaml, cached':<28}{statistics.median([cached() * 1000 for _ in range(repeat)]):>10.1f}")
+    print(f"{'json snapshot':<28}{timed(lambda: Metadata.from_file(json_path), repeat):>10.1f}")
+    print(f"{'yaml, lazy':<28}{timed(lambda: lazy(yaml_path), repeat):>10.1f}")
+    print(f"{'json snapshot, lazy':<28}{timed(lambda: lazy(json_path), repeat):>10.1f}")
+    print(f"{'file catalog, lazy':<28}{timed(file_catalog, repeat):>10.1f}")
+    def edited():
+        meta["dbo.T0"].max_ids += 1
+        return meta.fingerprint
+    print(f"{'fingerprint, one edit':<28}{timed(edited, repeat):>10.2f}")
+    print(f"{'fingerprint, cached':<28}{timed(lambda: meta.fingerprint, repeat):>10.2f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tables", type=int, default=2000, help="number of tables in the generated catalog")
+    parser.add_argument("--repeat", type=int, default=3, help="number of times to time each load")
+    args = parser.parse_args()
+    main(args.tables, args.repeat)
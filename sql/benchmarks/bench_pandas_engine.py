@@ -0,0 +1,80 @@
+"""
+Benchmark for exact aggregate queries against a pandas DataFrame.
+
+Compares the native DataFrame engine with the SQLite fallback, which
+copies the DataFrame into an in-memory SQLite database on the first query
+and reuses it afterwards.  The first SQLite query includes the load.  Queries
+are the rewritten subqueries PrivateReader sends to the reader, over a
+synthetic PUMS-shaped table with a private_id column.
+
+    python benchmarks/bench_pandas_engine.py --rows 1000000
+
+Run from the sql folder with smartnoise-sql installed.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from snsql import Privacy
+from snsql.sql.private_reader import PrivateReader
+from snsql.sql.reader.pandas import PandasReader
+
+def make_metadata(rows):
+    return {
+        "": {
+            "PUMS": {
+                "PUMS": {
+                    "rows": rows,
+                    "pid": {"type": "int", "private_id": True},
+                    "age": {"type": "int", "lower": 0, "upper": 100},
+                    "sex": {"type": "string"},
+                    "educ": {"type": "string"},
+                    "income": {"type": "int", "lower": 0, "upper": 500000},
+                }
+            }
+        }
+    }
+
+queries = [
+    "SELECT COUNT(*) AS n, AVG(income) AS income FROM PUMS.PUMS",
+    "SELECT sex, COUNT(*) AS n, SUM(age) AS age FROM PUMS.PUMS WHERE age > 30 GROUP BY sex",
+    "SELECT educ, sex, AVG(income) AS income FROM PUMS.PUMS GROUP BY educ, sex",
+]
+
+def make_df(rows):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "pid": rng.integers(0, rows // 2, rows),
+        "age": rng.integers(0, 100, rows),
+        "sex": rng.choice(["0", "1"], rows),
+        "educ": rng.choice([str(e) for e in range(16)], rows),
+        "income": rng.integers(0, 500000, rows),
+    })
+
+def _time(reader, subquery, native):
+    reader.native = native
+    start = time.perf_counter()
+    reader._execute_ast(subquery)
+    return time.perf_counter() - start
+
+def main(rows):
+    df = make_df(rows)
+    metadata = make_metadata(rows)
+    privacy = Privacy(epsilon=1.0, delta=1/rows)
+    private_reader = PrivateReader(PandasReader(df, metadata), metadata, privacy=privacy)
+    reader = private_reader.reader
+    print(f"{rows} rows")
+    print(f"{'query':<80}{'sqlite s':>12}{'native s':>12}")
+    for query in queries:
+        subquery, _ = private_reader._rewrite(query)
+        sql_time = _time(reader, subquery, False)
+        native_time = _time(reader, subquery, True)
+        print(f"{query:<80}{sql_time:>12.3f}{native_time:>12.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000, help="number of rows in the synthetic table")
+    args = parser.parse_args()
+    main(args.rows)
@@ -0,0 +1,93 @@
+"""
+Benchmark parse time per query over the test query corpus.
+
+Reports the mean and worst parse time for each prediction mode: the
+two-stage default (SLL, falling back to LL), full LL, and LL with exact
+ambiguity detection and diagnostics.  Cold times are measured with an
+empty prediction DFA, as in a freshly started process; warm times are
+measured after every query has been parsed once.
+
+    python benchmarks/bench_parse.py --repeat 5
+
+Run from the sql folder with smartnoise-sql installed.
+"""
+import argparse
+import time
+from os import listdir
+from os.path import dirname, isdir, isfile, join
+
+from antlr4 import InputStream  # type: ignore
+from antlr4.dfa.DFA import DFA  # type: ignore
+from antlr4.PredictionContext import PredictionContextCache  # type: ignore
+
+from snsql.sql.parse import QueryParser
+from snsql.sql.parser.SqlSmallParser import SqlSmallParser  # type: ignore
+
+testpath = join(dirname(__file__), "..", "tests", "query", "queries")
+
+def load_queries():
+    # same conventions as tests/query/test_ast.py; skip queries designed to fail parsing
+    files = []
+    for d in [join(testpath, d) for d in listdir(testpath) if isdir(join(testpath, d))]:
+        files.extend([join(d, f) for f in listdir(d) if isfile(join(d, f))])
+    files = [f for f in files if not (f.endswith("_fail.sql") and "parse" in f)]
+    queries = []
+    for path in sorted(files):
+        lines = open(path).readlines()
+        query_lines = " ".join([line for line in lines if line.strip() != "" and not line.strip().startswith("--")])
+        queries.extend([q.strip() for q in query_lines.split(";") if q.strip() != ""])
+    return queries
+
+class _LLParser(QueryParser):
+    # full LL prediction, skipping the SLL attempt
+    def parse_tree(self, stream, rule="batch"):
+        return getattr(self.start_parser(stream), rule)()
+
+def _fallbacks(queries):
+    parser = QueryParser()
+    count = 0
+    for query in queries:
+        try:
+            parser.start_parser(InputStream(query), sll=True).batch()
+        except Exception:
+            count += 1
+    return count
+
+def _reset_dfa():
+    # ANTLR shares the prediction DFA across parser instances; clear it to time cold parses
+    atn = SqlSmallParser.atn
+    SqlSmallParser.decisionsToDFA = [DFA(ds, i) for i, ds in enumerate(atn.decisionToState)]
+    SqlSmallParser.sharedContextCache = PredictionContextCache()
+
+def _time_queries(parser, queries, repeat):
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            parser.parse_tree(InputStream(query))
+        times.append((time.perf_counter() - start) * 1000 / repeat)
+    return times
+
+def main(repeat):
+    queries = load_queries()
+    modes = [
+        ("sll+fallback", QueryParser()),
+        ("ll", _LLParser()),
+        ("ll exact+diagnostics", QueryParser(diagnostics=True)),
+    ]
+    print(f"{len(queries)} queries, {_fallbacks(queries)} needed LL fallback")
+    print(f"{'mode':<24}{'cold mean ms':>14}{'cold max ms':>14}{'warm mean ms':>14}{'warm max ms':>14}")
+    for name, parser in modes:
+        _reset_dfa()
+        cold = _time_queries(parser, queries, 1)
+        warm = _time_queries(parser, queries, repeat)
+        print(
+            f"{name:<24}{sum(cold) / len(cold):>14.3f}{max(cold):>14.3f}"
+            f"{sum(warm) / len(warm):>14.3f}{max(warm):>14.3f}"
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="number of times to parse each query")
+    args = parser.parse_args()
+    main(args.repeat)
@@ -1,6 +1,27 @@
-from .connect import from_connection, from_df
-from .sql.privacy import Privacy, Stat
-from .sql._mechanisms.base import Mechanism
+import importlib
 
+# public names are imported on first use, so `import snsql` stays cheap
+_lazy = {
+    'from_connection': '.connect',
+    'from_df': '.connect',
+    'from_pool': '.connect',
+    'Privacy': '.sql.privacy',
+    'Stat': '.sql.privacy',
+    'Mechanism': '.sql._mechanisms.base',
+}
+_submodules = ['connect', 'metadata', 'reader', 'sql', 'xpath']
 
-__all__ = ['from_connection', 'from_df', 'Privacy']
\ No newline at end of file
+def __getattr__(name):
+    if name in _lazy:
+        value = getattr(importlib.import_module(_lazy[name], __name__), name)
+        globals()[name] = value
+        return value
+    if name in _submodules:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_lazy))
+
+
+__all__ = ['from_connection', 'from_df', 'from_pool', 'Privacy']
@@ -12,6 +12,7 @@ import warnings
 
 class Batch(Sql):
     """A batch of queries"""
+    __slots__ = ("queries",)
 
     def __init__(self, queries: List["Query"]) -> None:
         self.queries = queries
@@ -204,6 +205,7 @@ class Query(SqlRel):
 
 class Select(Sql):
     """Result Columns"""
+    __slots__ = ("quantifier", "namedExpressions")
 
     def __init__(self, quantifier, namedExpressions):
         self.quantifier = quantifier
@@ -221,6 +223,7 @@ class Select(Sql):
 
 class From(Sql):
     """From"""
+    __slots__ = ("relations",)
 
     def __init__(self, relations):
         self.relations = Seq(relations)
@@ -231,6 +234,7 @@ class From(Sql):
 
 class Where(Sql):
     """Predicates."""
+    __slots__ = ("condition",)
 
     def __init__(self, condition):
         self.condition = condition
@@ -241,6 +245,7 @@ class Where(Sql):
 
 class Aggregate(Sql):
     """Group By"""
+    __slots__ = ("groupingExpressions",)
 
     def __init__(self, groupingExpressions):
         self.groupingExpressions = Seq(groupingExpressions)
@@ -254,6 +259,7 @@ class Aggregate(Sql):
 
 class Having(Sql):
     """Having clause"""
+    __slots__ = ("condition",)
 
     def __init__(self, condition):
         self.condition = condition
@@ -264,6 +270,7 @@ class Having(Sql):
 
 class Order(Sql):
     """Order By"""
+    __slots__ = ("sortItems",)
 
     def __init__(self, sortItems):
         self.sortItems = Seq(sortItems)
@@ -277,6 +284,7 @@ class Order(Sql):
 
 class Limit(Sql):
     """Limit"""
+    __slots__ = ("n",)
 
     def __init__(self, n):
         self.n = n
@@ -290,6 +298,7 @@ class Limit(Sql):
 
 class Top(Sql):
     """Top"""
+    __slots__ = ("n",)
 
     def __init__(self, n):
         self.n = n
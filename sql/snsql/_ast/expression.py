@@ -26,6 +26,7 @@ EXPR_TYPE = Union[
 
 class Expression(SqlExpr):
     """A bare expression with no name"""
+    __slots__ = ("fragment",)
 
     def __init__(self, fragment):
         self.fragment = fragment
@@ -45,6 +46,7 @@ class Expression(SqlExpr):
 
 class NestedExpression(SqlExpr):
     """A nested expression with no name"""
+    __slots__ = ("expression",)
 
     def __init__(self, expression):
         self.expression = expression
@@ -75,6 +77,7 @@ class NestedExpression(SqlExpr):
 
 class NamedExpression(SqlExpr):
     """An expression with optional name"""
+    __slots__ = ("name", "expression", "m_symbol")
 
     def __init__(
         self, name: Identifier, expression: EXPR_TYPE
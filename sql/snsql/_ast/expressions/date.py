@@ -31,6 +31,8 @@ def parse_datetime(val):
     return parsed
 
 class CurrentTimeFunction(SqlExpr):
+    __slots__ = ()
+
     def children(self):
         return [Token("CURRENT_TIME")]
     def evaluate(self, bindings):
@@ -39,6 +41,8 @@ class CurrentTimeFunction(SqlExpr):
         return CurrentTimeFunction()
 
 class CurrentDateFunction(SqlExpr):
+    __slots__ = ()
+
     def children(self):
         return [Token("CURRENT_DATE")]
     def evaluate(self, bindings):
@@ -47,6 +51,8 @@ class CurrentDateFunction(SqlExpr):
         return CurrentDateFunction()
 
 class CurrentTimestampFunction(SqlExpr):
+    __slots__ = ()
+
     def children(self):
         return [Token("CURRENT_TIMESTAMP")]
     def evaluate(self, bindings):
@@ -55,6 +61,8 @@ class CurrentTimestampFunction(SqlExpr):
         return CurrentTimestampFunction()
 
 class DayNameFunction(SqlExpr):
+    __slots__ = ("expression",)
+
     def __init__(self, expression):
         self.expression = expression
     def children(self):
@@ -76,6 +84,8 @@ class DayNameFunction(SqlExpr):
         return DayNameFunction(self.expression)
 
 class ExtractFunction(SqlExpr):
+    __slots__ = ("date_part", "expression")
+
     def __init__(self, date_part, expression):
         self.date_part = date_part
         self.expression = expression
@@ -18,6 +18,7 @@ ops = {
 
 class BooleanCompare(SqlExpr):
     """ AND, OR, <=, >=, etc """
+    __slots__ = ("left", "right", "op")
 
     def __init__(self, left, op, right):
         self.left = left
@@ -77,6 +78,7 @@ class BooleanCompare(SqlExpr):
 
 class ColumnBoolean(SqlExpr):
     """A qualified column name that was parsed in a context that requires boolean"""
+    __slots__ = ("expression",)
 
     def __init__(self, expression):
         self.expression = expression
@@ -99,6 +101,7 @@ class ColumnBoolean(SqlExpr):
 
 class NestedBoolean(SqlExpr):
     """A nested expression with no name"""
+    __slots__ = ("expression",)
 
     def __init__(self, expression):
         self.expression = expression
@@ -121,6 +124,7 @@ class NestedBoolean(SqlExpr):
 
 class LogicalNot(SqlExpr):
     """Negation of a boolean expression"""
+    __slots__ = ("expression",)
 
     def __init__(self, expression):
         self.expression = expression
@@ -143,6 +147,8 @@ class LogicalNot(SqlExpr):
 
 
 class PredicatedExpression(SqlExpr):
+    __slots__ = ("expression", "predicate")
+
     def __init__(self, expression, predicate):
         self.expression = expression
         self.predicate = predicate
@@ -220,6 +226,8 @@ class PredicatedExpression(SqlExpr):
 
 
 class InCondition(SqlExpr):
+    __slots__ = ("expressions", "is_not")
+
     def __init__(self, expressions, is_not=False):
         self.expressions = expressions
         self.is_not = is_not
@@ -235,6 +243,8 @@ class InCondition(SqlExpr):
 
 
 class BetweenCondition(SqlExpr):
+    __slots__ = ("lower", "upper", "is_not")
+
     def __init__(self, lower, upper, is_not=False):
         self.lower = lower
         self.upper = upper
@@ -250,6 +260,8 @@ class BetweenCondition(SqlExpr):
 
 
 class IsCondition(SqlExpr):
+    __slots__ = ("value", "is_not")
+
     def __init__(self, value, is_not=False):
         self.value = value
         self.is_not = is_not
@@ -265,6 +277,7 @@ class IsCondition(SqlExpr):
 
 class CaseExpression(SqlExpr):
     """A case expression"""
+    __slots__ = ("expression", "when_exprs", "else_expr")
 
     def __init__(self, expression, when_exprs, else_expr):
         self.expression = expression
@@ -327,6 +340,7 @@ class CaseExpression(SqlExpr):
 
 class WhenExpression(SqlExpr):
     """A when expression in a case expression"""
+    __slots__ = ("expression", "then")
 
     def __init__(self, expression, then):
         self.expression = expression
@@ -352,6 +366,8 @@ class WhenExpression(SqlExpr):
 
 
 class ChooseFunction(SqlExpr):
+    __slots__ = ("expression", "choices")
+
     def __init__(self, expression, choices):
         self.expression = expression
         self.choices = choices
@@ -368,6 +384,8 @@ class ChooseFunction(SqlExpr):
 
 
 class IIFFunction(SqlExpr):
+    __slots__ = ("test", "yes", "no")
+
     def __init__(self, test, yes, no):
         self.test = test
         self.yes = yes
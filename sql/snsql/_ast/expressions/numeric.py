@@ -52,6 +52,7 @@ bare_funcs = {
 
 class ArithmeticExpression(SqlExpr):
     """A simple arithmetic expression with left and right side and operator"""
+    __slots__ = ("left", "right", "op")
 
     def __init__(self, left, op, right):
         self.left = left
@@ -115,6 +116,8 @@ class ArithmeticExpression(SqlExpr):
 
 
 class MathFunction(SqlExpr):
+    __slots__ = ("name", "expression")
+
     def __init__(self, name, expression):
         self.name = name
         self.expression = expression
@@ -149,6 +152,8 @@ class MathFunction(SqlExpr):
 
 
 class PowerFunction(SqlExpr):
+    __slots__ = ("expression", "power")
+
     def __init__(self, expression, power):
         self.expression = expression
         self.power = power
@@ -168,6 +173,8 @@ class PowerFunction(SqlExpr):
 
 
 class BareFunction(SqlExpr):
+    __slots__ = ("name",)
+
     def __init__(self, name):
         self.name = name
 
@@ -180,6 +187,8 @@ class BareFunction(SqlExpr):
 
 
 class RoundFunction(SqlExpr):
+    __slots__ = ("expression", "decimals")
+
     def __init__(self, expression, decimals):
         if not isinstance(decimals.value, int):
             raise ValueError("Decimals argument must be integer")
@@ -202,6 +211,8 @@ class RoundFunction(SqlExpr):
 
 
 class TruncFunction(SqlExpr):
+    __slots__ = ("expression", "decimals")
+
     def __init__(self, expression, decimals):
         if not isinstance(decimals.value, int):
             raise ValueError("Decimals argument must be integer")
@@ -7,6 +7,7 @@ from snsql._ast.tokens import *
 
 class AllColumns(SqlExpr):
     """A SELECT with * or Table.*"""
+    __slots__ = ("table",)
 
     def __init__(self, table=None):
         self.table = table
@@ -39,6 +40,7 @@ class AllColumns(SqlExpr):
 
 class AggFunction(SqlExpr):
     """A function such as SUM, COUNT, AVG"""
+    __slots__ = ("name", "quantifier", "expression")
 
     def __init__(self, name, quantifier, expression):
         self.name = name
@@ -127,6 +129,8 @@ class AggFunction(SqlExpr):
 
 
 class RankingFunction(SqlExpr):
+    __slots__ = ("name", "over")
+
     def __init__(self, name, over):
         self.name = name
         self.over = over
@@ -139,6 +143,8 @@ class RankingFunction(SqlExpr):
 
 
 class OverClause(SqlExpr):
+    __slots__ = ("partition", "order")
+
     def __init__(self, partition, order):
         self.partition = partition
         self.order = order
@@ -158,6 +164,7 @@ class OverClause(SqlExpr):
 
 class GroupingExpression(SqlExpr):
     """An expression used in Group By"""
+    __slots__ = ("expression",)
 
     def __init__(self, expression):
         self.expression = expression
@@ -174,6 +181,7 @@ class GroupingExpression(SqlExpr):
 
 class SortItem(SqlExpr):
     """Used to sort a query's output"""
+    __slots__ = ("expression", "order")
 
     def __init__(self, expression, order):
         self.expression = expression
@@ -194,6 +202,7 @@ class SortItem(SqlExpr):
 
 class BooleanJoinCriteria(SqlExpr):
     """Join criteria using boolean expression"""
+    __slots__ = ("expression",)
 
     def __init__(self, expression):
         self.expression = expression
@@ -207,6 +216,7 @@ class BooleanJoinCriteria(SqlExpr):
 
 class UsingJoinCriteria(SqlExpr):
     """Join criteria with USING syntax"""
+    __slots__ = ("identifiers",)
 
     def __init__(self, identifiers):
         self.identifiers = Seq(identifiers)
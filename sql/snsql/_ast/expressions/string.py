@@ -5,6 +5,8 @@ from snsql._ast.tokens import *
 """
 
 class LowerFunction(SqlExpr):
+    __slots__ = ("expression",)
+
     def __init__(self, expression):
         self.expression = expression
     def children(self):
@@ -16,6 +18,8 @@ class LowerFunction(SqlExpr):
         return LowerFunction(self.expression.symbol(relations))
 
 class UpperFunction(SqlExpr):
+    __slots__ = ("expression",)
+
     def __init__(self, expression):
         self.expression = expression
     def children(self):
@@ -27,6 +31,8 @@ class UpperFunction(SqlExpr):
         return UpperFunction(self.expression.symbol(relations))
 
 class TrimFunction(SqlExpr):
+    __slots__ = ("expression",)
+
     def __init__(self, expression):
         self.expression = expression
     def children(self):
@@ -41,6 +47,8 @@ class TrimFunction(SqlExpr):
         return TrimFunction(self.expression.symbol(relations))
 
 class CharLengthFunction(SqlExpr):
+    __slots__ = ("expression",)
+
     def __init__(self, expression):
         self.expression = expression
     def children(self):
@@ -55,6 +63,8 @@ class CharLengthFunction(SqlExpr):
         return TrimFunction(self.expression.symbol(relations))
 
 class PositionFunction(SqlExpr):
+    __slots__ = ("search", "source")
+
     def __init__(self, search, source):
         self.search = search
         self.source = source
@@ -73,6 +83,8 @@ class PositionFunction(SqlExpr):
         return PositionFunction(self.search.symbol(relations), self.source.symbol(relations))
 
 class SubstringFunction(SqlExpr):
+    __slots__ = ("source", "start", "length")
+
     def __init__(self, source, start, length):
         self.source = source
         self.start = start
@@ -109,6 +121,8 @@ class SubstringFunction(SqlExpr):
         return SubstringFunction(self.source.symbol(relations), self.start.symbol(relations), self.length.symbol(relations))
 
 class ConcatFunction(SqlExpr):
+    __slots__ = ("expressions",)
+
     def __init__(self, expressions):
         self.expressions = expressions
     def children(self):
@@ -123,6 +137,8 @@ class ConcatFunction(SqlExpr):
         return ConcatFunction(symbols)
 
 class CoalesceFunction(SqlExpr):
+    __slots__ = ("expressions",)
+
     def __init__(self, expressions):
         self.expressions = expressions
     def children(self):
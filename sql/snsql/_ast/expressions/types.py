@@ -6,6 +6,8 @@ import datetime
 """
 
 class CastFunction(SqlExpr):
+    __slots__ = ("expression", "dbtype")
+
     def __init__(self, expression, dbtype):
         self.expression = expression
         self.dbtype = dbtype
@@ -1,6 +1,6 @@
 from typing import List, Any, Dict, Union
+from bisect import bisect_left
 import itertools
-from snsql.xpath.parse import XPath
 import warnings
 
 class Symbol:
@@ -8,6 +8,7 @@ class Symbol:
     Class used to decorate AST with information from metadata
     and privacy object.
     """
+    __slots__ = ("name", "expression", "is_key_count", "is_grouping_column", "mechanism")
     def __init__(self, expression, name=None):
         self.name = name
         self.expression = expression
@@ -34,85 +35,121 @@ class Symbol:
 
 
 class Token(str):
-    def __init__(self, text):
-        self.text = text
+    # the text is the string itself, so tokens need no attributes of their own
+    __slots__ = ()
 
-    def __str__(self):
-        return self.text
+    text = property(str.__str__)
+    __str__ = str.__str__
+    __hash__ = str.__hash__
 
     def __eq__(self, other):
         if isinstance(other, str):
-            return self.text == other
+            return str.__eq__(self, other)
         return type(self) == type(other) and self.text == other.text
 
     def children(self):
         return [None]
 
-    def __hash__(self):
-        return hash(self.text)
-
 
 class Op(str):
-    def __init__(self, text):
-        self.text = text
+    __slots__ = ()
 
-    def __str__(self):
-        return self.text
+    text = property(str.__str__)
+    __str__ = str.__str__
+    __hash__ = str.__hash__
 
     def __eq__(self, other):
         if isinstance(other, str):
-            return self.text == other
+            return str.__eq__(self, other)
         return type(self) == type(other) and self.text == other.text
 
     def children(self):
         return [None]
 
-    def __hash__(self):
-        return hash(self.text)
-
 
 class Identifier(str):
-    def __init__(self, text):
-        self.text = text
+    __slots__ = ()
 
-    def __str__(self):
-        return self.text
+    text = property(str.__str__)
+    __str__ = str.__str__
+    __hash__ = str.__hash__
 
     def __eq__(self, other):
         if isinstance(other, str):
-            return self.text == other
+            return str.__eq__(self, other)
         return type(self) == type(other) and self.text == other.text
 
     def children(self):
         return [None]
 
-    def __hash__(self):
-        return hash(self.text)
-
 
 class FuncName(str):
-    def __init__(self, text):
-        self.text = text
+    __slots__ = ()
 
-    def __str__(self):
-        return self.text
+    text = property(str.__str__)
+    __str__ = str.__str__
+    __hash__ = str.__hash__
 
     def __eq__(self, other):
         if isinstance(other, str):
-            return self.text == other
+            return str.__eq__(self, other)
         return type(self) == type(other) and self.text == other.text
 
     def children(self):
         return [None]
 
-    def __hash__(self):
-        return hash(self.text)
+
+_bookkeeping = ("_hash", "_node_index")
+_slots = {}
+_unset = object()
+
+
+def _slot_names(cls):
+    names = _slots.get(cls)
+    if names is None:
+        names = []
+        for c in reversed(cls.__mro__):
+            slots = c.__dict__.get("__slots__", ())
+            names.extend([n for n in ((slots,) if isinstance(slots, str) else slots) if n not in names])
+        _slots[cls] = names
+    return names
+
+
+def node_attributes(node):
+    """
+        Returns the attributes set on a node, as a dict, whether they
+        are kept in slots or in the node's __dict__.  Cached hashes and
+        node indexes are left out.
+    """
+    attrs = {}
+    for name in _slot_names(type(node)):
+        value = getattr(node, name, _unset)
+        if value is not _unset and name not in _bookkeeping:
+            attrs[name] = value
+    d = getattr(node, "__dict__", None)
+    if d:
+        attrs.update(d)
+    return attrs
 
 
 class Sql:
     """
         base type for all Sql AST nodes
     """
+    # Expression and clause nodes declare their attributes in __slots__.
+    # Relations keep a __dict__, because load_symbols annotates them.
+    __slots__ = ("_hash", "_node_index")
+
+    def __getstate__(self):
+        # cached hashes of strings don't carry over to other processes
+        state = getattr(self, "__dict__", None)
+        state = dict(state) if state else None
+        slots = {}
+        for name in _slot_names(type(self)):
+            value = getattr(self, name, _unset)
+            if value is not _unset and name != "_hash":
+                slots[name] = value
+        return (state, slots) if slots else state
 
     def __str__(self):
         return " ".join([str(c) for c in self.children() if c is not None])
@@ -120,6 +157,9 @@ class Sql:
     def __eq__(self, other):
         if other is None:
             return False
+        elif self is other:
+            # interned subexpressions are shared, so this is the common case
+            return True
         else:
             s = self.children()
             o = other.children()
@@ -131,17 +171,57 @@ class Sql:
         return f"alias_{hex(hash(self) % (2 ** 16))}"
 
     def __hash__(self):
+        cached = getattr(self, "_hash", None)
+        if cached is not None:
+            return cached
         return hash(tuple(self.children()))
 
+    def freeze(self):
+        """
+            Caches the hash of every hashable node in this tree, and
+            returns the tree.  A frozen tree must not be changed, since
+            cached hashes are not updated; call thaw() before changing it.
+        """
+        nodes = self._nodes()
+        for node in nodes:
+            node._hash = None
+        for node in reversed(nodes):
+            try:
+                node._hash = hash(node)
+            except TypeError:
+                # lists such as Seq are unhashable, and so are their parents
+                pass
+        return self
+
+    def thaw(self):
+        """Drops the hashes cached by freeze(), and returns the tree."""
+        for node in self._nodes():
+            node._hash = None
+        return self
+
+    def _nodes(self):
+        # every Sql node in the tree, each once, parents before children
+        nodes, seen, stack = [], set(), [self]
+        while stack:
+            node = stack.pop()
+            if id(node) in seen:
+                continue
+            seen.add(id(node))
+            nodes.append(node)
+            stack.extend([c for c in node.children() if isinstance(c, Sql)])
+        return nodes
+
     def children(self):
         return []
 
     def xpath(self, path):
+        from snsql.xpath.parse import XPath
         p = XPath()
         x = p.parse(path)
         return x.evaluate(self)
 
     def xpath_first(self, path):
+        from snsql.xpath.parse import XPath
         p = XPath()
         x = p.parse(path)
         res = x.evaluate(self)
@@ -150,11 +230,48 @@ class Sql:
         else:
             return res[0]
 
+    def index_nodes(self):
+        """
+            Indexes every node under this one by type, so that find_node,
+            find_nodes and //Type XPath steps on this node, or on any node
+            under it, are lookups instead of walks.  The index is not kept
+            when the tree is copied or pickled.  Call drop_index before
+            changing the structure of an indexed tree.
+        """
+        NodeIndex(self)
+        return self
+
+    def drop_index(self):
+        index = self._index()
+        if index is not None:
+            index.drop()
+
+    def _index(self):
+        stamp = getattr(self, "_node_index", None)
+        if stamp is None or stamp[0] is None or not stamp[0].valid:
+            return None
+        return stamp[0]
+
+    def _index_lookup(self, class_name):
+        """
+            Returns this node and the nodes under it with the given class
+            name, in document order, or None if the tree isn't indexed.
+        """
+        index = self._index()
+        if index is None:
+            return None
+        _, _, (start, end) = self._node_index
+        return index.named(class_name, start, end)
+
     def find_node(self, type_name):
         """
             Walks the tree and returns the first node
             that is an instance of the specified type.
         """
+        index = self._index()
+        if index is not None:
+            _, _, (start, end) = self._node_index
+            return index.first(type_name, start + 1, end)
         candidates = [c for c in self.children() if c is not None]
         for c in candidates:
             if isinstance(c, type_name):
@@ -170,6 +287,10 @@ class Sql:
             Walks the tree and returns all nodes
             that are an instance of the specified type.
         """
+        index = self._index() if not_child_of is None else None
+        if index is not None:
+            _, (start, end), _ = self._node_index
+            return index.find(type_name, start, end)
         candidates = [c for c in self.children() if c is not None]
         nodes = [c for c in candidates if isinstance(c, type_name)]
         sqlnodes = [c for c in candidates if isinstance(c, Sql)]
@@ -232,6 +353,8 @@ class Sql:
 
 
 class Seq(Sql):
+    __slots__ = ("seq",)
+
     def __init__(self, seq):
         self.seq = seq
 
@@ -331,6 +454,7 @@ class SqlExpr(Sql):
     """
         Base type for all SQL expressions
     """
+    __slots__ = ()
 
     def type(self):
         return "unknown"
@@ -367,6 +491,7 @@ class SqlExpr(Sql):
 
 class Literal(SqlExpr):
     """A literal used in an expression"""
+    __slots__ = ("value", "text")
 
     def __init__(self, value, text=None):
         if text is None:
@@ -413,6 +538,7 @@ class Literal(SqlExpr):
 
 class Column(SqlExpr):
     """A fully qualified column name"""
+    __slots__ = ("name",)
 
     def __init__(self, name):
         self.name = name
@@ -461,5 +587,154 @@ def flatten(iter):
     return list(itertools.chain.from_iterable(iter))
 
 
+class InternTable:
+    """
+        Maps structurally equal expressions to one shared node, so that
+        repeated subexpressions, such as the same column or aggregate in
+        many output columns, are held once.  Interned trees share nodes,
+        so only intern trees that won't be changed; they are returned
+        frozen, with their hashes cached.
+
+        .. code-block:: python
+
+            table = InternTable()
+            query = table.intern(QueryParser(metadata).query(query_string))
+    """
+    def __init__(self):
+        self._nodes = {}
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def intern(self, node):
+        """Interns the expressions under node, and returns the interned node."""
+        node = self._intern(node)
+        return node.freeze() if isinstance(node, Sql) else node
+
+    def _intern(self, node):
+        if isinstance(node, (Token, Op, Identifier, FuncName)):
+            return self._nodes.setdefault((type(node), node), node)
+        if not isinstance(node, Sql):
+            return node
+        if isinstance(node, Seq):
+            for idx, c in enumerate(node.seq):
+                if isinstance(c, Sql):
+                    interned = self._intern(c)
+                    if interned is not c:
+                        node[idx] = interned
+            return node
+        children = node.children()
+        for name, value in node_attributes(node).items():
+            if value is None or name.startswith("_"):
+                continue
+            if not any(value is c for c in children):
+                continue
+            interned = self._intern(value)
+            if interned is not value:
+                setattr(node, name, interned)
+        if not isinstance(node, SqlExpr):
+            return node
+        try:
+            return self._nodes.setdefault(self._key(node), node)
+        except TypeError:
+            return node
+
+    def _key(self, node):
+        # children are interned first, so equal subtrees are the same object
+        children = node.children()
+        if not any(isinstance(c, Sql) for c in children):
+            return (type(node), str(node))
+        return (type(node), tuple([id(c) if isinstance(c, Sql) else (type(c), c) for c in children]))
+
+
+def _dropped_index():
+    return None
+
+
+class NodeIndex:
+    """
+        Positions of the nodes in an AST, built by Sql.index_nodes.  Nodes
+        are listed in two orders: the order find_nodes returns them in, and
+        document order, which XPath uses.  The nodes under any indexed node
+        are a contiguous range in both orders, so each indexed node records
+        its two ranges, and a lookup is two bisections into the positions
+        of a type.
+    """
+    def __init__(self, root):
+        self.valid = True
+        self.found = []       # find_nodes order
+        self.document = []    # document order, including the root
+        self._by_type = {}    # type -> positions in found
+        self._by_class = {}   # type -> positions in document
+        self._cache = {}
+        self._visit(root)
+        for pos, node in enumerate(self.found):
+            self._by_type.setdefault(type(node), []).append(pos)
+        for pos, node in enumerate(self.document):
+            self._by_class.setdefault(type(node), []).append(pos)
+
+    def _visit(self, node):
+        stamp = getattr(node, "_node_index", None)
+        if stamp is not None and stamp[0] is self:
+            # a node shared by two parents has no single range
+            self.valid = False
+        doc_start = len(self.document)
+        self.document.append(node)
+        children = [c for c in node.children() if c is not None]
+        found_start = len(self.found)
+        self.found.extend(children)
+        for c in children:
+            if isinstance(c, Sql):
+                self._visit(c)
+            else:
+                if any(g is not None for g in getattr(c, "children", list)()):
+                    # only Sql nodes are walked by find_nodes, so leave it unindexed
+                    self.valid = False
+                self.document.append(c)
+        node._node_index = (self, (found_start, len(self.found)), (doc_start, len(self.document)))
+
+    def _positions(self, kind, key):
+        # positions of the matching types, merged once per type asked for
+        cached = self._cache.get((kind, key))
+        if cached is None:
+            if kind == "found":
+                lists = [pos for t, pos in self._by_type.items() if issubclass(t, key)]
+            elif kind == "document":
+                lists = [pos for t, pos in self._by_class.items() if issubclass(t, key)]
+            else:
+                lists = [pos for t, pos in self._by_class.items() if t.__name__ == key]
+            cached = sorted(itertools.chain.from_iterable(lists))
+            self._cache[(kind, key)] = cached
+        return cached
+
+    def find(self, type_name, start, end):
+        positions = self._positions("found", type_name)
+        return [self.found[p] for p in positions[bisect_left(positions, start):bisect_left(positions, end)]]
+
+    def first(self, type_name, start, end):
+        positions = self._positions("document", type_name)
+        idx = bisect_left(positions, start)
+        if idx < len(positions) and positions[idx] < end:
+            return self.document[positions[idx]]
+        return None
+
+    def named(self, class_name, start, end):
+        positions = self._positions("named", class_name)
+        return [self.document[p] for p in positions[bisect_left(positions, start):bisect_left(positions, end)]]
+
+    def drop(self):
+        # the nodes hold the index, so release them to break the cycle
+        self.valid = False
+        self.found, self.document = [], []
+        self._by_type, self._by_class, self._cache = {}, {}, {}
+
+    def __deepcopy__(self, memo):
+        # copies of an indexed tree are not indexed
+        return None
+
+    def __reduce__(self):
+        return (_dropped_index, ())
+
+
 def unique(iter):
     return list(set(iter))
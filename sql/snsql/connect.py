@@ -51,4 +51,31 @@ def from_connection(conn, *ignore, privacy, metadata, engine=None, **kwargs):
         queries against the database.
 
     """
-    return PrivateReader.from_connection(conn, privacy=privacy, metadata=metadata, engine=engine)
\ No newline at end of file
+    return PrivateReader.from_connection(conn, privacy=privacy, metadata=metadata, engine=engine)
+
+
+def from_pool(connect, *ignore, privacy, metadata, engine=None, size=4, **kwargs):
+    """Open a private SQL connection that runs queries on a bounded pool of database connections.
+
+    .. code-block:: python
+
+        from snsql import from_pool, Privacy
+
+        metadata = 'datasets/PUMS.yaml'
+        privacy = Privacy(epsilon=0.1, delta=1/10000)
+        reader = from_pool(lambda: psycopg2.connect(dsn), metadata=metadata, privacy=privacy, size=8)
+
+        results = await asyncio.gather(*[reader.execute_async(q) for q in queries])
+
+    :param connect: A function that opens a new database connection.
+    :param privacy: A Privacy object with the desired privacy parameters
+    :param metadata: The metadata describing the data source.  This will typically be
+        a path to a yaml metadata file, but can also be a dictionary.
+    :param engine: Specifies the engine to use.  If not supplied, from_pool will probe
+        the first connection to decide what dialect to use.
+    :param size: The maximum number of connections open at once.
+    :returns: A PrivateReader that can be used to execute differentially private
+        queries concurrently against the database.
+
+    """
+    return PrivateReader.from_pool(connect, privacy=privacy, metadata=metadata, engine=engine, size=size, **kwargs)
@@ -1,16 +1,102 @@
-import yaml
+import copy
+import hashlib
 import io
+import json
+import os
 from os import path
+import threading
 import warnings
+import weakref
+from collections import OrderedDict
+from collections.abc import MutableMapping
 
 from snsql.sql.reader.base import NameCompare
 
 # implements spec at https://docs.smartnoise.org/en/stable/sql/metadata.html
 
-class Metadata:
+class _Tracked:
+    """
+    Base for metadata objects that tell whatever holds them when they are
+    edited, so that Metadata can keep its fingerprint between edits.
+    Holders are weak references, and are left out of copies and pickles;
+    the copy of a holder adopts its children again when it is restored.
+    """
+    _untracked = ("compare", "_holders", "_fingerprint", "_edits", "_catalog", "_live")
+    _containers = ()
+    # set once there is something to tell: holders, or a cached fingerprint
+    _live = False
+    def __setattr__(self, name, value):
+        if name in self._containers:
+            if not isinstance(value, (_TrackedDict, LazyTables)):
+                value = _TrackedDict(value)
+            object.__setattr__(self, name, value)
+            value._owner = self
+            self._adopt()
+        else:
+            object.__setattr__(self, name, value)
+        if self._live and name not in self._untracked:
+            self._changed()
+    def _changed(self):
+        for ref in self.__dict__.get("_holders", ()):
+            holder = ref()
+            if holder is not None:
+                holder._changed()
+    def _hold(self, holder):
+        holders = self.__dict__.get("_holders")
+        if holders is None:
+            self.__dict__["_holders"] = [weakref.ref(holder)]
+            self.__dict__["_live"] = True
+        elif not any([ref() is holder for ref in holders]):
+            holders[:] = [ref for ref in holders if ref() is not None]
+            holders.append(weakref.ref(holder))
+    def _adopt(self):
+        pass
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state.pop("_holders", None)
+        return state
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._adopt()
+
+class _TrackedDict(dict):
+    """The tables of a Metadata or the columns of a Table, as a dict that tells its owner when entries change"""
+    _owner = None
+    def _edited(self, value=None):
+        if self._owner is not None:
+            if isinstance(value, _Tracked):
+                value._hold(self._owner)
+            self._owner._changed()
+    def __setitem__(self, key, value):
+        dict.__setitem__(self, key, value)
+        self._edited(value)
+    def __delitem__(self, key):
+        dict.__delitem__(self, key)
+        self._edited()
+    def pop(self, *args):
+        value = dict.pop(self, *args)
+        self._edited()
+        return value
+    def popitem(self):
+        item = dict.popitem(self)
+        self._edited()
+        return item
+    def clear(self):
+        dict.clear(self)
+        self._edited()
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+class Metadata(_Tracked):
     """Information about a collection of tabular data sources"""
+    _live = True
 
-    def __init__(self, tables, engine=None, compare=None, dbname=None):
+    def __init__(self, tables, engine=None, compare=None, dbname=None, catalog=None):
         """Instantiate a metadata object with information about tabular data sources
 
         :param tables: A list of Table descriptions
@@ -19,12 +105,30 @@ class Metadata:
         :param compare: A NameCompare object used to compare table names.  Set to None to use comparison rules
             associated with engine.
         :param dbname: The name of the database.  Used to match 3-part object names like dbname.schema.table.  Set to None to match any database name.
+        :param catalog: A CatalogProvider with more tables.  Tables from the catalog are only built
+            when a query first looks them up, so large catalogs load quickly.
         """
-        self.m_tables = dict([(t.table_name(), t) for t in tables])
+        self._edits = 0
+        if catalog is not None:
+            self.m_tables = LazyTables(catalog)
+            for t in tables:
+                self.m_tables[t.table_name()] = t
+        else:
+            self.m_tables = dict([(t.table_name(), t) for t in tables])
         self.engine = engine if engine is not None else "Unknown"
         self.compare = NameCompare.get_name_compare(engine) if compare is None else compare
         self.dbname = dbname if dbname else None
 
+    _containers = ("m_tables",)
+
+    def _adopt(self):
+        for t in self.loaded_tables():
+            t._hold(self)
+
+    def _changed(self):
+        self.__dict__["_fingerprint"] = None
+        self.__dict__["_edits"] = self.__dict__.get("_edits", 0) + 1
+
     def __getitem__(self, tablename):
         schema_name = ""
         dbname = ""
@@ -34,22 +138,26 @@ class Metadata:
         elif len(parts) == 2:
             schema_name, tablename = parts
         for tname in self.m_tables.keys():
-            table = self.m_tables[tname]
+            if isinstance(self.m_tables, LazyTables):
+                table_schema, table_name = self.m_tables.names(tname)
+            else:
+                table = self.m_tables[tname]
+                table_schema, table_name = table.schema, table.name
 
             # check if table name matches
-            if not self.compare.identifier_match(tablename, table.name):
+            if not self.compare.identifier_match(tablename, table_name):
                 # should this really check tablename?  or just the final part?
                 continue
 
             # check if schema name matches
             if not schema_name:
-                if table.schema:
-                    if not self.compare.schema_match(schema_name, table.schema):
+                if table_schema:
+                    if not self.compare.schema_match(schema_name, table_schema):
                         continue
                 else:
                     pass
             else:
-                if not self.compare.schema_match(schema_name, table.schema):
+                if not self.compare.schema_match(schema_name, table_schema):
                     continue
 
             # check if dbname matches
@@ -57,6 +165,7 @@ class Metadata:
                 continue
 
             # all check passed, return table
+            table = self.m_tables[tname]
             table.compare = self.compare
             return table
         return None
@@ -68,42 +177,90 @@ class Metadata:
     def tables(self):
         return [self.m_tables[tname] for tname in self.m_tables.keys()]
 
+    def loaded_tables(self):
+        """The tables built so far.  The same as tables(), unless the metadata reads from a catalog,
+        in which case tables that no query has looked up yet are left out."""
+        if isinstance(self.m_tables, LazyTables):
+            return self.m_tables.loaded()
+        return self.tables()
+
     def __iter__(self):
         return self.tables()
 
     @staticmethod
-    def from_file(file):
-        """Load the metadata about this collection from a YAML file"""
+    def from_file(file, lazy=False):
+        """Load the metadata about this collection from a YAML file.
+
+        Files ending in .json are read as snapshots written by to_file, and
+        do not need PyYAML.  Parsed files are cached by path, modification
+        time and size, so loading the same file again only rebuilds the
+        Table objects.  Set lazy to build each Table only when it is first
+        looked up.
+        """
         ys = CollectionYamlLoader(file)
-        return ys.read_file()
+        return ys.read_file(lazy)
 
     @staticmethod
-    def from_dict(schema_dict):
+    def from_dict(schema_dict, lazy=False):
         """Load the metadata from a dict object"""
         ys = CollectionYamlLoader("dummy")
-        return ys._create_metadata_object(schema_dict)
+        return ys._create_metadata_object(schema_dict, lazy)
 
     @classmethod 
-    def from_(cls, val):
+    def from_(cls, val, lazy=False):
         if isinstance(val, Metadata):
             return val
         elif isinstance(val, (str, io.IOBase)):
-            return cls.from_file(val)
+            return cls.from_file(val, lazy)
         elif isinstance(val, dict):
-            return cls.from_dict(val)
+            return cls.from_dict(val, lazy)
         else:
             raise ValueError(f"Metadata needs to be string, dictionary, or Metadata.  Got {str(type(val))}")
 
     def to_file(self, file, collection_name):
-        """Save collection metadata to a YAML file"""
+        """Save collection metadata to a YAML file, or to a JSON snapshot if the file name ends in .json"""
         ys = CollectionYamlLoader(file)
         ys.write_file(self, collection_name)
 
+    @property
+    def fingerprint(self):
+        """A hex digest of every table and column property, stable across loads
+        and processes.  Changes whenever the metadata is edited, and is cached
+        until then.  Tables from a catalog count by name and the catalog's
+        fingerprint until they are edited, so looking tables up does not
+        change the fingerprint."""
+        fingerprint = self.__dict__.get("_fingerprint")
+        if fingerprint is not None:
+            return fingerprint
+        edits = self._edits
+        catalog = None
+        tables = []
+        if isinstance(self.m_tables, LazyTables):
+            catalog = self.m_tables.catalog
+            for tname in self.m_tables.keys():
+                table = self.m_tables.loaded_table(tname)
+                if table is None or table.__dict__.get("_catalog") is catalog:
+                    tables.append((tname, None))
+                else:
+                    tables.append((tname, table.fingerprint))
+        else:
+            tables = [(tname, table.fingerprint) for tname, table in self.m_tables.items()]
+        text = json.dumps([
+            self.engine,
+            self.dbname,
+            catalog.fingerprint() if catalog is not None else None,
+            sorted(tables)
+        ], default=str)
+        fingerprint = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        if self._edits == edits:
+            self._fingerprint = fingerprint
+        return fingerprint
+
 """
     Common attributes for a table or a view
 """
 
-class Table:
+class Table(_Tracked):
     """Information about a single tabular data source"""
     def __init__(
         self,
@@ -191,7 +348,28 @@ class Table:
     def table_name(self):
         return (self.schema + "." if len(self.schema.strip()) > 0 else "") + self.name
 
-class String:
+    _containers = ("m_columns",)
+
+    def _adopt(self):
+        for c in self.m_columns.values():
+            c._hold(self)
+
+    def _changed(self):
+        self.__dict__["_fingerprint"] = None
+        self.__dict__["_catalog"] = None
+        super()._changed()
+
+    @property
+    def fingerprint(self):
+        """A hex digest of the table and its columns, cached until the table is edited"""
+        if self.__dict__.get("_fingerprint") is None:
+            table = CollectionYamlLoader(None)._table_dict(self)
+            text = json.dumps([self.schema, self.name, table], sort_keys=True, default=str)
+            self._fingerprint = hashlib.sha256(text.encode("utf-8")).hexdigest()
+            self._live = True
+        return self._fingerprint
+
+class String(_Tracked):
     """A column with string data"""
     def __init__(
         self, 
@@ -217,7 +395,7 @@ class String:
     def unbounded(self):
         return self.card is None
 
-class Boolean:
+class Boolean(_Tracked):
     """A column with True/False data"""
     def __init__(
         self, 
@@ -241,7 +419,7 @@ class Boolean:
     def unbounded(self):
         return False
 
-class DateTime:
+class DateTime(_Tracked):
     """A date/time column"""
     def __init__(
         self, 
@@ -265,7 +443,7 @@ class DateTime:
     def unbounded(self):
         return True
 
-class Int:
+class Int(_Tracked):
     """A column with integer data"""
     def __init__(
         self, 
@@ -305,7 +483,7 @@ class Int:
     def unbounded(self):
         return self.lower is None or self.upper is None
 
-class Float:
+class Float(_Tracked):
     """A floating point column"""
     def __init__(
         self, 
@@ -343,7 +521,7 @@ class Float:
     def unbounded(self):
         return self.lower is None or self.upper is None
 
-class Unknown:
+class Unknown(_Tracked):
     """Column is unknown type.  Will be ignored.  May not be used in queries."""
     def __init__(self, name):
         self.name = name
@@ -355,28 +533,192 @@ class Unknown:
     def unbounded(self):
         return True
 
+# parsed metadata files, keyed by absolute path, with the
+# (mtime, size) they were parsed at.  Only the parsed dictionaries
+# are kept, so each load still gets its own Table objects.
+_file_cache = OrderedDict()
+_file_cache_lock = threading.Lock()
+file_cache_size = 32
+
+def clear_file_cache():
+    with _file_cache_lock:
+        _file_cache.clear()
+
+def _load_yaml(stream):
+    import yaml
+    # the libyaml loader is several times faster, when installed
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(stream, Loader=loader)
+
+def _read_file(file, cache=True):
+    key = path.abspath(file)
+    stat = os.stat(key)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _file_cache_lock:
+        if key in _file_cache and _file_cache[key][0] == signature:
+            _file_cache.move_to_end(key)
+            return _file_cache[key][1]
+    with open(file, "r") as stream:
+        if key.lower().endswith(".json"):
+            c_s = json.load(stream)
+        else:
+            c_s = _load_yaml(stream)
+    if cache and file_cache_size > 0:
+        with _file_cache_lock:
+            _file_cache[key] = (signature, c_s)
+            _file_cache.move_to_end(key)
+            while len(_file_cache) > file_cache_size:
+                _file_cache.popitem(last=False)
+    return c_s
+
+class CatalogProvider:
+    """Supplies table descriptions to a Metadata on demand.  Descriptions
+    are dictionaries in the same format as a table in a metadata YAML file."""
+    def table_names(self):
+        """Returns a list of (schema, table) pairs for every table in the catalog"""
+        raise NotImplementedError("Catalog providers must implement table_names")
+    def load_table(self, schema, table):
+        """Returns the description of one table"""
+        raise NotImplementedError("Catalog providers must implement load_table")
+    def fingerprint(self):
+        """Returns a hex digest that changes whenever any table description changes.
+        This reads every table, so providers should override it with something cheaper."""
+        if getattr(self, "_fingerprint", None) is None:
+            tables = [(schema, table, self.load_table(schema, table)) for schema, table in self.table_names()]
+            text = json.dumps(tables, sort_keys=True, default=str)
+            self._fingerprint = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return self._fingerprint
+
+class DictCatalog(CatalogProvider):
+    """A catalog read from the collection in a parsed metadata file, shaped {schema: {table: description}}"""
+    def __init__(self, db):
+        self.db = db
+    def table_names(self):
+        return [(schema, table) for schema in self.db.keys() for table in self.db[schema].keys()]
+    def load_table(self, schema, table):
+        return self.db[schema][table]
+
+class FileCatalog(CatalogProvider):
+    """A catalog stored as one YAML or JSON file per table, at folder/schema/table.json.
+    Tables with no schema are stored at the top of the folder.  Only the folder
+    listing is read up front; each file is read when its table is first looked up."""
+    extensions = (".yaml", ".yml", ".json")
+    def __init__(self, folder):
+        if not path.isdir(folder):
+            raise ValueError(f"Unable to load catalog folder {folder}")
+        self.folder = folder
+        self.files = OrderedDict()
+        for entry in sorted(os.listdir(folder)):
+            if path.isdir(path.join(folder, entry)):
+                for f in sorted(os.listdir(path.join(folder, entry))):
+                    self._add(entry, path.join(folder, entry, f))
+            else:
+                self._add("", path.join(folder, entry))
+    def _add(self, schema, file):
+        table, ext = path.splitext(path.basename(file))
+        if ext.lower() in self.extensions:
+            if (schema, table) in self.files:
+                raise ValueError(f"Table {table} is stored in more than one file in {self.folder}")
+            self.files[(schema, table)] = file
+    def table_names(self):
+        return list(self.files.keys())
+    def load_table(self, schema, table):
+        # tables are kept by the Metadata once built, so skip the file cache
+        return _read_file(self.files[(schema, table)], cache=False)
+    def fingerprint(self):
+        """A digest of the folder and each file's name, modification time and size"""
+        if getattr(self, "_fingerprint", None) is None:
+            files = []
+            for (schema, table), file in self.files.items():
+                stat = os.stat(file)
+                files.append((schema, table, stat.st_mtime_ns, stat.st_size))
+            text = json.dumps([path.abspath(self.folder), files])
+            self._fingerprint = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return self._fingerprint
+    @staticmethod
+    def from_metadata(metadata, folder):
+        """Write every table in metadata to folder, one JSON file per table, and return the catalog"""
+        db = CollectionYamlLoader(None)._create_dict(metadata, str(metadata.dbname))[str(metadata.dbname)]
+        for schema in db.keys():
+            if schema:
+                os.makedirs(path.join(folder, schema), exist_ok=True)
+            for table in db[schema].keys():
+                with open(path.join(folder, schema, table + ".json"), "w") as outfile:
+                    json.dump(db[schema][table], outfile, indent=1)
+        return FileCatalog(folder)
+
+class LazyTables(MutableMapping):
+    """The tables of a Metadata that reads from a catalog.  Maps table names to
+    Table objects like a dict, but builds each Table on first access."""
+    _owner = None
+    def __init__(self, catalog):
+        self.catalog = catalog
+        # values are Table objects, or (schema, table) until built
+        self._entries = OrderedDict()
+        for schema, table in catalog.table_names():
+            self._entries[(schema + "." if len(schema.strip()) > 0 else "") + table] = (schema, table)
+    def __getitem__(self, tname):
+        entry = self._entries[tname]
+        if isinstance(entry, tuple):
+            schema, table = entry
+            entry = CollectionYamlLoader(None).load_table(schema, table, self.catalog.load_table(schema, table))
+            # unedited, a built table counts toward the fingerprint as it did before it was built
+            entry._catalog = self.catalog
+            entry._live = True
+            if self._owner is not None:
+                entry._hold(self._owner)
+            self._entries[tname] = entry
+        return entry
+    def __setitem__(self, tname, table):
+        self._entries[tname] = table
+        if self._owner is not None:
+            table._hold(self._owner)
+            self._owner._changed()
+    def __delitem__(self, tname):
+        del self._entries[tname]
+        if self._owner is not None:
+            self._owner._changed()
+    def __iter__(self):
+        return iter(self._entries)
+    def __len__(self):
+        return len(self._entries)
+    def __deepcopy__(self, memo):
+        # the catalog is only read, so copies share it
+        result = LazyTables.__new__(LazyTables)
+        memo[id(self)] = result
+        memo[id(self.catalog)] = self.catalog
+        result.catalog = self.catalog
+        result._entries = copy.deepcopy(self._entries, memo)
+        if id(self._owner) in memo:
+            result._owner = memo[id(self._owner)]
+        return result
+    def names(self, tname):
+        """Returns (schema, table) for a table name, without building the table"""
+        entry = self._entries[tname]
+        return entry if isinstance(entry, tuple) else (entry.schema, entry.name)
+    def loaded(self):
+        return [entry for entry in self._entries.values() if not isinstance(entry, tuple)]
+    def loaded_table(self, tname):
+        """Returns the table if it has been built, or None"""
+        entry = self._entries[tname]
+        return None if isinstance(entry, tuple) else entry
+    def unloaded(self):
+        return [tname for tname, entry in self._entries.items() if isinstance(entry, tuple)]
+
 class CollectionYamlLoader:
     def __init__(self, file):
         self.file = file
 
-    def read_file(self):
+    def read_file(self, lazy=False):
         if isinstance(self.file, io.IOBase):
-            try:
-                c_s = yaml.safe_load(self.file)
-            except yaml.YAMLError as exc:
-                raise
-            return self._create_metadata_object(c_s)
+            c_s = _load_yaml(self.file)
+            return self._create_metadata_object(c_s, lazy)
         else:
             if not path.exists(self.file):
                 raise ValueError(f"Unable to load metadata path {self.file}")
-            with open(self.file, "r") as stream:
-                try:
-                    c_s = yaml.safe_load(stream)
-                except yaml.YAMLError as exc:
-                    raise
-            return self._create_metadata_object(c_s)
-
-    def _create_metadata_object(self, c_s):
+            return self._create_metadata_object(_read_file(self.file), lazy)
+
+    def _create_metadata_object(self, c_s, lazy=False):
         if not hasattr(c_s, "keys"):
             raise ValueError("Metadata must be a YAML dictionary")
         keys = list(c_s.keys())
@@ -397,6 +739,9 @@ class CollectionYamlLoader:
 
         db = c_s[collection]
 
+        if lazy:
+            return Metadata([], engine, dbname=collection, catalog=DictCatalog(db))
+
         tables = []
 
         for schema in db.keys():
@@ -493,10 +838,19 @@ class CollectionYamlLoader:
             raise ValueError("Unknown column type for column {0}: {1}".format(column, c))
 
     def write_file(self, collection_metadata, collection_name):
+        db = self._create_dict(collection_metadata, collection_name)
+        if isinstance(self.file, io.IOBase):
+            raise ValueError("Cannot save metadata to a file stream.  Please use file path")
+        with open(self.file, "w") as outfile:
+            if self.file.lower().endswith(".json"):
+                json.dump(db, outfile, indent=1)
+            else:
+                import yaml
+                yaml.dump(db, outfile)
 
-        engine = collection_metadata.engine
+    def _create_dict(self, collection_metadata, collection_name, tables=None):
         schemas = {}
-        for t in collection_metadata.tables():
+        for t in collection_metadata.tables() if tables is None else tables:
             schema_name = t.schema
             table_name = t.name
             if schema_name not in schemas:
@@ -506,66 +860,66 @@ class CollectionYamlLoader:
                 raise ValueError(
                     "Attempt to insert table with same name twice: " + schema_name + table_name
                 )
-            schema[table_name] = {}
-            table = schema[table_name]
-            table["rows"] = t.rowcount
-            if t.row_privacy is not None:
-                table["row_privacy"] = t.row_privacy
-            if t.max_ids is not None:
-                table["max_ids"] = t.max_ids
-            if t.sample_max_ids is not None:
-                table["sample_max_ids"] = t.sample_max_ids
-            if t.rows_exact is not None:
-                table["rows_exact"] = t.rows_exact
-            if t.use_dpsu is not None:
-                table["use_dpsu"] = t.use_dpsu
-            if t.clamp_counts is not None:
-                table["clamp_counts"] = t.clamp_counts
-            if t.clamp_columns is not None:
-                table["clamp_columns"] = t.clamp_columns
-            if t.censor_dims is not None:
-                table["censor_dims"] = t.censor_dims
-
-            for c in t.columns():
-                cname = c.name
-                if cname in table:
-                    raise ValueError(
-                        "Duplicate column name {0} in table {1}".format(cname, table_name)
-                    )
-                table[cname] = {}
-                column = table[cname]
-                if hasattr(c, "card"):
-                    column["cardinality"] = c.card
-                if hasattr(c, "lower") and c.lower is not None:
-                    column["lower"] = c.lower
-                if hasattr(c, "upper") and c.upper is not None:
-                    column["upper"] = c.upper
-                if hasattr(c, "nullable") and c.nullable is not None:
-                    column["nullable"] = c.nullable
-                if hasattr(c, "missing_value") and c.missing_value is not None:
-                    column["missing_value"] = c.missing_value
-                if hasattr(c, "sensitivity") and c.sensitivity is not None:
-                    column["sensitivity"] = c.sensitivity
-                if c.is_key is not None and c.is_key == True:
-                    column["private_id"] = c.is_key
-                if type(c) is String:
-                    column["type"] = "string"
-                elif type(c) is Int:
-                    column["type"] = "int"
-                elif type(c) is Float:
-                    column["type"] = "float"
-                elif type(c) is Boolean:
-                    column["type"] = "boolean"
-                elif type(c) is DateTime:
-                    column["type"] = "datetime"
-                elif type(c) is Unknown:
-                    column["type"] = "unknown"
-                else:
-                    raise ValueError("Unknown column type: " + str(type(c)))
+            schema[table_name] = self._table_dict(t)
         db = {}
         db[collection_name] = schemas
         db["engine"] = collection_metadata.engine
-        if isinstance(self.file, io.IOBase):
-            raise ValueError("Cannot save metadata to a file stream.  Please use file path")
-        with open(self.file, "w") as outfile:
-            yaml.dump(db, outfile)
+        return db
+
+    def _table_dict(self, t):
+        table = {}
+        table["rows"] = t.rowcount
+        if t.row_privacy is not None:
+            table["row_privacy"] = t.row_privacy
+        if t.max_ids is not None:
+            table["max_ids"] = t.max_ids
+        if t.sample_max_ids is not None:
+            table["sample_max_ids"] = t.sample_max_ids
+        if t.rows_exact is not None:
+            table["rows_exact"] = t.rows_exact
+        if t.use_dpsu is not None:
+            table["use_dpsu"] = t.use_dpsu
+        if t.clamp_counts is not None:
+            table["clamp_counts"] = t.clamp_counts
+        if t.clamp_columns is not None:
+            table["clamp_columns"] = t.clamp_columns
+        if t.censor_dims is not None:
+            table["censor_dims"] = t.censor_dims
+
+        for c in t.columns():
+            cname = c.name
+            if cname in table:
+                raise ValueError(
+                    "Duplicate column name {0} in table {1}".format(cname, t.name)
+                )
+            table[cname] = {}
+            column = table[cname]
+            if hasattr(c, "card"):
+                column["cardinality"] = c.card
+            if hasattr(c, "lower") and c.lower is not None:
+                column["lower"] = c.lower
+            if hasattr(c, "upper") and c.upper is not None:
+                column["upper"] = c.upper
+            if hasattr(c, "nullable") and c.nullable is not None:
+                column["nullable"] = c.nullable
+            if hasattr(c, "missing_value") and c.missing_value is not None:
+                column["missing_value"] = c.missing_value
+            if hasattr(c, "sensitivity") and c.sensitivity is not None:
+                column["sensitivity"] = c.sensitivity
+            if c.is_key is not None and c.is_key == True:
+                column["private_id"] = c.is_key
+            if type(c) is String:
+                column["type"] = "string"
+            elif type(c) is Int:
+                column["type"] = "int"
+            elif type(c) is Float:
+                column["type"] = "float"
+            elif type(c) is Boolean:
+                column["type"] = "boolean"
+            elif type(c) is DateTime:
+                column["type"] = "datetime"
+            elif type(c) is Unknown:
+                column["type"] = "unknown"
+            else:
+                raise ValueError("Unknown column type: " + str(type(c)))
+        return table
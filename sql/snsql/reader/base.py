@@ -1,6 +1,3 @@
-import pandas as pd
-
-
 class Reader:
     ENGINE = None
 
@@ -12,6 +9,7 @@ class Reader:
         raise NotImplementedError("Execute must be implemented on the inherited class")
 
     def _to_df(self, rows):
+        import pandas as pd
         #  always assumes the first row is column names
         if hasattr(rows, 'toLocalIterator'):  # it's RDD
             if hasattr(rows, 'columns'):
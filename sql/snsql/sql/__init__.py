@@ -1 +1,5 @@
-from .private_reader import PrivateReader
\ No newline at end of file
+def __getattr__(name):
+    if name == "PrivateReader":
+        from .private_reader import PrivateReader
+        return PrivateReader
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,5 +2,6 @@ from .laplace import Laplace
 from .discrete_laplace import DiscreteLaplace
 from .discrete_gaussian import DiscreteGaussian
 from .base import Mechanism, Unbounded
+from .cache import ScaleCache, scale_cache
 
 __all__ = ["Laplace", "DiscreteLaplace", "DiscreteGaussian", "Mechanism", "Unbounded",]
@@ -2,12 +2,14 @@ import numpy as np
 from opendp.mod import enable_features
 from opendp.meas import make_base_laplace
 
+_bins = 64
+
 def quantile(vals, alpha, epsilon, lower, upper):
     """Estimate the quantile.
     from: http://cs-people.bu.edu/ads22/pubs/2011/stoc194-smith.pdf
 
-    :param vals: A list of values.  Must be numeric.
-    :param alpha: The quantile to estimate, between 0.0 and 1.0.  
+    :param vals: A list or array of values.  Must be numeric.
+    :param alpha: The quantile to estimate, between 0.0 and 1.0.
     For example, 0.5 is the median.
     :param epsilon: The privacy budget to spend estimating the quantile.
     :param lower: A bounding parameter.  The quantile will be estimated only for values
@@ -21,73 +23,76 @@ def quantile(vals, alpha, epsilon, lower, upper):
         vals = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
         median = quantile(vals, 0.5, 0.1, 0, 100)
     """
+    vals = np.sort(np.clip(np.asarray(vals, dtype=float), lower, upper))
     k = len(vals)
-    vals = [lower if v < lower else upper if v > upper else v for v in vals]
-    vals = sorted(vals)
-    Z = [lower] + vals + [upper]
-    Z = [-lower + v for v in Z]  # shift right to be 0 bounded
-    y = [
-        (Z[i + 1] - Z[i]) * np.exp(-epsilon * np.abs(i - alpha * k))
-        for i in range(len(Z) - 1)
-    ]
-    y_sum = sum(y)
-    p = [v / y_sum for v in y]
-    idx = np.random.choice(range(k + 1), 1, False, p)[0]
+    Z = np.concatenate([[lower], vals, [upper]]) - lower  # shift right to be 0 bounded
+    gaps = np.diff(Z)
+    # weight each gap in log space, so that no gap underflows before normalizing
+    with np.errstate(divide="ignore"):
+        log_y = np.log(gaps) - epsilon * np.abs(np.arange(k + 1) - alpha * k)
+    y = np.exp(log_y - np.max(log_y))
+    p = y / np.sum(y)
+    idx = np.random.choice(k + 1, 1, False, p)[0]
     v = np.random.uniform(Z[idx], Z[idx + 1])
     return v + lower
 
-def approx_bounds(vals, epsilon):
-    """Estimate the minimium and maximum values of a list of values.
-    from: https://desfontain.es/thesis/Usability.html#usability-u-ding-
+def _edges(idx):
+    bins = _bins
+    if idx == bins:
+        return (0.0, 1.0)
+    elif idx > bins:
+        return (2.0 ** (idx - bins - 1), 2.0 ** (idx - bins))
+    elif idx == bins - 1:
+        return (-1.0, -0.0)
+    else:
+        return (-1 * 2.0 ** np.abs(bins - idx - 1), -1 * 2.0 ** np.abs(bins - idx - 2))
+
+def bounds_histogram(vals):
+    """Count values into the log-scaled bins used by ``approx_bounds``.
+    Histograms of disjoint chunks of a column can be added together, and
+    the sum passed to ``approx_bounds_from_histogram``.
+
+    :param vals: A list or array of values.  Must be numeric.  NaN values are skipped.
+    :return: An array of 128 bin counts.
 
-    :param vals: A list of values.  Must be numeric.
+    .. code-block:: python
+
+        hist = sum(bounds_histogram(chunk['income'].to_numpy()) for chunk in chunks)
+        lower, upper = approx_bounds_from_histogram(hist, 0.1)
+    """
+    bins = _bins
+    vals = np.asarray(vals, dtype=float).reshape(-1)
+    vals = vals[~np.isnan(vals)]
+    idx = np.empty(len(vals), dtype=np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pos = vals >= 1.0
+        idx[pos] = np.trunc(np.log2(vals[pos])).astype(np.int64) + bins + 1
+        small = (vals >= 0) & (vals < 1.0)
+        idx[small] = bins
+        small_neg = (vals < 0) & (vals >= -1.0)
+        idx[small_neg] = bins - 1
+        neg = vals < -1.0
+        idx[neg] = bins - np.trunc(np.log2(-vals[neg] + 1)).astype(np.int64) - 1
+    # values beyond the outermost bins are not counted
+    idx = idx[(idx > 0) & (idx < bins * 2)]
+    return np.bincount(idx, minlength=bins * 2).astype(float)
+
+def approx_bounds_from_histogram(hist, epsilon):
+    """Estimate the minimum and maximum values from a histogram built by ``bounds_histogram``.
+
+    :param hist: An array of 128 bin counts.
     :param epsilon: The privacy budget to spend estimating the bounds.
     :return: A tuple of the estimated minimum and maximum values.
-
-    .. code-block:: python
-    
-        vals = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
-        lower, upper = approx_bounds(vals, 0.1)
     """
-    bins = 64
-    hist = [0.0] * bins * 2
-
-    def edges(idx):
-        if idx == bins:
-            return (0.0, 1.0)
-        elif idx > bins:
-            return (2.0 ** (idx - bins - 1), 2.0 ** (idx - bins))
-        elif idx == bins - 1:
-            return (-1.0, -0.0)
-        else:
-            return (-1 * 2.0 ** np.abs(bins - idx - 1), -1 * 2.0 ** np.abs(bins - idx - 2))
-
-    # compute histograms
-    for v in vals:
-        if v >= 0 and v < 1.0:
-            bin = bins
-            hist[bin] += 1
-        elif v >= 1.0:
-            bin = int(np.trunc(np.log2(v))) + bins + 1
-            if bin < len(hist):
-                hist[bin] += 1
-        elif v < 0 and v >= -1.0:
-            bin = bins - 1
-            hist[bin] += 1
-        else:
-            bin = bins - int(np.trunc(np.log2(-v + 1))) - 1
-            if bin > 0:
-                hist[bin] += 1
-
-        # for testing
-        l, u = edges(bin)
-        assert(l <= v < u)
+    hist = np.asarray(hist, dtype=float)
+    if hist.shape != (_bins * 2,):
+        raise ValueError(f"Histogram must have {_bins * 2} bins")
 
     enable_features('floating-point', 'contrib')
     discovered_scale = 1.0 / epsilon
 
-    meas = make_base_laplace(discovered_scale)
-    hist = [meas(v) for v in hist]
+    meas = make_base_laplace(discovered_scale, D="VectorDomain<AllDomain<f64>>")
+    hist = np.array(meas(hist.tolist()))
     n_bins = len(hist)
 
     failure_prob = 10E-9
@@ -97,13 +102,47 @@ def approx_bounds(vals, epsilon):
     while len(exceeds) < 1 and failure_prob <= highest_failure_prob:
         p = 1 - failure_prob
         K = - np.log(2 - 2 * p ** (1 / (n_bins- 1))) / epsilon
-        exceeds = [idx for idx, v in enumerate(hist) if v > K]
+        exceeds = np.flatnonzero(hist > K)
         failure_prob *= 10
 
     if len(exceeds) == 0:
         return (None, None)
 
-    lower, upper = min(exceeds), max(exceeds)
-    ll, _ = edges(lower)
-    _, uu = edges(upper)
-    return (float(ll), float(uu))
\ No newline at end of file
+    lower, upper = exceeds[0], exceeds[-1]
+    ll, _ = _edges(lower)
+    _, uu = _edges(upper)
+    return (float(ll), float(uu))
+
+def approx_bounds(vals, epsilon):
+    """Estimate the minimium and maximum values of a list of values.
+    from: https://desfontain.es/thesis/Usability.html#usability-u-ding-
+
+    :param vals: A list or array of values.  Must be numeric.
+    :param epsilon: The privacy budget to spend estimating the bounds.
+    :return: A tuple of the estimated minimum and maximum values.
+
+    .. code-block:: python
+
+        vals = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+        lower, upper = approx_bounds(vals, 0.1)
+    """
+    return approx_bounds_from_histogram(bounds_histogram(vals), epsilon)
+
+def approx_bounds_chunks(chunks, epsilon):
+    """Estimate the minimum and maximum values of a column read in chunks,
+    such as ``pd.read_csv(..., chunksize=n)`` or the partitions of a larger
+    dataset.  Only one chunk, and the 128 bin counts, are held in memory.
+
+    :param chunks: An iterable of lists or arrays of numeric values.
+    :param epsilon: The privacy budget to spend estimating the bounds.
+    :return: A tuple of the estimated minimum and maximum values.
+
+    .. code-block:: python
+
+        chunks = (chunk['income'] for chunk in pd.read_csv(path, chunksize=1_000_000))
+        lower, upper = approx_bounds_chunks(chunks, 0.1)
+    """
+    hist = np.zeros(_bins * 2)
+    for chunk in chunks:
+        hist += bounds_histogram(chunk)
+    return approx_bounds_from_histogram(hist, epsilon)
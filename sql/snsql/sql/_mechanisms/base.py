@@ -1,5 +1,22 @@
 from enum import Enum
 import numpy as np
+from .cache import scale_cache
+
+def _integer_values(vals):
+    """
+    Returns values as an int64 array, for discrete mechanisms.  Integers
+    are kept exact, so counts and sums above 2**53 don't pass through
+    float, and other values are rounded.
+    """
+    vals = np.asarray(vals)
+    if vals.dtype.kind in "iub":
+        return vals.astype(np.int64)
+    if vals.dtype.kind == "f":
+        return np.round(vals).astype(np.int64)
+    return np.array([
+        int(v) if isinstance(v, (int, np.integer)) else round(float(v))
+        for v in vals
+    ], dtype=np.int64)
 
 class Mechanism(Enum):
     # gaussian = 1
@@ -36,6 +53,7 @@ class AdditiveNoiseMechanism:
         self.lower = lower
         self.mechanism = mechanism
         self.scale = None
+        self._measurements = {}
         if (upper is None or lower is None) and sensitivity is None:
             raise ValueError("Please pass upper and lower bounds, or pass sensitivity")
         if (upper is not None or lower is not None) and sensitivity is not None:
@@ -44,8 +62,39 @@ class AdditiveNoiseMechanism:
             # better to just pass in bounds
             self.lower = 0
             self.upper = sensitivity
+    def __getstate__(self):
+        # OpenDP measurements wrap native pointers, so they are rebuilt after unpickling
+        state = self.__dict__.copy()
+        state['_measurements'] = {}
+        return state
     def _compute_noise_scale(self):
         raise NotImplementedError("Implement _compute_noise_scale in inherited class")
+    def _cached_scale(self, search, check):
+        """
+        Returns the noise scale for this mechanism's parameters, calling
+        search() only if no other mechanism has discovered it yet.  A scale
+        loaded from a file is used only if check(scale) returns True.
+        """
+        key = (
+            self.mechanism.name,
+            float(self.lower),
+            float(self.upper),
+            int(self.max_contrib),
+            float(self.epsilon),
+            float(self.delta)
+        )
+        return scale_cache.get_or_compute(key, search, check)
+    def _make_measurement(self, vector):
+        raise NotImplementedError("Implement _make_measurement in inherited class")
+    def _get_measurement(self, vector=False):
+        """
+        Returns the OpenDP measurement for the current scale, building it on
+        first use.  Pass vector=True to get a measurement over a vector of values.
+        """
+        key = (self.scale, vector)
+        if key not in self._measurements:
+            self._measurements[key] = self._make_measurement(vector)
+        return self._measurements[key]
     @property
     def threshold(self):
         raise ValueError(f"We do not support threshold censoring of rare dimensions for {self.mechanism}.  If you need thresholding, use laplace or analytic gaussian")
@@ -53,9 +102,16 @@ class AdditiveNoiseMechanism:
         """
         Adds noise and releases values.
 
-        Values must be pre-aggregated.
+        Values must be pre-aggregated.  Accepts a list or NumPy array
+        of values, and releases the whole column in one call.
         """
         raise NotImplementedError("Please implement release on the derived class")
+    def release_array(self, vals):
+        """
+        Adds noise to a buffer of pre-aggregated values, such as a NumPy array,
+        array.array or memoryview, and returns the noisy values as a NumPy array.
+        """
+        return np.array(self.release(vals))
     
 class Unbounded(AdditiveNoiseMechanism):
     def __init__(
@@ -0,0 +1,195 @@
+import atexit
+import functools
+import json
+import math
+import os
+import tempfile
+import threading
+import warnings
+from collections import OrderedDict
+
+# bumped whenever the layout of saved files changes
+FORMAT_VERSION = 1
+
+@functools.lru_cache(maxsize=None)
+def _opendp_version():
+    # scales are searched with OpenDP, so files from other versions are not reused
+    try:
+        from importlib.metadata import version
+        return version("opendp")
+    except Exception:
+        return None
+
+def _check_scale(scale):
+    if isinstance(scale, bool) or not isinstance(scale, (int, float)):
+        raise ValueError(f"Noise scale must be a number: {scale!r}")
+    scale = float(scale)
+    if not math.isfinite(scale) or scale <= 0.0:
+        raise ValueError(f"Noise scale must be finite and positive: {scale}")
+    return scale
+
+def _check_key(key):
+    if not isinstance(key, (list, tuple)) or len(key) != 6:
+        raise ValueError(f"Scale cache key must have 6 parts: {key!r}")
+    mech, lower, upper, max_contrib, epsilon, delta = key
+    numbers = [lower, upper, max_contrib, epsilon, delta]
+    if not isinstance(mech, str) or any([isinstance(n, bool) or not isinstance(n, (int, float)) for n in numbers]):
+        raise ValueError(f"Scale cache key is malformed: {key!r}")
+    return (mech, float(lower), float(upper), int(max_contrib), float(epsilon), float(delta))
+
+class ScaleCache:
+    """
+    Process-wide LRU cache of noise scales discovered by binary search.
+
+    Keys are tuples of (mechanism, lower, upper, max_contrib, epsilon, delta).
+    If a path is supplied, the cache is loaded from that JSON file, and new
+    scales are saved back every save_every discoveries, on flush(), and at
+    exit, so that searches survive a restart.  Saved files record the file
+    format and OpenDP version, and files from other versions are ignored.
+    Scales loaded from a file are checked against the mechanism's privacy
+    map the first time get_or_compute uses them, and dropped if they fail.
+
+    .. code-block:: python
+
+        from snsql.sql._mechanisms import scale_cache
+        scale_cache.persist('/var/cache/snsql/scales.json')
+    """
+    def __init__(self, max_size=4096, path=None, save_every=64):
+        self.max_size = max_size
+        self.save_every = save_every
+        self.path = None
+        self.hits = 0
+        self.misses = 0
+        self._scales = OrderedDict()
+        self._unchecked = set()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+        self._at_exit = False
+        if path is not None:
+            self.persist(path)
+    def __len__(self):
+        return len(self._scales)
+    def __contains__(self, key):
+        return key in self._scales
+    def get(self, key, check=None):
+        """
+        Returns the cached scale for key, or None.  If check is passed, a
+        scale loaded from a file is first passed to check(scale), and is
+        dropped unless check returns True.
+        """
+        with self._lock:
+            if key not in self._scales:
+                self.misses += 1
+                return None
+            self._scales.move_to_end(key)
+            scale = self._scales[key]
+            unchecked = key in self._unchecked
+            if not unchecked or check is None:
+                self.hits += 1
+                return scale
+        try:
+            passed = check(scale) is True
+        except Exception:
+            passed = False
+        with self._lock:
+            if passed:
+                self.hits += 1
+                self._unchecked.discard(key)
+                return scale
+            self.misses += 1
+            self._unchecked.discard(key)
+            if self._scales.get(key) == scale:
+                del self._scales[key]
+        warnings.warn(f"Dropping cached noise scale {scale} for {key}, which doesn't meet the privacy guarantee")
+        return None
+    def put(self, key, scale):
+        scale = _check_scale(scale)
+        with self._lock:
+            self._unchecked.discard(key)
+            self._scales[key] = scale
+            self._scales.move_to_end(key)
+            while len(self._scales) > self.max_size:
+                self._scales.popitem(last=False)
+            self._unsaved += 1
+            due = self._unsaved >= self.save_every
+        if due:
+            self.flush()
+    def get_or_compute(self, key, search, check=None):
+        """
+        Returns the cached scale for key, calling search() to discover
+        and cache the scale on a miss.  Scales loaded from a file are
+        checked with check(scale), as in get.
+        """
+        scale = self.get(key, check)
+        if scale is None:
+            scale = search()
+            self.put(key, scale)
+        return scale
+    def clear(self):
+        with self._lock:
+            self._scales.clear()
+            self._unchecked.clear()
+            self.hits = 0
+            self.misses = 0
+    def persist(self, path):
+        """
+        Load any scales already saved at path, and save new scales there from now on.
+        Pass None to stop persisting.
+        """
+        self.flush()
+        self.path = path
+        if path is not None:
+            if not self._at_exit:
+                atexit.register(self.flush)
+                self._at_exit = True
+            if os.path.exists(path):
+                self.load(path)
+    def flush(self):
+        """
+        Save any scales discovered since the last save.
+        """
+        with self._lock:
+            path, unsaved = self.path, self._unsaved
+            self._unsaved = 0
+        if path is not None and unsaved:
+            self.save(path)
+    def load(self, path):
+        """
+        Load scales saved at path.  Raises ValueError if any entry is not a
+        valid key with a finite, positive scale, and ignores files saved by
+        another format or OpenDP version.
+        """
+        with open(path, "r") as f:
+            saved = json.load(f)
+        if not isinstance(saved, dict) or saved.get("format") != FORMAT_VERSION or saved.get("opendp") != _opendp_version():
+            warnings.warn(f"Ignoring noise scales saved at {path} by another version")
+            return
+        entries = saved.get("scales")
+        if not isinstance(entries, list):
+            raise ValueError(f"No list of scales in {path}")
+        loaded = []
+        for entry in entries:
+            if not isinstance(entry, list) or len(entry) != 2:
+                raise ValueError(f"Scale cache entry is malformed: {entry!r}")
+            loaded.append((_check_key(entry[0]), _check_scale(entry[1])))
+        for key, scale in loaded:
+            self._put_loaded(key, scale)
+    def _put_loaded(self, key, scale):
+        # add without saving, used when loading from disk
+        with self._lock:
+            if key not in self._scales:
+                self._scales[key] = scale
+                self._unchecked.add(key)
+            while len(self._scales) > self.max_size:
+                self._scales.popitem(last=False)
+    def save(self, path):
+        with self._lock:
+            entries = [[list(key), scale] for key, scale in self._scales.items()]
+        saved = {"format": FORMAT_VERSION, "opendp": _opendp_version(), "scales": entries}
+        folder = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(saved, f)
+        os.replace(tmp_path, path)
+
+scale_cache = ScaleCache()
@@ -1,11 +1,6 @@
 import math
 
-from opendp.trans import make_bounded_sum, make_clamp
-from .base import AdditiveNoiseMechanism, Mechanism
-from opendp.mod import binary_search_param, enable_features
-from opendp.meas import make_base_discrete_gaussian, make_base_gaussian
-from opendp.accuracy import gaussian_scale_to_accuracy
-from opendp.comb import make_zCDP_to_approxDP, make_fix_delta
+from .base import AdditiveNoiseMechanism, Mechanism, _integer_values
 from .normal import _normal_dist_inv_cdf
 
 class DiscreteGaussian(AdditiveNoiseMechanism):
@@ -35,22 +30,30 @@ class DiscreteGaussian(AdditiveNoiseMechanism):
         rough_scale = float(upper - lower) * max_contrib * math.sqrt(2.0 * math.log(1.25 / self.delta)) / self.epsilon
         if rough_scale > 10_000_000:
             raise ValueError(f"Noise scale is too large using epsilon={self.epsilon} and bounds ({lower}, {upper}) with {self.mechanism}.  Try preprocessing to reduce senstivity, or try different privacy parameters.")
-        enable_features('floating-point', 'contrib')
-        bounded_sum = (
-            make_clamp(bounds=bounds) >>
-            make_bounded_sum(bounds=bounds)
-        )
-        try:
-            def make_dp_sum(scale):
-                adp = make_zCDP_to_approxDP(make_base_gaussian(scale))
-                return bounded_sum >> make_fix_delta(adp, delta=self.delta)
-            discovered_scale = binary_search_param(
-                lambda s: make_dp_sum(scale=s),
-                d_in=1,
-                d_out=(self.epsilon, self.delta))
-        except Exception as e:
-            raise ValueError(f"Unable to find appropriate noise scale for with {self.mechanism} with epsilon={self.epsilon} and bounds ({lower}, {upper}).  Try preprocessing to reduce senstivity, or try different privacy parameters.\n{e}")
-        self.scale = discovered_scale
+        def make_dp_sum(scale):
+            from opendp.comb import make_fix_delta, make_zCDP_to_approxDP
+            from opendp.mod import enable_features
+            from opendp.meas import make_base_gaussian
+            from opendp.trans import make_bounded_sum, make_clamp
+            enable_features('floating-point', 'contrib')
+            bounded_sum = (
+                make_clamp(bounds=bounds) >>
+                make_bounded_sum(bounds=bounds)
+            )
+            adp = make_zCDP_to_approxDP(make_base_gaussian(scale))
+            return bounded_sum >> make_fix_delta(adp, delta=self.delta)
+        def search():
+            from opendp.mod import binary_search_param
+            try:
+                return binary_search_param(
+                    make_dp_sum,
+                    d_in=1,
+                    d_out=(self.epsilon, self.delta))
+            except Exception as e:
+                raise ValueError(f"Unable to find appropriate noise scale for with {self.mechanism} with epsilon={self.epsilon} and bounds ({lower}, {upper}).  Try preprocessing to reduce senstivity, or try different privacy parameters.\n{e}")
+        def check(scale):
+            return make_dp_sum(scale).check(1, (self.epsilon, self.delta))
+        self.scale = self._cached_scale(search, check)
     @property
     def threshold(self):
         max_contrib = self.max_contrib
@@ -59,11 +62,18 @@ class DiscreteGaussian(AdditiveNoiseMechanism):
             raise ValueError("censor_dims requires delta to be > 0.0  Try delta=1/n*sqrt(n) where n is the number of individuals")
         thresh = 1 + self.scale * _normal_dist_inv_cdf((1 - delta / 2) ** (1 / max_contrib))
         return thresh
-    def release(self, vals):
+    def _make_measurement(self, vector):
+        from opendp.mod import enable_features
+        from opendp.meas import make_base_discrete_gaussian
         enable_features('contrib')
-        meas = make_base_discrete_gaussian(self.scale)
-        vals = [meas(int(round(v))) for v in vals]
-        return vals
+        if vector:
+            return make_base_discrete_gaussian(self.scale, D="VectorDomain<AllDomain<i64>>")
+        return make_base_discrete_gaussian(self.scale)
+    def release(self, vals):
+        meas = self._get_measurement(vector=True)
+        vals = _integer_values(vals)
+        return meas(vals.tolist())
     def accuracy(self, alpha):
+        from opendp.accuracy import gaussian_scale_to_accuracy
         return gaussian_scale_to_accuracy(self.scale, alpha)
         
@@ -1,10 +1,7 @@
 import math
+import numpy as np
 
-from opendp.trans import make_bounded_sum, make_clamp
 from .base import AdditiveNoiseMechanism, Mechanism
-from opendp.mod import binary_search_param, enable_features
-from opendp.meas import make_base_laplace
-from opendp.accuracy import laplacian_scale_to_accuracy
 
 class Laplace(AdditiveNoiseMechanism):
     def __init__(
@@ -34,20 +31,29 @@ class Laplace(AdditiveNoiseMechanism):
         search_upper = rough_scale * 10E+6
         search_lower = rough_scale / 10E+6
 
-        enable_features('floating-point', 'contrib')
-        bounded_sum = (
-            make_clamp(bounds=bounds) >>
-            make_bounded_sum(bounds=bounds)
-        )
-        try:
-            discovered_scale = binary_search_param(
-                lambda s: bounded_sum >> make_base_laplace(scale=s),
-                bounds=(search_lower, search_upper),
-                d_in=max_contrib,
-                d_out=(self.epsilon))
-        except Exception as e:
-            raise ValueError(f"Unable to find appropriate noise scale for {self.mechanism} with epsilon={self.epsilon} and bounds ({lower}, {upper}).  Try preprocessing to reduce senstivity, or try different privacy parameters.\n{e}")
-        self.scale = discovered_scale
+        def make_dp_sum(scale):
+            from opendp.mod import enable_features
+            from opendp.meas import make_base_laplace
+            from opendp.trans import make_bounded_sum, make_clamp
+            enable_features('floating-point', 'contrib')
+            bounded_sum = (
+                make_clamp(bounds=bounds) >>
+                make_bounded_sum(bounds=bounds)
+            )
+            return bounded_sum >> make_base_laplace(scale=scale)
+        def search():
+            from opendp.mod import binary_search_param
+            try:
+                return binary_search_param(
+                    make_dp_sum,
+                    bounds=(search_lower, search_upper),
+                    d_in=max_contrib,
+                    d_out=(self.epsilon))
+            except Exception as e:
+                raise ValueError(f"Unable to find appropriate noise scale for {self.mechanism} with epsilon={self.epsilon} and bounds ({lower}, {upper}).  Try preprocessing to reduce senstivity, or try different privacy parameters.\n{e}")
+        def check(scale):
+            return make_dp_sum(scale).check(max_contrib, self.epsilon)
+        self.scale = self._cached_scale(search, check)
     @property
     def threshold(self):
         max_contrib = float(self.max_contrib)
@@ -58,10 +64,17 @@ class Laplace(AdditiveNoiseMechanism):
         log_term = math.log(2 * delta / max_contrib) 
         thresh = max_contrib * (1 - ( log_term / epsilon))
         return thresh
-    def release(self, vals):
+    def _make_measurement(self, vector):
+        from opendp.mod import enable_features
+        from opendp.meas import make_base_laplace
         enable_features('floating-point', 'contrib')
-        meas = make_base_laplace(self.scale)
-        vals = [meas(float(v)) for v in vals]
-        return vals
+        if vector:
+            return make_base_laplace(self.scale, D="VectorDomain<AllDomain<f64>>")
+        return make_base_laplace(self.scale)
+    def release(self, vals):
+        meas = self._get_measurement(vector=True)
+        vals = np.asarray(vals, dtype=float)
+        return meas(vals.tolist())
     def accuracy(self, alpha):
+        from opendp.accuracy import laplacian_scale_to_accuracy
         return laplacian_scale_to_accuracy(self.scale, alpha)
@@ -1,7 +1,7 @@
 import pandas as pd
+import numpy as np
 import math
 import random
-from collections import defaultdict
 
 from snsql.sql.parse import QueryParser
 from snsql._ast.ast import Table
@@ -10,37 +10,88 @@ from ._mechanisms.rand import laplace
 sys_rand = random.SystemRandom()
 
 
-def preprocess_df_from_query(schema, df, query_string):
+def _query_columns(schema, query_string):
     """
-    Returns a dataframe with user_id | tuple based on query grouping keys.
+    Returns the private key column and the grouping columns of a query.
     """
     qp = QueryParser(schema)
     q = qp.query(query_string)
-    queries = qp.queries(query_string)
-    query_ast = queries[0]
 
-    group_cols = [ge.expression.name for ge in query_ast.agg.groupingExpressions]
+    group_cols = [ge.expression.name for ge in q.agg.groupingExpressions]
     table_name = q.source.find_node(Table).name
     key_col = schema[table_name].key_cols()[0].name
+    return key_col, group_cols
+
+
+def preprocess_df_from_query(schema, df, query_string):
+    """
+    Returns a dataframe with user_id | tuple based on query grouping keys.
+    """
+    key_col, group_cols = _query_columns(schema, query_string)
 
     preprocessed_df = pd.DataFrame()
     preprocessed_df[key_col] = df[key_col]
-    preprocessed_df["group_cols"] = tuple(df[group_cols].values.tolist())
+    preprocessed_df["group_cols"] = pd.MultiIndex.from_frame(df[group_cols]).tolist()
 
     return preprocessed_df
 
 
-def policy_laplace(df, epsilon, delta, max_contrib):
+class _Codes:
     """
-    Differentially Private Set Union: https://arxiv.org/abs/2002.09745
+    Assigns stable integer codes to values seen across chunks.
+    """
+    def __init__(self):
+        self.index = None
+    def encode(self, codes, uniques):
+        if self.index is None:
+            self.index = uniques
+            return codes.astype(np.int64)
+        lookup = self.index.get_indexer(uniques)
+        new = lookup < 0
+        if new.any():
+            lookup[new] = len(self.index) + np.arange(new.sum())
+            self.index = self.index.append(uniques[new])
+        return lookup[codes]
+
+
+def _factorize_rows(df, columns):
+    """
+    Returns a code per row for the tuple of values in columns, and a
+    MultiIndex of the distinct tuples, without building a tuple per row.
+    """
+    codes = np.zeros(len(df), dtype=np.int64)
+    for col in columns:
+        col_codes, col_uniques = pd.factorize(df[col], use_na_sentinel=False)
+        codes, _ = pd.factorize(codes * len(col_uniques) + col_codes)
+    _, first = np.unique(codes, return_index=True)
+    return codes, pd.MultiIndex.from_frame(df[columns].iloc[first])
 
-    Given a database of n users, each with a subset of items,
-    (epsilon, delta)-differentially private algorithm that outputs the largest possible set of the
-    the union of these items.
 
-    df: pandas df with user_id | item where item is a tuple
-    max_contrib: maximum number of items a user can contribute
-    epsilon/delta: privacy parameters
+def _user_items(chunks, key_col, group_cols):
+    """
+    Factorizes user ids and grouping tuples from an iterable of dataframes.
+    Returns integer user and item codes, one per row with a non-null user,
+    and indexes of the user ids and grouping tuples the codes refer to.
+    """
+    users = _Codes()
+    items = _Codes()
+    user_codes = []
+    item_codes = []
+    for chunk in chunks:
+        u_codes, u_uniques = pd.factorize(chunk[key_col])
+        i_codes, i_uniques = _factorize_rows(chunk, group_cols)
+        keep = u_codes >= 0
+        user_codes.append(users.encode(u_codes[keep], pd.Index(u_uniques)))
+        item_codes.append(items.encode(i_codes[keep], i_uniques))
+    if not user_codes:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), pd.Index([]), pd.MultiIndex.from_tuples([], names=group_cols)
+    return np.concatenate(user_codes), np.concatenate(item_codes), users.index, items.index
+
+
+def _select_items(users, items, n_users, n_items, epsilon, delta, max_contrib):
+    """
+    Runs the Laplace update policy over integer user and item codes, and
+    returns a boolean mask over item codes marking the released items.
     """
     alpha = 3.0
     lambd = 1 / epsilon
@@ -51,65 +102,108 @@ def policy_laplace(df, epsilon, delta, max_contrib):
     rho = max(rho)
     gamma = rho + alpha * lambd
 
-    histogram = defaultdict(float)
-
-    key_col = df.columns[0]
-    df["hash"] = df[key_col].apply(lambda x: hash(str(x)))
-    df = df.sort_values("hash")
+    # visit users in random order, and keep at most max_contrib random rows per user
+    rng = np.random.default_rng(sys_rand.getrandbits(128))
+    user_rank = rng.permutation(n_users)[users]
+    order = np.lexsort((rng.random(len(users)), user_rank))
+    users = users[order]
+    items = items[order]
+    starts = np.flatnonzero(np.r_[True, users[1:] != users[:-1]])
+    sizes = np.diff(np.r_[starts, len(users)])
+    position = np.arange(len(users)) - np.repeat(starts, sizes)
+    keep = position < max_contrib
+    users = users[keep]
+    items = items[keep]
+
+    # a user's sampled rows may repeat an item
+    _, first = np.unique(users * n_items + items, return_index=True)
+    first.sort()
+    users = users[first]
+    items = items[first]
+    indptr = np.r_[0, np.flatnonzero(users[1:] != users[:-1]) + 1, len(users)].tolist()
+
+    histogram = [0.0] * n_items
+    item_list = items.tolist()
+    for start, end in zip(indptr[:-1], indptr[1:]):
+        costs = []
+        for item in item_list[start:end]:
+            if histogram[item] < gamma:
+                costs.append((gamma - histogram[item], item))
+        costs.sort()
+
+        # raise the lowest weights first, until the budget of 1 is spent
+        budget = 1.0
+        level = 0.0
+        k = len(costs)
+        for idx, (cost, item) in enumerate(costs):
+            step = (cost - level) * k
+            if step <= budget:
+                histogram[item] += cost
+                budget -= step
+                level = cost
+                k -= 1
+            else:
+                fill = level + budget / k
+                for _, remaining_item in costs[idx:]:
+                    histogram[remaining_item] += fill
+                break
 
-    for idx, group in df.groupby(key_col):
-        items = list(group["group_cols"])
+    seen = np.zeros(n_items, dtype=bool)
+    seen[items] = True
+    weights = np.array(histogram)
+    seen_idx = np.flatnonzero(seen)
+    weights[seen_idx] += laplace(0, lambd, len(seen_idx))
+    return seen & (weights > rho)
 
-        if len(items) > max_contrib:
-            items = sys_rand.sample(items, max_contrib)
 
-        cost_dict = {}
-        for item in items:
-            if histogram[item] < gamma:
-                cost_dict[item] = gamma - histogram[item]
+def policy_laplace(df, epsilon, delta, max_contrib):
+    """
+    Differentially Private Set Union: https://arxiv.org/abs/2002.09745
 
-        budget = 1
-        k = len(cost_dict)
+    Given a database of n users, each with a subset of items,
+    (epsilon, delta)-differentially private algorithm that outputs the largest possible set of the
+    the union of these items.
 
-        sorted_items = [k for k, v in sorted(cost_dict.items(), key=lambda item: item[1])]
+    df: pandas df with user_id | item where item is a tuple
+    max_contrib: maximum number of items a user can contribute
+    epsilon/delta: privacy parameters
+    """
+    key_col = df.columns[0]
+    users, user_values = pd.factorize(df[key_col])
+    items, item_values = pd.factorize(df["group_cols"])
+    keep = users >= 0
+    selected = _select_items(
+        users[keep], items[keep], len(user_values), len(item_values), epsilon, delta, max_contrib
+    )
+    return df[keep & selected[items]]
 
-        for idx, curr_item in enumerate(sorted_items):
-            cost = (
-                cost_dict[curr_item] * k
-            )  # cost of increasing weights of remaining k items by cost_dict[curr_item]
-            if cost <= budget:
-                # update weights of remaining k items with cost_dict[curr_item]
-                for j in range(idx, k):
-                    remaining_item = sorted_items[j]
-                    histogram[remaining_item] += cost_dict[curr_item]
-                    cost_dict[remaining_item] -= cost_dict[curr_item]
 
-                budget -= cost
-                k -= 1
-            else:
-                # update weights of remaining k items with budget / k
-                for j in range(idx, k):
-                    remaining_item = sorted_items[j]
-                    histogram[remaining_item] += budget / k
-                break
+def run_dpsu_chunks(chunks, key_col, group_cols, epsilon, delta=math.exp(-10), max_contrib=5):
+    """
+    Differentially Private Set Union over data too large to hold in memory at once.
 
-    items = []
-    for item in histogram.keys():
-        histogram[item] += laplace(0, lambd, 1)[0]
-        if histogram[item] > rho:
-            items.append(item)
+    chunks: an iterable of dataframes, such as pd.read_csv(..., chunksize=n)
+    key_col: the column identifying the user
+    group_cols: the columns that make up each item
 
-    df = df[df["group_cols"].isin(items)]
-    return df
+    Returns a list of the released item tuples.  Only integer codes for each
+    row are kept between chunks.
+    """
+    users, items, user_values, item_values = _user_items(chunks, key_col, group_cols)
+    selected = _select_items(users, items, len(user_values), len(item_values), epsilon, delta, max_contrib)
+    return item_values[np.flatnonzero(selected)].tolist()
 
 
 def run_dpsu(schema, input_df, query, epsilon, delta=math.exp(-10), max_contrib=5):
-    preprocessed_df = preprocess_df_from_query(schema, input_df, query)
+    key_col, group_cols = _query_columns(schema, query)
 
-    dpsu_df = policy_laplace(preprocessed_df, epsilon, delta, max_contrib)
+    users, items, user_values, item_values = _user_items([input_df], key_col, group_cols)
+    selected = _select_items(users, items, len(user_values), len(item_values), epsilon, delta, max_contrib)
 
-    output_df = pd.merge(input_df, dpsu_df, on=dpsu_df.columns[0])
-    output_df.drop(["group_cols", "hash"], axis=1, inplace=True)
-    output_df.drop_duplicates(inplace=True)
+    # keep every row of the users with at least one released item
+    selected_users = np.zeros(len(user_values), dtype=bool)
+    selected_users[users[selected[items]]] = True
+    output_df = input_df[input_df[key_col].isin(user_values[selected_users])]
+    output_df = output_df.reset_index(drop=True).drop_duplicates()
 
     return output_df
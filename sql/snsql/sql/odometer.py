@@ -1,3 +1,6 @@
+import array
+import math
+import threading
 import numpy as np
 from snsql.sql.privacy import Privacy
 
@@ -39,9 +42,15 @@ class OdometerHeterogeneous:
     Implements k-folds heterogeneous composition from Kairouz, et al
     Theorem 3.5
     https://arxiv.org/pdf/1311.0776.pdf
+
+    The sums the bound needs are updated on each spend, so ``spent`` takes
+    constant time however many steps have been spent.  Steps are logged in
+    compact arrays, and can be saved with ``checkpoint`` and reloaded with
+    ``restore``.
     """
     def __init__(self, privacy: Privacy):
-        self.steps = []
+        self._lock = threading.Lock()
+        self._reset_steps()
         self.privacy = privacy
         self.tol = None
         if privacy:
@@ -50,36 +59,94 @@ class OdometerHeterogeneous:
             self.tol = self.privacy.delta / 2
         if self.tol == 0.0:
             self.tol = 10E-16
+    def _reset_steps(self):
+        self._epsilons = array.array('d')
+        self._deltas = array.array('d')
+        self._eps_sum = 0.0
+        self._left_sum = 0.0
+        self._sq_sum = 0.0
+        self._delta_prod = 1.0
+    def _add_step(self, epsilon, delta):
+        self._epsilons.append(epsilon)
+        self._deltas.append(delta)
+        self._eps_sum += epsilon
+        self._left_sum += ((math.exp(epsilon) - 1) * epsilon) / (math.exp(epsilon) + 1)
+        self._sq_sum += epsilon * epsilon
+        self._delta_prod *= (1 - delta)
     def spend(self, privacy: Privacy = None):
-        if privacy:
-            if not self.tol:
-                self.tol = privacy.delta / 2
-            if self.tol > privacy.delta and privacy.delta != 0.0:
-                self.tol = privacy.delta
-            self.steps.append((privacy.epsilon, privacy.delta))
-        elif self.privacy:
-            self.steps.append((self.privacy.epsilon, self.privacy.delta))
-        else:
-            raise ValueError("No privacy information passed in")
+        # readers may spend from several threads at once
+        with self._lock:
+            if privacy:
+                if not self.tol:
+                    self.tol = privacy.delta / 2
+                if self.tol > privacy.delta and privacy.delta != 0.0:
+                    self.tol = privacy.delta
+                self._add_step(privacy.epsilon, privacy.delta)
+            elif self.privacy:
+                self._add_step(self.privacy.epsilon, self.privacy.delta)
+            else:
+                raise ValueError("No privacy information passed in")
     def reset(self):
-        self.steps = []
+        with self._lock:
+            self._reset_steps()
+    @property
+    def steps(self):
+        """The (epsilon, delta) of each step spent, in order."""
+        return list(zip(self._epsilons, self._deltas))
     @property
     def k(self):
-        return len(self.steps)
+        return len(self._epsilons)
     @property
     def spent(self):
-        if self.steps == []:
-            return (0.0, 0.0)
+        with self._lock:
+            if self.k == 0:
+                return (0.0, 0.0)
 
-        # delta
-        delta = 1 - (1 - self.tol) * np.prod([(1 - delta) for _, delta in self.steps])
+            # delta
+            delta = 1 - (1 - self.tol) * self._delta_prod
 
-        # epsilon
-        basic = np.sum([eps for eps, _ in self.steps])
-        optimal_left_side = np.sum([((np.exp(eps) - 1) * eps) / ((np.exp(eps) + 1)) for eps, _ in self.steps])
-        sq = np.sum([eps * eps for eps, _ in self.steps])
-        sqsq = np.sum([2 * eps * eps for eps, _ in self.steps])
-        optimal_a = optimal_left_side + np.sqrt(sqsq * np.log(np.exp(1) + (np.sqrt(sq)/self.tol)))
-        optimal_b = optimal_left_side + np.sqrt(sqsq * np.log(1/self.tol))
-        
-        return tuple([min(basic, optimal_a, optimal_b), delta])
+            # epsilon
+            basic = self._eps_sum
+            optimal_left_side = self._left_sum
+            sq = self._sq_sum
+            sqsq = 2 * sq
+            optimal_a = optimal_left_side + np.sqrt(sqsq * np.log(np.exp(1) + (np.sqrt(sq)/self.tol)))
+            optimal_b = optimal_left_side + np.sqrt(sqsq * np.log(1/self.tol))
+
+            return tuple([min(basic, optimal_a, optimal_b), delta])
+    def checkpoint(self):
+        """
+        Returns the state of the odometer as a dictionary of NumPy arrays,
+        which can be saved with ``np.savez`` and passed to ``restore``.
+        """
+        with self._lock:
+            return {
+                "epsilon": np.frombuffer(self._epsilons, dtype=float).copy(),
+                "delta": np.frombuffer(self._deltas, dtype=float).copy(),
+                "tol": np.array(self.tol if self.tol is not None else np.nan),
+            }
+    def restore(self, checkpoint):
+        """
+        Replaces the steps spent with the steps in a checkpoint from ``checkpoint``.
+        """
+        epsilons = np.asarray(checkpoint["epsilon"], dtype=float)
+        deltas = np.asarray(checkpoint["delta"], dtype=float)
+        if epsilons.shape != deltas.shape or epsilons.ndim != 1:
+            raise ValueError("Checkpoint must have one epsilon and one delta per step")
+        tol = float(checkpoint["tol"])
+        with self._lock:
+            self._reset_steps()
+            self._epsilons.frombytes(epsilons.tobytes())
+            self._deltas.frombytes(deltas.tobytes())
+            self._eps_sum = float(np.sum(epsilons))
+            self._left_sum = float(np.sum(((np.exp(epsilons) - 1) * epsilons) / (np.exp(epsilons) + 1)))
+            self._sq_sum = float(np.sum(epsilons * epsilons))
+            self._delta_prod = float(np.prod(1 - deltas))
+            self.tol = None if np.isnan(tol) else tol
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
@@ -9,26 +9,68 @@ from .parser.SqlSmallVisitor import SqlSmallVisitor  # type: ignore
 from .parser.SqlSmallErrorListener import SyntaxErrorListener  # type: ignore
 
 from antlr4 import *  # type: ignore
+from antlr4.error.ErrorStrategy import BailErrorStrategy  # type: ignore
+from antlr4.error.Errors import ParseCancellationException  # type: ignore
 from snsql._ast.tokens import *
 from snsql._ast.ast import *
 
 
 class QueryParser:
-    def __init__(self, metadata=None):
+    def __init__(self, metadata=None, *ignore, diagnostics=False, index_nodes=False):
+        """Parses SQL text into ASTs.
+
+        :param metadata: Optional metadata used to load symbols on parsed queries.
+        :param diagnostics: If True, always parse with full LL prediction and exact
+            ambiguity detection, reporting ambiguities through DiagnosticErrorListener.
+            By default, queries are parsed with fast SLL prediction, and only fall
+            back to full LL prediction if SLL fails.
+        :param index_nodes: If True, index each parsed query by node type before
+            loading symbols, so that find_nodes and //Type XPath lookups don't
+            walk the tree.  Only use this for trees that won't be changed, or
+            call drop_index on the query before changing it.
+        """
         if metadata:
             self.metadata = Metadata.from_(metadata)
         else:
             self.metadata = None
+        self.diagnostics = diagnostics
+        self.index_nodes = index_nodes
 
-    def start_parser(self, stream):
+    def start_parser(self, stream, sll=False):
         lexer = SqlSmallLexer(stream)
         stream = CommonTokenStream(lexer)
         parser = SqlSmallParser(stream)
-        parser._interp.predictionMode = PredictionMode.LL_EXACT_AMBIG_DETECTION
-        lexer._listeners = [SyntaxErrorListener(), DiagnosticErrorListener()]
-        parser._listeners = [SyntaxErrorListener(), DiagnosticErrorListener()]
+        if sll:
+            # fast path; bail out on the first error so we can retry with full LL
+            parser._interp.predictionMode = PredictionMode.SLL
+            parser._errHandler = BailErrorStrategy()
+            lexer._listeners = [SyntaxErrorListener()]
+            parser._listeners = []
+        elif self.diagnostics:
+            parser._interp.predictionMode = PredictionMode.LL_EXACT_AMBIG_DETECTION
+            lexer._listeners = [SyntaxErrorListener(), DiagnosticErrorListener()]
+            parser._listeners = [SyntaxErrorListener(), DiagnosticErrorListener()]
+        else:
+            parser._interp.predictionMode = PredictionMode.LL
+            lexer._listeners = [SyntaxErrorListener()]
+            parser._listeners = [SyntaxErrorListener()]
         return parser
 
+    def parse_tree(self, stream, rule="batch"):
+        """
+            Parses the stream with the named grammar rule, returning the
+            ANTLR parse tree.  Tries SLL prediction first, and falls back
+            to full LL prediction, with error reporting, if SLL fails.
+        """
+        if not self.diagnostics:
+            parser = self.start_parser(stream, sll=True)
+            try:
+                return getattr(parser, rule)()
+            except (ParseCancellationException, ValueError):
+                stream.seek(0)
+        parser = self.start_parser(stream)
+        return getattr(parser, rule)()
+
     def queries(self, query_string, metadata=None):
         if metadata is None and self.metadata is not None:
             metadata = self.metadata
@@ -36,9 +78,11 @@ class QueryParser:
             metadata = Metadata.from_(metadata)
 
         istream = InputStream(query_string)
-        parser = self.start_parser(istream)
         bv = BatchVisitor()
-        queries = [q for q in bv.visit(parser.batch()).queries]
+        queries = [q for q in bv.visit(self.parse_tree(istream)).queries]
+        if self.index_nodes:
+            for q in queries:
+                q.index_nodes()
         if metadata is not None:
             for q in queries:
                 q.load_symbols(metadata)
@@ -60,26 +104,22 @@ class QueryParser:
             istream = InputStream(query_string)
         else:
             istream = FileStream(query_string)
-        parser = self.start_parser(istream)
-        SqlSmallVisitor().visit(parser.batch())
+        SqlSmallVisitor().visit(self.parse_tree(istream))
         return None
 
     def parse_named_expressions(self, expression_string):
         istream = InputStream(expression_string)
-        parser = self.start_parser(istream)
         nev = NamedExpressionVisitor()
-        return nev.visitNamedExpressionSeq(parser.namedExpressionSeq())
+        return nev.visitNamedExpressionSeq(self.parse_tree(istream, "namedExpressionSeq"))
 
     def parse_expression(self, expression_string):
         istream = InputStream(expression_string)
-        parser = self.start_parser(istream)
         ev = ExpressionVisitor()
-        return ev.visit(parser.expression())
+        return ev.visit(self.parse_tree(istream, "expression"))
 
     def parse_table_name(self, expression_string):
         istream = InputStream(expression_string)
-        parser = self.start_parser(istream)
-        return Identifier(parser.qualifiedTableName().getText())
+        return Identifier(self.parse_tree(istream, "qualifiedTableName").getText())
 
 
 class BatchVisitor(SqlSmallVisitor):
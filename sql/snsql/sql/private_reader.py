@@ -6,11 +6,13 @@ from snsql.sql.odometer import OdometerHeterogeneous
 from snsql.sql.privacy import Privacy, Stat
 
 from snsql.sql.reader.base import SqlReader
-from .dpsu import run_dpsu
 from .private_rewriter import Rewriter
-from .parse import QueryParser
-from .reader import PandasReader
+from .profile import QueryProfile, null_profile
+from .query_cache import QueryCache, normalize_query, privacy_key
+from .shared_scan import merge_subqueries, scan_key, split_exact
+from .vectorize import NotVectorizable, as_columns, compile_expression, truth
 from .reader.base import SortKey
+from .reader.probe import Probe
 
 from snsql._ast.ast import Query, Top
 from snsql._ast.expressions import sql as ast
@@ -19,7 +21,279 @@ from snsql.reader import Reader
 
 from ._mechanisms import *
 
+import copy
+import functools
+import heapq
 import itertools
+import pickle
+import tempfile
+import threading
+import time
+
+def _convert(val, type):
+    if val is None:
+        return None # all columns are nullable
+    if type == "string" or type == "unknown":
+        return str(val)
+    elif type == "int":
+        return int(float(str(val).replace('"', "").replace("'", "")))
+    elif type == "float":
+        return float(str(val).replace('"', "").replace("'", ""))
+    elif type == "boolean":
+        if isinstance(val, int):
+            return val != 0
+        else:
+            return bool(str(val).replace('"', "").replace("'", ""))
+    elif type == "datetime":
+        v = parse_datetime(val)
+        if v is None:
+            raise ValueError(f"Could not parse datetime: {val}")
+        return v
+    else:
+        raise ValueError("Can't convert type " + type)
+
+def _object_array(values):
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+def _convert_column(vals, type):
+    """
+    Converts a column of output values to the output type.  Numeric columns
+    without nulls are converted in one step; anything else is converted value
+    by value, with the same rules as row output.
+    """
+    if type in ["int", "float"]:
+        if vals.dtype == object and not np.equal(vals, None).any():
+            try:
+                vals = vals.astype(float)
+            except (TypeError, ValueError):
+                pass
+        if vals.dtype.kind in "iuf":
+            if type == "float":
+                return vals.astype(float)
+            elif vals.dtype.kind in "iu":
+                return vals.astype(np.int64)
+            elif np.isfinite(vals).all():
+                return np.trunc(vals).astype(np.int64)
+    return _object_array([_convert(val, type) for val in vals])
+
+def _evaluate_outer(query, source_col_names, columns, n_rows):
+    """
+    Evaluates the outer SELECT over the columns of the rewritten subquery,
+    and returns the converted output columns.  Expressions are compiled
+    to run on whole columns where possible, and evaluated row by row otherwise.
+    """
+    out_types = [s.expression.type() for s in query._select_symbols]
+    source_idx = dict((name.lower(), idx) for idx, name in enumerate(source_col_names))
+    bindings = None
+    row_values = None
+    out_columns = []
+    for ne, t in zip(query.select.namedExpressions, out_types):
+        expr = ne.expression
+        if type(expr) is ast.Column and expr.name.lower() in source_idx:
+            vals = columns[source_idx[expr.name.lower()]]
+        else:
+            if bindings is None:
+                bindings = as_columns(source_col_names, columns)
+            try:
+                vals = compile_expression(expr)(bindings, n_rows)
+            except NotVectorizable:
+                if row_values is None:
+                    row_values = [col.tolist() for col in columns]
+                vals = _object_array([
+                    expr.evaluate(dict((name.lower(), col[i]) for name, col in zip(source_col_names, row_values)))
+                    for i in range(n_rows)
+                ])
+        try:
+            out_columns.append(_convert_column(vals, t))
+        except Exception as e:
+            raise ValueError(
+                f"Error converting output column: {e}\n"
+                f"Expecting types {out_types}"
+            )
+    return out_columns
+
+def _filter_having(query, out_col_names, out_columns, n_rows):
+    condition = query.having.condition
+    try:
+        keep = truth(compile_expression(condition)(as_columns(out_col_names, out_columns), n_rows))
+    except NotVectorizable:
+        out_values = [col.tolist() for col in out_columns]
+        keep = np.array([
+            bool(condition.evaluate(dict((name.lower(), col[i]) for name, col in zip(out_col_names, out_values))))
+            for i in range(n_rows)
+        ], dtype=bool)
+    return [col[keep] for col in out_columns]
+
+def _release_columns(columns, mechs, kc_pos, tau):
+    """
+    Adds noise to each column with a single release call, and censors
+    dimensions with a noisy key count at or below tau.
+    """
+    columns = list(columns)
+    for idx, mech in enumerate(mechs):
+        if mech is not None:
+            vals = columns[idx].copy()
+            vals[np.equal(vals, None)] = 0
+            if vals.dtype == object:
+                # integer columns stay int64, so discrete mechanisms get exact values
+                vals = np.array(vals.tolist())
+            if vals.dtype.kind not in "iuf":
+                vals = vals.astype(float)
+            columns[idx] = mech.release_array(vals)
+
+    if tau is not None:
+        keep = columns[kc_pos] > tau
+        columns = [col[keep] for col in columns]
+    return columns
+
+def _postprocess_columns(query, source_col_names, columns, is_count, clamp_counts):
+    """
+    Clamps counts, evaluates the outer SELECT and applies HAVING to noisy
+    columns.  Returns the output columns, before ORDER BY and LIMIT.
+    """
+    if clamp_counts:
+        columns = [
+            _clamp_non_negative(col) if count else col
+            for col, count in zip(columns, is_count)
+        ]
+    n_rows = len(columns[0]) if columns else 0
+    out_columns = _evaluate_outer(query, source_col_names, columns, n_rows)
+    if query.having is not None:
+        out_col_names = [s.name for s in query._select_symbols]
+        out_columns = _filter_having(query, out_col_names, out_columns, n_rows)
+    return out_columns
+
+_spark_types = {
+    "int": "bigint",
+    "float": "double",
+    "string": "string",
+    "boolean": "boolean",
+    "datetime": "timestamp",
+}
+
+def _column_from_series(s):
+    import pandas as pd
+    arr = s.to_numpy(dtype=object)
+    arr[pd.isna(arr)] = None
+    return arr
+
+def _columns_from_rows(rows, n_cols):
+    columns = [_object_array(col) for col in zip(*rows)]
+    if len(columns) == 0:
+        columns = [_object_array([]) for _ in range(n_cols)]
+    return columns
+
+def _rows_from_columns(columns):
+    return [list(row) for row in zip(*[col.tolist() for col in columns])]
+
+def _concat_columns(a, b):
+    if a.dtype == object or b.dtype == object:
+        return _object_array(a.tolist() + b.tolist())
+    return np.concatenate([a, b])
+
+def _columns_from_out_rows(rows, out_types):
+    columns = []
+    for col, t in zip(zip(*rows), out_types):
+        if t == "float":
+            columns.append(np.array(col, dtype=float))
+        elif t == "int" and None not in col:
+            columns.append(np.array(col, dtype=np.int64))
+        else:
+            columns.append(_object_array(col))
+    return columns
+
+def _read_run(f):
+    while True:
+        try:
+            rows = pickle.load(f)
+        except EOFError:
+            return
+        yield from rows
+
+def _sort_keys(columns, sort_fields):
+    """
+    Returns one array per sort field, such that sorting the arrays ascending
+    sorts the rows in the requested order.  Columns that aren't numeric are
+    replaced by the rank of each value.  Raises TypeError if the values of a
+    column can't be compared.
+    """
+    keys = []
+    for desc, colidx in sort_fields:
+        col = columns[colidx]
+        if col.dtype.kind == "b":
+            col = col.astype(np.int64)
+        elif col.dtype.kind == "u":
+            col = col.astype(float)
+        elif col.dtype.kind not in "if":
+            # ranks are ints, with ties sharing a rank
+            _, col = np.unique(col, return_inverse=True)
+            col = col.reshape(-1)
+        keys.append(-col if desc else col)
+    return keys
+
+def _sort_order(columns, sort_fields, limit=None):
+    """
+    Returns the row positions of columns in ORDER BY order, keeping the first
+    limit positions if limit is given.  Ties keep their original order, as with
+    a stable sort.  With a limit, candidates are selected with argpartition
+    on the first sort key, and only the candidates are fully sorted.
+    """
+    n_rows = len(columns[0]) if columns else 0
+    try:
+        keys = _sort_keys(columns, sort_fields)
+    except TypeError:
+        # values such as None mixed with numbers; compare row by row
+        values = [col.tolist() for col in columns]
+        order = sorted(range(n_rows), key=lambda i: SortKey([col[i] for col in values], sort_fields))
+        return np.array(order[:limit] if limit is not None else order, dtype=np.int64)
+    if limit is not None and limit < n_rows:
+        first = keys[0]
+        pivot = first[np.argpartition(first, max(limit - 1, 0))[max(limit - 1, 0)]]
+        if not (first.dtype.kind == "f" and np.isnan(pivot)):
+            # every row tied with the pivot is a candidate, to keep the sort stable
+            candidates = np.flatnonzero(first <= pivot)
+            order = np.lexsort([k[candidates] for k in reversed(keys)])
+            return candidates[order][:limit]
+    order = np.lexsort(list(reversed(keys))) if keys else np.arange(n_rows)
+    return order[:limit] if limit is not None else order
+
+def _external_sort(runs, key, block_size=1024):
+    """
+    Merges the rows from an iterable of sorted row batches.  Each batch is
+    written to a temporary file, and the files are merged as rows are read.
+    """
+    runs_files = []
+    try:
+        for batch in runs:
+            f = tempfile.TemporaryFile()
+            for start in range(0, len(batch), block_size):
+                pickle.dump(batch[start:start + block_size], f)
+            f.seek(0)
+            runs_files.append(f)
+        yield from heapq.merge(*[_read_run(f) for f in runs_files], key=key)
+    finally:
+        for f in runs_files:
+            f.close()
+
+def _row_count(exact_aggregates):
+    if isinstance(exact_aggregates, list):
+        # first row has the column names
+        return max(len(exact_aggregates) - 1, 0)
+    if isinstance(exact_aggregates, np.ndarray):
+        return len(exact_aggregates)
+    return None
+
+def _column_rows(columns):
+    return len(columns[0]) if columns else 0
+
+def _clamp_non_negative(vals):
+    if vals.dtype.kind in "iuf":
+        return np.where(vals < 0, 0, vals)
+    vals = vals.copy()
+    vals[np.array([v < 0 for v in vals], dtype=bool)] = 0
+    return vals
 
 class PrivateReader(Reader):
     """Executes SQL queries against tabular data sources and returns differentially private results.
@@ -47,8 +321,12 @@ class PrivateReader(Reader):
         else:
             raise ValueError("Parameter reader must be of type Reader")
         self.metadata = Metadata.from_(metadata)
-        self.rewriter = Rewriter(metadata)
+        self.rewriter = Rewriter(self.metadata)
         self._options = PrivateReaderOptions()
+        self.query_cache = QueryCache()
+        self.spark_arrow = False
+        self.observers = []
+        self._lock = threading.RLock()
 
         if privacy:
             self.privacy = privacy
@@ -81,6 +359,36 @@ class PrivateReader(Reader):
         _reader = SqlReader.from_connection(conn, engine=engine, metadata=metadata, **kwargs)
         return cls(_reader, metadata, privacy=privacy)
 
+    @classmethod
+    def from_pool(cls, connect, *ignore, privacy, metadata, engine=None, size:int=4, **kwargs):
+        """Create a private reader that runs each query on a connection from a bounded pool.
+        Concurrent calls to ``execute`` or ``execute_async`` run on different connections,
+        up to ``size`` at once, and wait for a free connection beyond that.
+
+        :param connect: A function that opens a new database connection.
+        :param privacy:  A Privacy object with epsilon, delta, and other privacy properties.  Keyword-only.
+        :param metadata: The metadata describing the database.  Keyword-only.
+        :param engine: Optional keyword-only argument with the database engine.  If not passed in,
+            the engine is detected from the first connection.
+        :param size: The maximum number of open connections.
+        :returns: A `PrivateReader` object whose reader is a `PooledReader`.
+
+        .. code-block:: python
+
+            reader = PrivateReader.from_pool(
+                lambda: psycopg2.connect(dsn), privacy=privacy, metadata=metadata, size=8
+            )
+        """
+        from .reader.pool import ConnectionPool, PooledReader
+        pool = ConnectionPool(connect, size)
+        if engine is None:
+            with pool.connection() as conn:
+                engine = Probe.engine(conn)
+            if engine is None:
+                raise ValueError("Unable to detect the database engine.  Please pass in engine parameter")
+        _reader = PooledReader(pool, engine, metadata=metadata, **kwargs)
+        return cls(_reader, metadata, privacy=privacy)
+
     @property
     def engine(self) -> str:
         """The engine being used by this private reader.
@@ -96,12 +404,13 @@ class PrivateReader(Reader):
     def _refresh_options(self):
         self.rewriter = Rewriter(self.metadata, privacy=self.privacy)
         self.metadata.compare = self.reader.compare
-        tables = self.metadata.tables()
+        # with a catalog, only the tables that queries have looked up
+        tables = self.metadata.loaded_tables()
         self._options.row_privacy = any([t.row_privacy for t in tables])
         self._options.censor_dims = not any([not t.censor_dims for t in tables])
         self._options.reservoir_sample = any([t.sample_max_ids for t in tables])
         self._options.clamp_counts = any([t.clamp_counts for t in tables])
-        self._options.max_contrib = max([t.max_ids for t in tables])
+        self._options.max_contrib = max([t.max_ids for t in tables], default=1)
         self._options.use_dpsu = any([t.use_dpsu for t in tables])
         self._options.clamp_columns = any([t.clamp_columns for t in tables])
 
@@ -124,7 +433,7 @@ censoring as a preprocessing step.  See the documentation for more information."
             )
 
         mechs = self.privacy.mechanisms
-        tables = self.metadata.tables()
+        tables = self.metadata.loaded_tables()
         floats = []
         large_ints = []
         large = mechs.large
@@ -269,6 +578,7 @@ This could lead to privacy leaks."""
             dot.render('age', view=True, cleanup=True)
 
         """
+        from .parse import QueryParser
         queries = QueryParser(self.metadata).queries(query_string)
         if len(queries) > 1:
             raise ValueError("Too many queries provided.  We can only execute one query at a time.")
@@ -276,32 +586,92 @@ This could lead to privacy leaks."""
             return []
         return queries[0]
 
-    def _rewrite(self, query_string):
+    def _query_cache_key(self, query_string):
+        return (
+            normalize_query(query_string),
+            self.reader.engine,
+            self.metadata.fingerprint,
+            privacy_key(self.privacy)
+        )
+
+    def _rewrite(self, query_string, profile=null_profile):
+        subquery, query, _ = self._rewrite_with_options(query_string, profile)
+        return (subquery, query)
+
+    def _rewrite_with_options(self, query_string, profile=null_profile):
+        """
+        Rewrites a query string, and returns the subquery, the outer query,
+        and a copy of the options taken under the lock, so that the query
+        runs with the options it was rewritten with.
+        """
         if not isinstance(query_string, str):
             raise ValueError("Please pass a query string to _rewrite()")
-        query = self.parse_query_string(query_string)
-        return self._rewrite_ast(query)
+        key = self._query_cache_key(query_string)
+        cached = self.query_cache.get(key)
+        if cached is not None:
+            profile.cache_hit = True
+            with self._lock:
+                self._refresh_options()
+                options = copy.copy(self._options)
+            return cached + (options,)
+        profile.cache_hit = False
+        with profile.stage("parse"):
+            query = self.parse_query_string(query_string)
+        subquery, query, options = self._rewrite_ast_with_options(query, profile)
+        self.query_cache.put(key, (subquery, query))
+        return (subquery, query, options)
+
+    def _rewrite_ast(self, query, profile=null_profile):
+        subquery, query, _ = self._rewrite_ast_with_options(query, profile)
+        return (subquery, query)
 
-    def _rewrite_ast(self, query):
+    def _rewrite_ast_with_options(self, query, profile=null_profile):
         if isinstance(query, str):
             raise ValueError("Please pass a Query AST object to _rewrite_ast()")
-        query_max_contrib = query.max_ids
-        if self._options.max_contrib is None or self._options.max_contrib > query_max_contrib:
-            self._options.max_contrib = query_max_contrib
-
-        self._refresh_options()
-        query = self.rewriter.query(query)
+        # options and rewriter are shared by concurrent executions
+        with self._lock:
+            query_max_contrib = query.max_ids
+            if self._options.max_contrib is None or self._options.max_contrib > query_max_contrib:
+                self._options.max_contrib = query_max_contrib
+
+            self._refresh_options()
+            options = copy.copy(self._options)
+            with profile.stage("rewrite"):
+                query = self.rewriter.query(query, load_symbols=False)
+            with profile.stage("mechanisms"):
+                query.load_symbols(self.rewriter.metadata, privacy=self.rewriter.privacy)
         query.compare = self.reader.compare
         subquery = query.source.relations[0].primary.query
         subquery.compare = self.reader.compare
-        return (subquery, query)
+        return (subquery, query, options)
 
-    def _get_reader(self, query_ast):
-        if (
-            query_ast.agg is not None
-            and self._options.use_dpsu
-            and isinstance(self.reader, PandasReader)
-        ):
+    def _profile(self, query_string, profile):
+        """
+        Returns the profile to record a query in: the one passed in, a new
+        one if there are observers, or a profile that records nothing.
+        """
+        if profile is None:
+            if not self.observers:
+                return null_profile
+            profile = QueryProfile()
+        if profile.query is None and isinstance(query_string, str):
+            profile.query = query_string
+        return profile
+
+    def _notify(self, profile):
+        if profile is null_profile:
+            return
+        for observer in self.observers:
+            observer(profile)
+
+    def _get_reader(self, query_ast, options=None):
+        options = options if options is not None else self._options
+        if query_ast.agg is None or not options.use_dpsu:
+            return self.reader
+        # DPSU needs pandas, which is only imported when it applies
+        from .dpsu import run_dpsu
+        from .reader.pandas import PandasReader
+        if isinstance(self.reader, PandasReader):
             query = str(query_ast)
             dpsu_df = run_dpsu(self.metadata, self.reader.df, query, epsilon=1.0)
             return PandasReader(dpsu_df, self.metadata)
@@ -331,8 +701,9 @@ This could lead to privacy leaks."""
         else:
             return None
 
-    def _get_mechanisms(self, subquery: Query):
-        max_contrib = self._options.max_contrib if self._options.max_contrib is not None else 1
+    def _get_mechanisms(self, subquery: Query, options=None):
+        options = options if options is not None else self._options
+        max_contrib = options.max_contrib if options.max_contrib is not None else 1
         assert(subquery.max_ids == max_contrib)
 
         return [s.mechanism for s in subquery._select_symbols]
@@ -470,7 +841,7 @@ This could lead to privacy leaks."""
         """
         return self.execute_df(query_string, accuracy=True)
 
-    def execute(self, query_string, accuracy:bool=False, *ignore, pre_aggregated=None, postprocess:bool=True):
+    def execute(self, query_string, accuracy:bool=False, *ignore, pre_aggregated=None, postprocess:bool=True, columnar:bool=False, profile=None):
         """Executes a query and returns a recordset that is differentially private.
 
         Follows ODBC and DB_API convention of consuming query as a string and returning
@@ -480,6 +851,8 @@ This could lead to privacy leaks."""
         :param query_string: A query string in SQL syntax        
         :param pre_aggregated: By default, `execute` will use the underlying database engine to compute exact aggregates.  To use exact aggregates from a different source, pass in the exact aggregates here as an iterable of tuples.
         :param postprocess: If False, the intermediate result, immediately after adding noise and censoring dimensions, will be returned.  All post-processing that does not impact privacy, such as clamping negative counts, LIMIT, HAVING, and ORDER BY, will be skipped.
+        :param columnar: If True, return a dictionary of NumPy arrays keyed by column name instead of a list of rows.  Noise and post-processing are applied one column at a time, which is much faster for queries with many output rows.
+        :param profile: A ``QueryProfile`` to record the time spent in each stage of the query.  If not passed, and the reader has observers, a new profile is made.  Each callable in ``observers`` is called with the profile once the query completes.
         :return: A recordset structured as an array of tuples, where each tuple
          represents a row, and each item in the tuple is typed.  The first row will
          contain column names.
@@ -489,24 +862,151 @@ This could lead to privacy leaks."""
             result = reader.execute('SELECT sex, AVG(age) AS age FROM PUMS.PUMS GROUP BY sex')
 
         """
-        query = self.parse_query_string(query_string)
-        return self._execute_ast(
-            query, 
-            accuracy=accuracy, 
-            pre_aggregated=pre_aggregated, 
-            postprocess=postprocess
+        profile = self._profile(query_string, profile)
+        subquery, query, options = self._rewrite_with_options(query_string, profile)
+        result = self._execute_rewritten(
+            subquery,
+            query,
+            accuracy=accuracy,
+            pre_aggregated=pre_aggregated,
+            postprocess=postprocess,
+            columnar=columnar,
+            profile=profile,
+            options=options
         )
+        self._notify(profile)
+        return result
+
+    async def execute_async(self, query_string, *ignore, executor=None, **kwargs):
+        """Executes a query without blocking the event loop, and returns the same
+        result as ``execute``.  The query runs in ``executor``, or in the event loop's
+        default thread pool.  Queries run concurrently from several tasks are
+        charged to the same odometer.
+
+        :param query_string: A query string in SQL syntax
+        :param executor: An optional ``concurrent.futures.Executor`` to run the query in
+        :param kwargs: Passed through to ``execute``
+
+        .. code-block:: python
 
-    def _execute_ast(self, query, *ignore, accuracy:bool=False, pre_aggregated=None, postprocess=True):
+            reader = PrivateReader.from_pool(connect, privacy=privacy, metadata=metadata, size=4)
+            results = await asyncio.gather(*[reader.execute_async(q) for q in queries])
+
+        """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(self.execute, query_string, **kwargs))
+
+    def _execute_ast(self, query, *ignore, accuracy:bool=False, pre_aggregated=None, postprocess=True, columnar=False, profile=None):
         if isinstance(query, str):
             raise ValueError("Please pass AST to _execute_ast.")
 
-        subquery, query = self._rewrite_ast(query)
+        profile = self._profile(None, profile)
+        subquery, query, options = self._rewrite_ast_with_options(query, profile)
+        result = self._execute_rewritten(
+            subquery,
+            query,
+            accuracy=accuracy,
+            pre_aggregated=pre_aggregated,
+            postprocess=postprocess,
+            columnar=columnar,
+            profile=profile,
+            options=options
+        )
+        self._notify(profile)
+        return result
+
+    def execute_batch(self, query_strings, *ignore, postprocess:bool=True, columnar:bool=False, profiles=None):
+        """Executes several queries, reading each set of rows from the database once.
+
+        Queries that differ only in their aggregates, with the same FROM, WHERE and
+        GROUP BY, are sent to the database as one query.  The exact aggregates are
+        then split back out, and each query is noised, post-processed and charged
+        to the odometer as if it had been run alone.
+
+        :param query_strings: A list of query strings in SQL syntax
+        :param postprocess: As in ``execute``, applied to every query
+        :param columnar: As in ``execute``, applied to every query
+        :param profiles: An optional list with one ``QueryProfile`` per query, as in ``execute``.  Each query's profile is passed to ``observers`` once it completes.  Queries merged into one database query each record that query's ``serialize`` and ``database`` stages.
+        :return: A list with one result per query, in the order of ``query_strings``
 
+        .. code-block:: python
+
+            queries = [
+                'SELECT educ, COUNT(*) AS n FROM PUMS.PUMS WHERE age > 30 GROUP BY educ',
+                'SELECT educ, AVG(income) AS income FROM PUMS.PUMS WHERE age > 30 GROUP BY educ',
+            ]
+            counts, incomes = reader.execute_batch(queries)
+
+        """
+        if profiles is None:
+            profiles = [None] * len(query_strings)
+        elif len(profiles) != len(query_strings):
+            raise ValueError("Please pass one profile per query")
+        profiles = [self._profile(query_string, profile) for query_string, profile in zip(query_strings, profiles)]
+        rewritten = [self._rewrite_with_options(query_string, profile) for query_string, profile in zip(query_strings, profiles)]
+        results = [None] * len(rewritten)
+        for group in self._scan_groups([subquery for subquery, _, _ in rewritten]):
+            if len(group) == 1:
+                subquery, query, options = rewritten[group[0]]
+                profile = profiles[group[0]]
+                results[group[0]] = self._execute_rewritten(subquery, query, postprocess=postprocess, columnar=columnar, profile=profile, options=options)
+                self._notify(profile)
+                continue
+            from .parse import QueryParser
+            merged = QueryParser(self.metadata).query(merge_subqueries([rewritten[idx][0] for idx in group]))
+            merged.compare = self.reader.compare
+            live = [profiles[idx] for idx in group if profiles[idx] is not null_profile]
+            shared = QueryProfile() if live else null_profile
+            exact_aggregates = self._exact_aggregates(merged, shared, rewritten[group[0]][2])
+            for profile in live:
+                profile.stages.extend(shared.stages)
+            merged_names = [s.name for s in merged._select_symbols]
+            for idx in group:
+                subquery, query, options = rewritten[idx]
+                names = [s.name for s in subquery._select_symbols]
+                results[idx] = self._execute_rewritten(
+                    subquery,
+                    query,
+                    pre_aggregated=split_exact(exact_aggregates, merged_names, names),
+                    postprocess=postprocess,
+                    columnar=columnar,
+                    profile=profiles[idx],
+                    options=options
+                )
+                self._notify(profiles[idx])
+        return results
+
+    def _scan_groups(self, subqueries):
+        """
+        Groups the positions of rewritten subqueries that can be merged into
+        one query, keeping the order in which each group is first seen.
+        """
+        groups = []
+        by_key = {}
+        for idx, subquery in enumerate(subqueries):
+            candidates = by_key.setdefault(scan_key(subquery), [])
+            for group in candidates:
+                try:
+                    merge_subqueries([subqueries[g] for g in group] + [subquery])
+                except ValueError:
+                    continue
+                group.append(idx)
+                break
+            else:
+                candidates.append([idx])
+                groups.append(candidates[-1])
+        return groups
+
+    def _execute_rewritten(self, subquery, query, *ignore, accuracy:bool=False, pre_aggregated=None, postprocess=True, columnar=False, profile=null_profile, options=None):
+        if options is None:
+            # concurrent queries refresh the shared options, so read a copy
+            with self._lock:
+                options = copy.copy(self._options)
         if pre_aggregated is not None:
             exact_aggregates = self._check_pre_aggregated_columns(pre_aggregated, subquery)
         else:
-            exact_aggregates = self._get_reader(subquery)._execute_ast(subquery)
+            exact_aggregates = self._exact_aggregates(subquery, profile, options)
 
         _accuracy = None
         if accuracy:
@@ -519,54 +1019,47 @@ This could lead to privacy leaks."""
         is_count = [s.expression.is_count for s in syms]
 
         # get a list of mechanisms in column order
-        mechs = self._get_mechanisms(subquery)
+        mechs = self._get_mechanisms(subquery, options)
         check_sens = [m for m in mechs if m]
         if any([m.sensitivity is np.inf for m in check_sens]):
             raise ValueError(f"Attempting to query an unbounded column")
 
         kc_pos = self._get_keycount_position(subquery)
+        tau = self._censor_threshold(mechs, kc_pos, options)
+        # the threshold of the most recent query, for callers that inspect it
+        self.tau = tau
+        clamp_counts = options.clamp_counts
 
-        def randomize_row_values(row_in):
-            row = [v for v in row_in]
-            # set null to 0 before adding noise
-            for idx in range(len(row)):
-                if mechs[idx] and row[idx] is None:
-                    row[idx] = 0.0
-            # call all mechanisms to add noise
-            return [
-                mech.release([v])[0] if mech is not None else v
-                for mech, v in zip(mechs, row)
-            ]
+        if self.spark_arrow and hasattr(exact_aggregates, "mapInPandas") and not columnar:
+            return self._execute_spark_arrow(subquery, query, exact_aggregates, mechs, is_count, kc_pos, tau, clamp_counts, postprocess, profile)
 
-        if hasattr(exact_aggregates, "rdd"):
-            # it's a dataframe
-            out = exact_aggregates.rdd.map(randomize_row_values)
-        elif hasattr(exact_aggregates, "map"):
-            # it's an RDD
-            out = exact_aggregates.map(randomize_row_values)
-        elif isinstance(exact_aggregates, list):
-            out = map(randomize_row_values, exact_aggregates[1:])
-        elif isinstance(exact_aggregates, np.ndarray):
-            out = map(randomize_row_values, exact_aggregates)
-        else:
-            raise ValueError("Unexpected type for exact_aggregates")
+        if columnar:
+            return self._execute_columnar(subquery, query, exact_aggregates, mechs, is_count, kc_pos, tau, clamp_counts, postprocess, profile)
 
-        # censor infrequent dimensions
-        if self._options.censor_dims:
-            if kc_pos is None:
-                raise ValueError("Query needs a key count column to censor dimensions")
-            else:
-                thresh_mech = mechs[kc_pos]
-                self.tau = thresh_mech.threshold
-            if hasattr(out, "filter"):
+        def release_partition(rows):
+            rows = list(rows)
+            columns = _release_columns(_columns_from_rows(rows, len(mechs)), mechs, kc_pos, tau)
+            return _rows_from_columns(columns)
+
+        with profile.stage("noise") as stage:
+            if hasattr(exact_aggregates, "rdd"):
+                # it's a dataframe
+                out = exact_aggregates.rdd.mapPartitions(release_partition)
+            elif hasattr(exact_aggregates, "map"):
                 # it's an RDD
-                tau = self.tau
-                out = out.filter(lambda row: row[kc_pos] > tau)
+                out = exact_aggregates.mapPartitions(release_partition)
+            elif isinstance(exact_aggregates, list):
+                out = release_partition(exact_aggregates[1:])
+            elif isinstance(exact_aggregates, np.ndarray):
+                out = release_partition(exact_aggregates)
             else:
-                out = filter(lambda row: row[kc_pos] > self.tau, out)
+                raise ValueError("Unexpected type for exact_aggregates")
+
+            if isinstance(out, list):
+                stage.rows = len(out)
 
         if not postprocess:
-            return out
+            return iter(out) if isinstance(out, list) else out
 
         def process_clamp_counts(row_in):
             # clamp counts to be non-negative
@@ -576,51 +1069,18 @@ This could lead to privacy leaks."""
                     row[idx] = 0
             return row
 
-        clamp_counts = self._options.clamp_counts
-        if clamp_counts:
-            if hasattr(out, "rdd"):
-                # it's a dataframe
-                out = out.rdd.map(process_clamp_counts)
-            elif hasattr(out, "map"):
-                # it's an RDD
-                out = out.map(process_clamp_counts)
-            else:
-                out = map(process_clamp_counts, out)
-
         # get column information for outer query
         out_syms = query._select_symbols
         out_types = [s.expression.type() for s in out_syms]
         out_col_names = [s.name for s in out_syms]
 
-        def convert(val, type):
-            if val is None:
-                return None # all columns are nullable
-            if type == "string" or type == "unknown":
-                return str(val)
-            elif type == "int":
-                return int(float(str(val).replace('"', "").replace("'", "")))
-            elif type == "float":
-                return float(str(val).replace('"', "").replace("'", ""))
-            elif type == "boolean":
-                if isinstance(val, int):
-                    return val != 0
-                else:
-                    return bool(str(val).replace('"', "").replace("'", ""))
-            elif type == "datetime":
-                v = parse_datetime(val)
-                if v is None:
-                    raise ValueError(f"Could not parse datetime: {val}")
-                return v
-            else:
-                raise ValueError("Can't convert type " + type)
-        
         alphas = [alpha for alpha in self.privacy.alphas]
 
         def process_out_row(row):
             bindings = dict((name.lower(), val) for name, val in zip(source_col_names, row))
             out_row = [c.expression.evaluate(bindings) for c in query.select.namedExpressions]
             try:
-                out_row =[convert(val, type) for val, type in zip(out_row, out_types)]
+                out_row =[_convert(val, type) for val, type in zip(out_row, out_types)]
             except Exception as e:
                 raise ValueError(
                     f"Error converting output row: {e}\n"
@@ -634,73 +1094,87 @@ This could lead to privacy leaks."""
             else:
                 return tuple([out_row, []])
 
-        if hasattr(out, "map"):
-            # it's an RDD
-            out = out.map(process_out_row)
-        else:
-            out = map(process_out_row, out)
-
         def filter_aggregate(row, condition):
             bindings = dict((name.lower(), val) for name, val in zip(out_col_names, row[0]))
             keep = condition.evaluate(bindings)
             return keep
 
-        if query.having is not None:
-            condition = query.having.condition
-            if hasattr(out, "filter"):
-                # it's an RDD
-                out = out.filter(lambda row: filter_aggregate(row, condition))
-            else:
-                out = filter(lambda row: filter_aggregate(row, condition), out)
-
-        # sort it if necessary
-        if query.order is not None:
-            sort_fields = []
-            for si in query.order.sortItems:
-                if type(si.expression) is not ast.Column:
-                    raise ValueError("We only know how to sort by column names right now")
-                colname = si.expression.name.lower()
-                if colname not in out_col_names:
-                    raise ValueError(
-                        "Can't sort by {0}, because it's not in output columns: {1}".format(
-                            colname, out_col_names
-                        )
-                    )
-                colidx = out_col_names.index(colname)
-                desc = False
-                if si.order is not None and si.order.lower() == "desc":
-                    desc = True
-                if desc and not (out_types[colidx] in ["int", "float", "boolean", "datetime"]):
-                    raise ValueError("We don't know how to sort descending by " + out_types[colidx])
-                sf = (desc, colidx)
-                sort_fields.append(sf)
-
-            def sort_func(row):
-                # use index 0, since index 1 is accuracy
-                return SortKey(row[0], sort_fields)
-                
-            if hasattr(out, "sortBy"):
-                out = out.sortBy(sort_func)
-            else:
-                out = sorted(out, key=sort_func)
+        out_columns = None
+        with profile.stage("postprocess") as stage:
+            if clamp_counts:
+                if hasattr(out, "rdd"):
+                    # it's a dataframe
+                    out = out.rdd.map(process_clamp_counts)
+                elif hasattr(out, "map"):
+                    # it's an RDD
+                    out = out.map(process_clamp_counts)
+                else:
+                    out = map(process_clamp_counts, out)
 
-        # check for LIMIT or TOP
-        limit_rows = None
-        if query.limit is not None:
-            if query.select.quantifier is not None:
-                raise ValueError("Query cannot have both LIMIT and TOP set")
-            limit_rows = query.limit.n
-        elif query.select.quantifier is not None and isinstance(query.select.quantifier, Top):
-            limit_rows = query.select.quantifier.n
-        if limit_rows is not None:
-            if hasattr(out, "rdd"):
-                # it's a dataframe
-                out = out.limit(limit_rows)
-            elif hasattr(out, "map"):
+            if hasattr(out, "map"):
                 # it's an RDD
-                out = out.take(limit_rows)
+                out = out.map(process_out_row)
+            elif accuracy == False:
+                # evaluate outer expressions and HAVING once per column
+                rows = list(out)
+                columns = [_object_array(col) for col in zip(*rows)]
+                if len(columns) == 0:
+                    columns = [_object_array([]) for _ in source_col_names]
+                out_columns = _evaluate_outer(query, source_col_names, columns, len(rows))
+                if query.having is not None:
+                    out_columns = _filter_having(query, out_col_names, out_columns, len(rows))
+                stage.rows = _column_rows(out_columns)
             else:
-                out = itertools.islice(out, limit_rows)
+                out = map(process_out_row, out)
+
+            if query.having is not None and out_columns is None:
+                condition = query.having.condition
+                if hasattr(out, "filter"):
+                    # it's an RDD
+                    out = out.filter(lambda row: filter_aggregate(row, condition))
+                else:
+                    out = filter(lambda row: filter_aggregate(row, condition), out)
+
+        limit_rows = self._limit_rows(query)
+        if out_columns is not None:
+            # sort and apply LIMIT on the columns
+            if query.order is not None:
+                with profile.stage("sort") as stage:
+                    sort_fields = self._sort_fields(query, out_col_names, out_types)
+                    order = _sort_order(out_columns, sort_fields, limit_rows)
+                    out_columns = [col[order] for col in out_columns]
+                    stage.rows = len(order)
+            elif limit_rows is not None:
+                with profile.stage("limit") as stage:
+                    out_columns = [col[:limit_rows] for col in out_columns]
+                    stage.rows = _column_rows(out_columns)
+            out = [(list(row), []) for row in zip(*[col.tolist() for col in out_columns])]
+        else:
+            # sort it if necessary
+            if query.order is not None:
+                with profile.stage("sort"):
+                    sort_fields = self._sort_fields(query, out_col_names, out_types)
+
+                    def sort_func(row):
+                        # use index 0, since index 1 is accuracy
+                        return SortKey(row[0], sort_fields)
+
+                    if hasattr(out, "sortBy"):
+                        out = out.sortBy(sort_func)
+                    else:
+                        out = sorted(out, key=sort_func)
+
+            # check for LIMIT or TOP
+            if limit_rows is not None:
+                with profile.stage("limit"):
+                    if hasattr(out, "rdd"):
+                        # it's a dataframe
+                        out = out.limit(limit_rows)
+                    elif hasattr(out, "map"):
+                        # it's an RDD
+                        out = out.take(limit_rows)
+                    else:
+                        out = itertools.islice(out, limit_rows)
 
 
         # drop empty accuracy if no accuracy requested
@@ -738,9 +1212,344 @@ This could lead to privacy leaks."""
             out_rows = row0 + list(out)
             return out_rows
 
+    def _exact_aggregates(self, subquery, profile, options=None):
+        reader = self._get_reader(subquery, options)
+        if (
+            profile is not null_profile
+            and getattr(reader._execute_ast, "__func__", None) is SqlReader._execute_ast
+            and getattr(reader, "serializer", None) is not None
+        ):
+            # time the serializer separately from the database
+            with profile.stage("serialize"):
+                query_string = reader.serializer.serialize(subquery)
+            with profile.stage("database") as stage:
+                exact_aggregates = reader.execute(query_string)
+        else:
+            with profile.stage("database") as stage:
+                exact_aggregates = reader._execute_ast(subquery)
+        stage.rows = _row_count(exact_aggregates)
+        return exact_aggregates
+
+    def _sort_fields(self, query, out_col_names, out_types):
+        sort_fields = []
+        for si in query.order.sortItems:
+            if type(si.expression) is not ast.Column:
+                raise ValueError("We only know how to sort by column names right now")
+            colname = si.expression.name.lower()
+            if colname not in out_col_names:
+                raise ValueError(
+                    "Can't sort by {0}, because it's not in output columns: {1}".format(
+                        colname, out_col_names
+                    )
+                )
+            colidx = out_col_names.index(colname)
+            desc = False
+            if si.order is not None and si.order.lower() == "desc":
+                desc = True
+            if desc and not (out_types[colidx] in ["int", "float", "boolean", "datetime"]):
+                raise ValueError("We don't know how to sort descending by " + out_types[colidx])
+            sf = (desc, colidx)
+            sort_fields.append(sf)
+        return sort_fields
+
+    def _limit_rows(self, query):
+        limit_rows = None
+        if query.limit is not None:
+            if query.select.quantifier is not None:
+                raise ValueError("Query cannot have both LIMIT and TOP set")
+            limit_rows = query.limit.n
+        elif query.select.quantifier is not None and isinstance(query.select.quantifier, Top):
+            limit_rows = query.select.quantifier.n
+        return limit_rows
+
+    def _execute_columnar(self, subquery, query, exact_aggregates, mechs, is_count, kc_pos, tau, clamp_counts, postprocess, profile=null_profile):
+        """
+        Noises and post-processes exact aggregates one column at a time, returning
+        a dictionary of NumPy arrays keyed by output column name.
+        """
+        source_col_names = [s.name for s in subquery._select_symbols]
+        if hasattr(exact_aggregates, "rdd") or hasattr(exact_aggregates, "map"):
+            # Spark DataFrame or RDD
+            rows = exact_aggregates.collect()
+        elif isinstance(exact_aggregates, list):
+            rows = exact_aggregates[1:]
+        elif isinstance(exact_aggregates, np.ndarray):
+            rows = exact_aggregates
+        else:
+            raise ValueError("Unexpected type for exact_aggregates")
+
+        with profile.stage("noise") as stage:
+            columns = _release_columns(_columns_from_rows(rows, len(source_col_names)), mechs, kc_pos, tau)
+            stage.rows = _column_rows(columns)
+
+        if not postprocess:
+            return dict(zip(source_col_names, columns))
+
+        with profile.stage("postprocess") as stage:
+            out_columns = _postprocess_columns(query, source_col_names, columns, is_count, clamp_counts)
+            stage.rows = _column_rows(out_columns)
+
+        out_syms = query._select_symbols
+        out_types = [s.expression.type() for s in out_syms]
+        out_col_names = [s.name for s in out_syms]
+
+        limit_rows = self._limit_rows(query)
+        if query.order is not None:
+            with profile.stage("sort") as stage:
+                sort_fields = self._sort_fields(query, out_col_names, out_types)
+                order = _sort_order(out_columns, sort_fields, limit_rows)
+                out_columns = [col[order] for col in out_columns]
+                stage.rows = len(order)
+        elif limit_rows is not None:
+            with profile.stage("limit") as stage:
+                out_columns = [col[:limit_rows] for col in out_columns]
+                stage.rows = _column_rows(out_columns)
+
+        for mech in mechs:
+            if mech:
+                self.odometer.spend(Privacy(epsilon=mech.epsilon, delta=mech.delta))
+
+        return dict(zip(out_col_names, out_columns))
+
+    def _execute_spark_arrow(self, subquery, query, exact_aggregates, mechs, is_count, kc_pos, tau, clamp_counts, postprocess, profile=null_profile):
+        """
+        Noises and post-processes a Spark DataFrame of exact aggregates with
+        mapInPandas, so rows move between the JVM and Python in Arrow batches,
+        and returns a Spark DataFrame.  Only the mechanisms and the query are
+        shipped to the executors.
+        """
+        source_col_names = [s.name for s in subquery._select_symbols]
+
+        if postprocess:
+            out_syms = query._select_symbols
+            out_types = [s.expression.type() for s in out_syms]
+            out_col_names = [s.name for s in out_syms]
+            schema = ", ".join([
+                f"`{name}` {_spark_types.get(t, 'string')}" for name, t in zip(out_col_names, out_types)
+            ])
+        else:
+            fields = exact_aggregates.schema.fields
+            schema = ", ".join([
+                f"`{name}` {'double' if mech is not None else field.dataType.simpleString()}"
+                for name, mech, field in zip(source_col_names, mechs, fields)
+            ])
+
+        def transform(batches):
+            import pandas as pd
+            for pdf in batches:
+                columns = [_column_from_series(pdf.iloc[:, idx]) for idx in range(len(source_col_names))]
+                columns = _release_columns(columns, mechs, kc_pos, tau)
+                if postprocess:
+                    columns = _postprocess_columns(query, source_col_names, columns, is_count, clamp_counts)
+                # integer labels, so Spark matches columns by position
+                yield pd.DataFrame(dict(enumerate(columns)))
+
+        # noise and post-processing both run in transform, when the plan is executed
+        with profile.stage("noise"):
+            out = exact_aggregates.mapInPandas(transform, schema)
+
+        if postprocess:
+            if query.order is not None:
+                with profile.stage("sort"):
+                    sort_fields = self._sort_fields(query, out_col_names, out_types)
+                    out = out.orderBy(*[
+                        out[out_col_names[colidx]].desc() if desc else out[out_col_names[colidx]].asc()
+                        for desc, colidx in sort_fields
+                    ])
+            limit_rows = self._limit_rows(query)
+            if limit_rows is not None:
+                with profile.stage("limit"):
+                    out = out.limit(limit_rows)
+
+            for mech in mechs:
+                if mech:
+                    self.odometer.spend(Privacy(epsilon=mech.epsilon, delta=mech.delta))
+
+        return out
+
+    def _censor_threshold(self, mechs, kc_pos, options=None):
+        """
+        Returns the threshold for censoring infrequent dimensions, or None
+        if dimensions are not censored.
+        """
+        options = options if options is not None else self._options
+        if not options.censor_dims:
+            return None
+        if kc_pos is None:
+            raise ValueError("Query needs a key count column to censor dimensions")
+        return mechs[kc_pos].threshold
+
+    def execute_batches(self, query_string, batch_size:int=10000, *ignore, columnar:bool=False, profile=None):
+        """Executes a private SQL query and returns an iterator over batches of results.
+
+        Exact aggregates are fetched from the database ``batch_size`` rows at a time,
+        and each batch is noised and post-processed before the next batch is fetched,
+        so memory stays bounded for queries with many output rows.  The query runs,
+        and the privacy budget is spent, when this method is called.  Queries with
+        ORDER BY are sorted externally, spilling sorted batches to temporary files.
+
+        :param query_string: The query to execute.
+        :param batch_size: The maximum number of exact aggregate rows to fetch at a time.
+        :param columnar: If True, each batch is a dictionary of NumPy arrays keyed by column name.
+        :param profile: As in ``execute``.  Stages are summed over the batches, and the profile is filled in, and passed to ``observers``, once the batches have all been read or the iterator is closed.
+        :returns: An iterator over batches.  Each batch is a list of rows with
+            column names in the first row, like the result of ``execute``.
+
+        .. code-block:: python
+
+            query = 'SELECT zip, COUNT(*) AS n FROM PUMS.PUMS GROUP BY zip'
+            for batch in private_reader.execute_batches(query, batch_size=50000):
+                write_rows(batch[1:])
+        """
+        out_col_names, out_types, batches = self._execute_batches(query_string, batch_size, profile)
+        if columnar:
+            return (dict(zip(out_col_names, columns)) for columns in batches)
+        else:
+            return ([out_col_names] + _rows_from_columns(columns) for columns in batches)
+
+    def execute_iter(self, query_string, batch_size:int=10000, *ignore, profile=None):
+        """Executes a private SQL query and returns an iterator over the result rows.
+        The first row has the column names.  See ``execute_batches`` for how rows
+        are fetched, when the privacy budget is spent, and when the profile is filled in.
+
+        :param query_string: The query to execute.
+        :param batch_size: The maximum number of exact aggregate rows to fetch at a time.
+        :param profile: As in ``execute_batches``.
+        :returns: An iterator over rows, starting with the column names.
+        """
+        out_col_names, out_types, batches = self._execute_batches(query_string, batch_size, profile)
+        def rows():
+            yield out_col_names
+            for columns in batches:
+                yield from _rows_from_columns(columns)
+        return rows()
+
+    def _execute_batches(self, query_string, batch_size, profile=None):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        profile = self._profile(query_string, profile)
+        subquery, query, options = self._rewrite_with_options(query_string, profile)
+
+        syms = subquery._select_symbols
+        source_col_names = [s.name for s in syms]
+        is_count = [s.expression.is_count for s in syms]
+        mechs = self._get_mechanisms(subquery, options)
+        if any([m.sensitivity is np.inf for m in mechs if m]):
+            raise ValueError(f"Attempting to query an unbounded column")
+        kc_pos = self._get_keycount_position(subquery)
+        tau = self._censor_threshold(mechs, kc_pos, options)
+        self.tau = tau
+
+        out_syms = query._select_symbols
+        out_types = [s.expression.type() for s in out_syms]
+        out_col_names = [s.name for s in out_syms]
+        sort_fields = self._sort_fields(query, out_col_names, out_types) if query.order is not None else None
+        limit_rows = self._limit_rows(query)
+
+        # seconds and rows of each stage, summed over the batches
+        times = {}
+        def timed(name, start, rows):
+            seconds, total = times.get(name, (0.0, 0))
+            times[name] = (seconds + time.perf_counter() - start, total + rows)
+
+        start = time.perf_counter()
+        _, exact_batches = self._get_reader(subquery, options)._execute_ast_batches(subquery, batch_size)
+        timed("database", start, 0)
+
+        for mech in mechs:
+            if mech:
+                self.odometer.spend(Privacy(epsilon=mech.epsilon, delta=mech.delta))
+
+        def release():
+            exact = iter(exact_batches)
+            while True:
+                start = time.perf_counter()
+                rows = next(exact, None)
+                if rows is None:
+                    break
+                timed("database", start, len(rows))
+                start = time.perf_counter()
+                columns = _release_columns(_columns_from_rows(rows, len(source_col_names)), mechs, kc_pos, tau)
+                timed("noise", start, _column_rows(columns))
+                start = time.perf_counter()
+                columns = _postprocess_columns(query, source_col_names, columns, is_count, options.clamp_counts)
+                timed("postprocess", start, _column_rows(columns))
+                yield columns
+
+        def sorted_runs(batches):
+            for columns in batches:
+                start = time.perf_counter()
+                run = _rows_from_columns([col[_sort_order(columns, sort_fields)] for col in columns])
+                timed("sort", start, len(run))
+                yield run
+
+        def output():
+            batches = release()
+            if sort_fields is not None:
+                if limit_rows is not None:
+                    # only the first limit_rows rows are needed
+                    top = None
+                    for columns in batches:
+                        start = time.perf_counter()
+                        if top is not None:
+                            columns = [_concat_columns(t, c) for t, c in zip(top, columns)]
+                        order = _sort_order(columns, sort_fields, limit_rows)
+                        top = [col[order] for col in columns]
+                        timed("sort", start, 0)
+                    timed("sort", time.perf_counter(), _column_rows(top) if top is not None else 0)
+                    rows = iter(_rows_from_columns(top) if top is not None else [])
+                else:
+                    rows = _external_sort(sorted_runs(batches), lambda row: SortKey(row, sort_fields))
+                batches = (
+                    _columns_from_out_rows(chunk, out_types)
+                    for chunk in iter(lambda: list(itertools.islice(rows, batch_size)), [])
+                )
+            remaining = limit_rows
+            for columns in batches:
+                if remaining is not None:
+                    start = time.perf_counter()
+                    columns = [col[:remaining] for col in columns]
+                    remaining -= len(columns[0]) if columns else 0
+                    if sort_fields is None:
+                        timed("limit", start, _column_rows(columns))
+                if columns and len(columns[0]) > 0:
+                    yield columns
+                if remaining is not None and remaining <= 0:
+                    break
+
+        def finish():
+            for name, (seconds, rows) in times.items():
+                profile.record(name, seconds, rows)
+            self._notify(profile)
+
+        def profiled():
+            try:
+                yield from output()
+            except GeneratorExit:
+                # the caller stopped early, so report the batches read so far
+                finish()
+                raise
+            finish()
+
+        return out_col_names, out_types, profiled()
+
     def _execute_ast_df(self, query):
         return self._to_df(self._execute_ast(query))
 
+    def execute_df(self, query_string, *ignore, accuracy:bool=False, **kwargs):
+        """Executes a private SQL query and returns the result as a pandas DataFrame.
+        The DataFrame is built from the columnar result, without per-row conversion.
+
+        :param query_string: The query to execute.
+        :returns: A pandas DataFrame with one column per output column.
+        """
+        if not isinstance(query_string, str):
+            raise ValueError("Please pass a string to this function.")
+        if accuracy:
+            return self._to_df(self.execute(query_string, accuracy=accuracy, **kwargs))
+        import pandas as pd
+        return pd.DataFrame(self.execute(query_string, columnar=True, **kwargs))
+
 
 class PrivateReaderOptions:
     """Options that control privacy behavior"""
@@ -4,7 +4,6 @@ from snsql._ast.expressions.string import CoalesceFunction
 
 from snsql.metadata import Metadata
 
-from .parse import QueryParser
 
 from snsql._ast.validate import Validate
 from snsql._ast.ast import (
@@ -36,6 +35,7 @@ from snsql._ast.ast import (
     WhenExpression,
     Sql,
 )
+from snsql._ast.tokens import node_attributes
 
 
 class Rewriter:
@@ -147,18 +147,21 @@ class Rewriter:
 
         else:
             def replace_agg_exprs(expr):
-                for child_name, child_expr in expr.__dict__.items():
+                for child_name, child_expr in node_attributes(expr).items():
                     if isinstance(child_expr, Sql):
                         replace_agg_exprs(child_expr)
                     if isinstance(child_expr, AggFunction):
-                        expr.__dict__[child_name] = self.rewrite_agg_expression(child_expr, scope)
+                        setattr(expr, child_name, self.rewrite_agg_expression(child_expr, scope))
 
             replace_agg_exprs(exp)
 
         return NamedExpression(name, exp)
 
     # Main entry point.  Takes a query and recursively builds rewritten wuery
-    def query(self, query):
+    # Pass load_symbols=False to skip building mechanisms, and call
+    # load_symbols on the result later.
+    def query(self, query, load_symbols=True):
+        from .parse import QueryParser
         query = QueryParser(self.metadata).query(str(query))
         Validate().validateQuery(query, self.metadata)
 
@@ -199,6 +202,8 @@ class Rewriter:
         )
         subquery = self.exact_aggregates(subquery)
         subquery = [Relation(AliasedSubquery(subquery, Identifier("exact_aggregates")), None)]
+        if not load_symbols:
+            return Query(select, From(subquery), None, None, query.having, query.order, query.limit)
         return Query(select, From(subquery), None, None, query.having, query.order, query.limit, metadata=self.metadata, privacy=self.privacy)
 
     def exact_aggregates(self, query):
@@ -0,0 +1,119 @@
+"""
+Per-stage timing for private queries.
+
+A QueryProfile records how long each stage of a private query took, and
+how many rows the stage produced.  Stages are recorded in the order they
+finish.  The stages of ``PrivateReader.execute`` are:
+
+* ``parse``: parsing the query string
+* ``rewrite``: rewriting the query into an exact aggregate subquery
+* ``mechanisms``: building the noise mechanisms, including any scale search
+* ``serialize``: writing the subquery in the database's dialect
+* ``database``: computing the exact aggregates
+* ``noise``: adding noise and censoring rare dimensions
+* ``postprocess``: clamping counts, and evaluating the outer SELECT and HAVING
+* ``sort``: ORDER BY, including any LIMIT applied while sorting
+* ``limit``: LIMIT or TOP
+
+Stages that don't apply to a query, such as ``parse`` and ``rewrite`` on
+a query cache hit, are not recorded.  Queries read in batches, with
+``execute_batches`` or ``execute_iter``, record one stage of each name,
+with the time and rows summed over all batches, once the batches have
+all been read.  For Spark, stages after ``database``
+build an execution plan, and their time doesn't include running it.
+"""
+import time
+
+
+class Stage:
+    """The time spent in one stage of a query, and the number of rows it produced."""
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.seconds = 0.0
+        self.rows = rows
+    def to_dict(self):
+        return {"name": self.name, "seconds": self.seconds, "rows": self.rows}
+    def __repr__(self):
+        rows = f", rows={self.rows}" if self.rows is not None else ""
+        return f"Stage({self.name}, {self.seconds:.6f}s{rows})"
+
+
+class _StageTimer:
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.stage = Stage(name)
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self.stage
+    def __exit__(self, *args):
+        self.stage.seconds = time.perf_counter() - self.start
+        self.profile.stages.append(self.stage)
+        return False
+
+
+class QueryProfile:
+    """
+    Collects the stages of one query.  Pass an instance to
+    ``PrivateReader.execute`` to have it filled in.
+
+    .. code-block:: python
+
+        profile = QueryProfile()
+        reader.execute('SELECT sex, COUNT(*) AS n FROM PUMS.PUMS GROUP BY sex', profile=profile)
+        for stage in profile.stages:
+            print(stage.name, stage.seconds, stage.rows)
+    """
+    def __init__(self, query=None):
+        self.query = query
+        self.cache_hit = None
+        self.stages = []
+    def stage(self, name):
+        """Returns a context manager that times a stage, and yields its Stage to set rows on."""
+        return _StageTimer(self, name)
+    def record(self, name, seconds, rows=None):
+        """Records a stage timed elsewhere, such as one summed over batches."""
+        stage = Stage(name, rows)
+        stage.seconds = seconds
+        self.stages.append(stage)
+    def seconds(self, name):
+        """The total time spent in stages with the given name."""
+        return sum(s.seconds for s in self.stages if s.name == name)
+    @property
+    def total(self):
+        return sum(s.seconds for s in self.stages)
+    def to_dict(self):
+        return {
+            "query": self.query,
+            "cache_hit": self.cache_hit,
+            "total": self.total,
+            "stages": [s.to_dict() for s in self.stages],
+        }
+    def __repr__(self):
+        return f"QueryProfile({self.total:.6f}s, {self.stages})"
+
+
+class _NullStageTimer:
+    """Stands in for a stage timer when nothing is profiled."""
+    def __enter__(self):
+        return Stage(None)
+    def __exit__(self, *args):
+        return False
+
+
+class _NullProfile:
+    """A profile that records nothing, used when a query isn't profiled."""
+    query = None
+    stages = ()
+    _timer = _NullStageTimer()
+    @property
+    def cache_hit(self):
+        return None
+    @cache_hit.setter
+    def cache_hit(self, value):
+        pass
+    def stage(self, name):
+        return self._timer
+    def record(self, name, seconds, rows=None):
+        pass
+
+null_profile = _NullProfile()
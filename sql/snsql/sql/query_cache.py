@@ -0,0 +1,79 @@
+import copy
+import re
+import threading
+from collections import OrderedDict
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of rewritten (subquery, query) AST pairs, keyed by
+    normalized query text, metadata fingerprint and privacy options.
+
+    Entries are deep-copied on the way in and on the way out, so that
+    mechanisms and other per-execution state attached to the AST never
+    leak between executions.  Set max_size to 0 to disable caching.
+    """
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    def __len__(self):
+        return len(self._entries)
+    def __contains__(self, key):
+        return key in self._entries
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            entry = self._entries[key]
+        return copy.deepcopy(entry)
+    def put(self, key, entry):
+        if self.max_size <= 0:
+            return
+        entry = copy.deepcopy(entry)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+def normalize_query(query_string):
+    """
+    Collapse runs of whitespace outside of string literals and quoted
+    identifiers, so that queries differing only in formatting share a cache
+    entry.  Queries with comments are left as-is, since newlines are
+    significant there.
+    """
+    query_string = query_string.strip()
+    if "--" in query_string or "/*" in query_string:
+        return query_string
+    parts = re.split(r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|\[[^\]]*\]|`[^`]*`)""", query_string)
+    return "".join([p if idx % 2 == 1 else re.sub(r"\s+", " ", p) for idx, p in enumerate(parts)])
+
+def privacy_key(privacy):
+    """
+    Returns a hashable snapshot of the privacy parameters and mechanism choices.
+    """
+    mechs = privacy.mechanisms
+    return (
+        privacy.epsilon,
+        privacy.delta,
+        tuple(privacy.alphas),
+        mechs.large,
+        tuple(sorted([(stat.name, mech.name) for stat, mech in mechs.map.items()])),
+        tuple(sorted([(mech.name, cls.__name__) for mech, cls in mechs.classes.items()]))
+    )
@@ -1,8 +1,23 @@
-from .bigquery import BigQueryReader
-from .pandas import PandasReader
-from .presto import PrestoReader
-from .postgres import PostgresReader
-from .sql_server import SqlServerReader
-from .spark import SparkReader
+import importlib
+
+# engine readers are imported on first use, with their database drivers
+_readers = {
+    "BigQueryReader": ".bigquery",
+    "PandasReader": ".pandas",
+    "PrestoReader": ".presto",
+    "PostgresReader": ".postgres",
+    "SqlServerReader": ".sql_server",
+    "SparkReader": ".spark",
+}
+
+def __getattr__(name):
+    if name in _readers:
+        value = getattr(importlib.import_module(_readers[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_readers))
 
 __all__ = ["BigQueryReader", "PandasReader", "PostgresReader", "PrestoReader", "SqlServerReader", "SparkReader"]
@@ -1,6 +1,7 @@
 from snsql.reader.base import Reader
 from snsql.sql.reader.engine import Engine
 import importlib
+import itertools
 
 from snsql.sql.reader.probe import Probe
 
@@ -43,6 +44,47 @@ class SqlReader(Reader):
         return self.execute(query_string, accuracy=accuracy)
     def _execute_ast_df(self, query, *ignore, accuracy:bool=False):
         return self._to_df(self._execute_ast(query, accuracy=accuracy))
+    def execute_batches(self, query, batch_size):
+        """
+            Executes a SQL string and returns the column names and an iterator
+            over lists of at most batch_size rows.  Readers that hold a DB-API
+            cursor fetch each batch with fetchmany.  The default implementation
+            runs execute and splits the result.
+        """
+        rows = self.execute(query)
+        if len(rows) == 0:
+            return (), iter([])
+        return tuple(rows[0]), batched(rows[1:], batch_size)
+    def _execute_ast_batches(self, query, batch_size):
+        if isinstance(query, str):
+            raise ValueError("Please pass ASTs to execute_ast.  To execute strings, use execute.")
+        if hasattr(self, "serializer") and self.serializer is not None:
+            query_string = self.serializer.serialize(query)
+        else:
+            query_string = str(query)
+        return self.execute_batches(query_string, batch_size)
+    def _cursor_batches(self, cursor, batch_size):
+        if cursor.description is None:
+            return (), iter([])
+        col_names = tuple(desc[0] for desc in cursor.description)
+        def batches():
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield list(rows)
+        return col_names, batches()
+
+def batched(rows, batch_size):
+    """
+        Splits an iterable of rows into lists of at most batch_size rows.
+    """
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            return
+        yield batch
 
 """
     Implements engine-specific identifier matching rules
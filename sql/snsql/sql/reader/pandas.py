@@ -1,9 +1,14 @@
 import importlib
 
+import numpy as np
+import pandas as pd
+
 #from snsql.metadata import Metadata
-from .base import SqlReader, NameCompare, Serializer
+from .base import SqlReader, NameCompare, Serializer, batched
 from .engine import Engine
+from .pandas_engine import DataFrameEngine, UnsupportedQuery
 import copy
+import threading
 import warnings
 import re
 
@@ -11,8 +16,21 @@ import re
 class PandasReader(SqlReader):
     ENGINE = Engine.PANDAS
 
-    def __init__(self, df=None, metadata=None, conn=None, **kwargs):
+    def __init__(self, df=None, metadata=None, conn=None, *ignore, native=True, **kwargs):
+        """
+        :param df: The pandas DataFrame to query
+        :param metadata: The metadata describing the DataFrame
+        :param native: If True, evaluate query ASTs directly against the DataFrame
+            when possible, and only fall back to SQLite for SQL the native
+            engine doesn't support.
+        """
         super().__init__(self.ENGINE)
+        self.native = native
+        self._conn = None
+        self._conn_lock = threading.RLock()
+        self._loaded_version = None
+        self._reloads = 0
+        self._weights = None
         if conn is not None:
             df = conn
         if metadata is None:
@@ -56,7 +74,14 @@ class PandasReader(SqlReader):
         return column_name
 
     def _sanitize_metadata(self, metadata):
+        """
+            Returns a copy of the metadata with sanitized column names.  The
+            DataFrame is never modified; self.column_map records which
+            DataFrame column each sanitized name refers to, with None for
+            the row number key added when the metadata has no private_id.
+        """
         metadata = copy.deepcopy(metadata)
+        self.column_map = {}
         table_names = list(metadata.m_tables.keys())
         if len(table_names) > 1:
             raise Exception(
@@ -77,13 +102,13 @@ class PandasReader(SqlReader):
             has_key = (
                 has_key or metadata.m_tables[table_name].m_columns[sanitized_column_name].is_key
             )
-            self.df[sanitized_column_name] = self.df[column_name]
+            self.column_map[sanitized_column_name] = column_name
             if column_name != sanitized_column_name:
                 del metadata.m_tables[table_name].m_columns[column_name]
 
         if not has_key:  # TODO handle this in metadata to avoid circ dep
             key = "primary_key"
-            self.df[key] = range(len(self.df))
+            self.column_map[key] = None
 
             from snsql.metadata import Int
 
@@ -114,7 +139,6 @@ class PandasReader(SqlReader):
             specific SQL dialect.  Call execute_typed to fix dialect.
         """
         query = self._sanitize_query(query)
-        from pandasql import sqldf
 
         if not isinstance(query, str):
             raise ValueError("Please pass strings to execute.  To execute ASTs, use execute_typed.")
@@ -135,21 +159,100 @@ class PandasReader(SqlReader):
                     query = query.replace("'{}'".format(new_column_name), new_column_name)
             return query.replace(table_name, df_name)
 
-        for column in self.metadata.m_tables[table_name].m_columns:
-            new_column_name = column.replace(" ", "_").replace("(", "_").replace(")", "_")
-            if self.metadata.m_tables[table_name].m_columns[column].is_key:
-                if column not in self.df:
-                    self.df[column] = range(len(self.df))
-            else:
-                if new_column_name not in self.df:
-                    self.df[new_column_name] = self.df[column]
-
-        df_for_diffpriv1234 = self.df
-        q_result = sqldf(clean_query(query), locals())
+        with self._conn_lock:
+            conn = self._connection(df_name)
+            q_result = pd.read_sql_query(clean_query(query), conn)
         return [tuple([col for col in q_result.columns])] + [
             val[1:] for val in q_result.itertuples()
         ]
 
+    def _df_version(self):
+        # token that changes when the DataFrame is replaced, reshaped or edited in place,
+        # so SQLite sees the same rows the native engine reads from the live DataFrame
+        df = self.df
+        if self._weights is None or len(self._weights) != len(df):
+            # odd weights, so that any single changed value changes the sum
+            self._weights = np.arange(len(df), dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        try:
+            content = tuple([_checksum(df.iloc[:, idx], self._weights) for idx in range(df.shape[1])])
+            if isinstance(df.index, pd.RangeIndex):
+                content += ((df.index.start, df.index.stop, df.index.step),)
+            else:
+                content += (_checksum(df.index.to_series(), self._weights),)
+        except TypeError:
+            # cells pandas can't hash, such as lists, so load every time
+            content = object()
+        return (id(df), df.shape, tuple(df.columns), tuple([str(t) for t in df.dtypes]), content, self._reloads)
+
+    def _connection(self, df_name):
+        """
+            Returns an in-memory SQLite connection with the DataFrame loaded
+            as df_name.  The table is loaded once, and only loaded again when
+            the DataFrame is replaced or its columns or values change, or
+            after reload().
+        """
+        import sqlite3
+
+        version = self._df_version()
+        if self._conn is None:
+            self._conn = sqlite3.connect(":memory:", check_same_thread=False)
+        if self._loaded_version != version:
+            # load under the sanitized names without copying the caller's DataFrame
+            renames = {orig: name for name, orig in self.column_map.items() if orig is not None and orig != name}
+            df = self.df.rename(columns=renames, copy=False) if renames else self.df
+            df.to_sql(
+                df_name,
+                self._conn,
+                index=not any(name is None for name in df.index.names),
+                if_exists="replace"
+            )
+            for name, orig in self.column_map.items():
+                if orig is None:
+                    # row number key, numbered from 0 in DataFrame order
+                    self._conn.execute(f"ALTER TABLE {df_name} ADD COLUMN {name} INTEGER")
+                    self._conn.execute(f"UPDATE {df_name} SET {name} = rowid - 1")
+            self._loaded_version = version
+        return self._conn
+
+    def reload(self):
+        """
+            Reload the DataFrame into SQLite before the next query.  Edits are
+            detected by hashing the DataFrame, so this is only needed for
+            changes the hash can't see, such as edits inside list cells.
+        """
+        with self._conn_lock:
+            self._reloads += 1
+
+    def _execute_ast(self, query, *ignore, accuracy:bool=False):
+        if isinstance(query, str):
+            raise ValueError("Please pass ASTs to execute_ast.  To execute strings, use execute.")
+        if self.native:
+            engine = DataFrameEngine(self.df, list(self.metadata.m_tables.keys()), self.column_map)
+            try:
+                return engine.execute(query)
+            except UnsupportedQuery:
+                pass
+        return super()._execute_ast(query, accuracy=accuracy)
+
+    def _execute_ast_batches(self, query, batch_size):
+        # the whole result is already in memory, so it is computed once and split
+        rows = self._execute_ast(query)
+        if len(rows) == 0:
+            return (), iter([])
+        return tuple(rows[0]), batched(rows[1:], batch_size)
+
+def _checksum(series, weights):
+    """
+    Position-weighted sum of a column's values, modulo 2**64.  Plain numpy
+    columns are summed as raw bits; other columns are hashed by pandas first.
+    """
+    values = series.values
+    if isinstance(values, np.ndarray) and values.dtype.kind in "biufcmM" and values.dtype.itemsize in (1, 2, 4, 8):
+        bits = values.view(f"u{values.dtype.itemsize}").astype(np.uint64, copy=False)
+    else:
+        bits = pd.util.hash_pandas_object(series, index=False).values
+    return int(np.dot(bits, weights))
+
 class PandasNameCompare(NameCompare):
     def __init__(self, search_path=None):
         super().__init__(search_path)
@@ -0,0 +1,623 @@
+import operator
+
+import numpy as np
+import pandas as pd
+
+from snsql._ast.ast import (
+    Query, Table, AliasedSubquery, Top
+)
+from snsql._ast.tokens import Literal, Column
+from snsql._ast.expression import NestedExpression
+from snsql._ast.expressions.sql import AllColumns, AggFunction, RankingFunction
+from snsql._ast.expressions.logical import (
+    BooleanCompare, ColumnBoolean, NestedBoolean, LogicalNot, PredicatedExpression,
+    InCondition, BetweenCondition, IsCondition, CaseExpression, IIFFunction
+)
+from snsql._ast.expressions.numeric import (
+    ArithmeticExpression, MathFunction, PowerFunction, BareFunction, RoundFunction, funcs
+)
+from snsql._ast.expressions.string import CoalesceFunction
+
+"""
+    Evaluates SnSQL query ASTs directly against a pandas DataFrame, without
+    loading the data into SQLite.  Covers the subset of SQL that the private
+    rewriter emits: projections, clamping CASE expressions, WHERE filters, the
+    per-key ROW_NUMBER reservoir sample, GROUP BY and SUM/COUNT/AVG/MIN/MAX.
+    Anything else raises UnsupportedQuery, so the caller can fall back to SQL.
+
+    Expressions follow SQLite semantics where they differ from pandas: NULL
+    comparisons are unknown, integer division truncates, and division by zero
+    is NULL.
+"""
+
+compare_ops = {
+    ">": operator.gt,
+    "<": operator.lt,
+    ">=": operator.ge,
+    "<=": operator.le,
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<>": operator.ne,
+}
+
+class UnsupportedQuery(ValueError):
+    """Raised when a query uses SQL the DataFrame engine can't evaluate."""
+    pass
+
+class DataFrameEngine:
+    """
+    Executes query ASTs against a single pandas DataFrame.
+
+    :param df: The DataFrame backing the table
+    :param table_names: The fully qualified table names that refer to df
+    :param column_map: Optional dictionary mapping the column names used in
+        queries to DataFrame columns.  A value of None adds a row number column.
+        Original DataFrame column names can still be used in queries.
+    """
+    def __init__(self, df, table_names, column_map=None):
+        self.df = df
+        self.table_names = [self._strip(t).lower() for t in table_names]
+        self.column_map = column_map
+
+    def execute(self, query):
+        """
+        Executes a query AST and returns a list of tuples, with the column
+        names in the first row, in the same shape as SqlReader.execute.
+        """
+        if not isinstance(query, Query):
+            raise UnsupportedQuery("Only SELECT queries are supported: " + str(type(query)))
+        rel = self._query(query)
+        header = tuple(rel.names)
+        columns = [_to_list(rel.column(idx)) for idx in range(len(rel.names))]
+        return [header] + list(zip(*columns))
+
+    @staticmethod
+    def _strip(name):
+        return str(name).replace('"', "").replace("`", "").replace("[", "").replace("]", "")
+
+    def _query(self, query):
+        relations = query.source.relations if query.source is not None else []
+        if len(relations) != 1 or len(relations[0].joins) > 0:
+            raise UnsupportedQuery("Only single-relation queries without joins are supported")
+        rel = self._relation(relations[0].primary)
+
+        if query.where is not None:
+            rel = rel.filter(_mask(RowEvaluator(self, rel).eval(query.where.condition), rel))
+
+        quantifier = query.select.quantifier
+        if quantifier is not None and not isinstance(quantifier, Top) and str(quantifier).upper() != "ALL":
+            if str(quantifier).upper() != "DISTINCT":
+                raise UnsupportedQuery("Unsupported SELECT quantifier: " + str(quantifier))
+
+        select_aggs = any([len(ne.find_nodes(AggFunction)) > 0 for ne in query.select.namedExpressions])
+        if query.agg is not None or select_aggs or query.having is not None:
+            rel = self._aggregate(query, rel)
+        else:
+            rel = self._project(query, rel)
+
+        if quantifier is not None and str(quantifier).upper() == "DISTINCT":
+            rel = rel.distinct()
+        if query.order is not None:
+            rel = self._order(query, rel)
+        if query.limit is not None:
+            rel = rel.head(query.limit.n)
+        if isinstance(quantifier, Top):
+            rel = rel.head(quantifier.n)
+        return rel
+
+    def _relation(self, primary):
+        if isinstance(primary, Table):
+            if self._strip(primary.name).lower() not in self.table_names:
+                raise UnsupportedQuery("Unknown table: " + str(primary.name))
+            alias = primary.alias if primary.alias is not None else str(primary.name).split(".")[-1]
+            return self._table(alias)
+        elif isinstance(primary, AliasedSubquery):
+            rel = self._query(primary.query)
+            rel.alias = primary.alias
+            return rel
+        else:
+            raise UnsupportedQuery("Unsupported relation: " + str(type(primary)))
+
+    def _table(self, alias):
+        df = self.df
+        def column(name):
+            return lambda: df[name]
+        def row_number():
+            return pd.Series(np.arange(len(df.index)), index=df.index)
+        if self.column_map is None:
+            return Relation([str(c) for c in df.columns], [column(c) for c in df.columns], df.index, alias)
+        names = list(self.column_map.keys())
+        columns = [column(orig) if orig is not None else row_number for orig in self.column_map.values()]
+        rel = Relation(names, columns, df.index, alias)
+        for idx, orig in enumerate(self.column_map.values()):
+            if orig is not None:
+                rel.add_alias(str(orig), idx)
+        return rel
+
+    def _project(self, query, rel):
+        evaluator = RowEvaluator(self, rel)
+        names = []
+        columns = []
+        for ne in query.select.namedExpressions:
+            if isinstance(ne.expression, AllColumns):
+                names.extend(rel.names)
+                columns.extend([rel.column(idx) for idx in range(len(rel.names))])
+            else:
+                names.append(_output_name(ne))
+                columns.append(_broadcast(evaluator.eval(ne.expression), rel.index))
+        return Relation(names, columns, rel.index)
+
+    def _aggregate(self, query, rel):
+        evaluator = RowEvaluator(self, rel)
+        grouping = []
+        keys = []
+        if query.agg is not None:
+            for ge in query.agg.groupingExpressions:
+                expr = ge.expression
+                try:
+                    key = evaluator.eval(expr)
+                except UnsupportedQuery:
+                    # GROUP BY may reference an alias from the SELECT clause
+                    matches = [
+                        ne.expression for ne in query.select.namedExpressions
+                        if isinstance(expr, Column) and ne.name is not None
+                        and str(ne.name).lower() == self._strip(expr.name).lower()
+                    ]
+                    if len(matches) != 1:
+                        raise
+                    key = evaluator.eval(matches[0])
+                grouping.append(expr)
+                keys.append(_broadcast(key, rel.index))
+        groups = Groups(keys, len(rel.index))
+        group_eval = GroupEvaluator(self, rel, groups, grouping)
+
+        names = []
+        columns = []
+        for ne in query.select.namedExpressions:
+            if isinstance(ne.expression, AllColumns):
+                raise UnsupportedQuery("SELECT * is not supported with GROUP BY")
+            names.append(_output_name(ne))
+            columns.append(_broadcast(group_eval.eval(ne.expression), groups.index))
+        out = Relation(names, columns, groups.index)
+        if query.having is not None:
+            out = out.filter(_mask(group_eval.eval(query.having.condition), out))
+        return out
+
+    def _order(self, query, rel):
+        evaluator = RowEvaluator(self, rel)
+        sort_keys = []
+        for si in query.order.sortItems:
+            values = _broadcast(evaluator.eval(si.expression), rel.index)
+            descending = si.order is not None and str(si.order).upper() == "DESC"
+            sort_keys.append((values, descending))
+        return rel.take(_sort_order(sort_keys))
+
+
+class Relation:
+    """
+    A set of named columns sharing one index.  Columns may be passed as
+    functions, to be loaded on first use.  Filters are applied lazily, so
+    that only the columns a query touches are copied.
+    """
+    def __init__(self, names, columns, index, alias=None):
+        self.names = names
+        self.alias = alias
+        self.index = index
+        self._columns = columns
+        self._lookup = {}
+        for idx, name in enumerate(names):
+            self._lookup.setdefault(str(name).lower(), idx)
+    def column(self, idx):
+        if callable(self._columns[idx]):
+            self._columns[idx] = self._columns[idx]()
+        return self._columns[idx]
+    def add_alias(self, name, idx):
+        self._lookup.setdefault(str(name).lower(), idx)
+    def find(self, name):
+        parts = DataFrameEngine._strip(name).split(".")
+        colname = parts[-1].lower()
+        if colname not in self._lookup:
+            raise UnsupportedQuery("Column cannot be found " + str(name))
+        return self.column(self._lookup[colname])
+    def filter(self, mask):
+        return FilteredRelation(self, mask)
+    def take(self, positions):
+        columns = [self.column(idx).iloc[positions] for idx in range(len(self.names))]
+        return Relation(self.names, columns, self.index[positions], self.alias)
+    def head(self, n):
+        return self.take(np.arange(min(int(n), len(self.index))))
+    def distinct(self):
+        frame = pd.DataFrame({idx: self.column(idx) for idx in range(len(self.names))}, index=self.index)
+        positions = np.flatnonzero(~frame.duplicated().to_numpy())
+        return self.take(positions)
+
+class FilteredRelation(Relation):
+    def __init__(self, parent, mask):
+        super().__init__(parent.names, [None] * len(parent.names), parent.index[mask], parent.alias)
+        self._parent = parent
+        self._mask = mask
+        self._lookup = parent._lookup
+    def column(self, idx):
+        if self._columns[idx] is None:
+            self._columns[idx] = self._parent.column(idx)[self._mask]
+        return self._columns[idx]
+
+
+class Groups:
+    """
+    Dense integer group codes for a list of key columns, ordered by key
+    as SQLite orders GROUP BY output.  With no keys, every row belongs to a
+    single group, which exists even when there are no rows.
+    """
+    def __init__(self, keys, n_rows):
+        if len(keys) == 0:
+            self.codes = np.zeros(n_rows, dtype=np.int64)
+            self.ngroups = 1
+            self.keys = []
+        else:
+            frame = pd.DataFrame({idx: k.to_numpy() for idx, k in enumerate(keys)})
+            grouped = frame.groupby(list(range(len(keys))), sort=True, dropna=False)
+            self.codes = grouped.ngroup().to_numpy()
+            self.ngroups = grouped.ngroups
+            group_index = grouped.size().index
+            self.keys = [
+                pd.Series(group_index.get_level_values(idx).to_numpy(), index=pd.RangeIndex(self.ngroups))
+                for idx in range(len(keys))
+            ]
+        self.index = pd.RangeIndex(self.ngroups)
+    def aggregate(self, values, how, distinct=False):
+        if distinct:
+            frame = pd.DataFrame({"g": self.codes, "v": values.to_numpy()}).dropna().drop_duplicates()
+            codes = frame["g"].to_numpy()
+            values = frame["v"]
+        else:
+            codes = self.codes
+        grouped = values.groupby(codes)
+        if how == "count":
+            res = grouped.count()
+        elif how == "sum":
+            res = grouped.sum(min_count=1)
+        elif how == "avg":
+            res = grouped.mean()
+        elif how == "min":
+            res = grouped.min()
+        elif how == "max":
+            res = grouped.max()
+        else:
+            raise UnsupportedQuery("Unsupported aggregate: " + how)
+        res = res.reindex(self.index)
+        if how == "count":
+            res = res.fillna(0).astype(np.int64)
+        return res
+    def size(self):
+        return pd.Series(np.bincount(self.codes, minlength=self.ngroups), index=self.index)
+
+
+class RowEvaluator:
+    """
+    Evaluates scalar expressions to columns, one value per row of a relation.
+    """
+    def __init__(self, engine, rel):
+        self.engine = engine
+        self.rel = rel
+
+    @property
+    def index(self):
+        return self.rel.index
+
+    def column(self, expr):
+        return self.rel.find(expr.name)
+
+    def aggregate(self, expr):
+        raise UnsupportedQuery("Aggregate function used outside of an aggregate query: " + str(expr))
+
+    def eval(self, expr):
+        if isinstance(expr, Column):
+            return self.column(expr)
+        elif isinstance(expr, AggFunction):
+            return self.aggregate(expr)
+        elif isinstance(expr, Literal):
+            return expr.value
+        elif isinstance(expr, (NestedExpression, NestedBoolean)):
+            return self.eval(expr.expression)
+        elif isinstance(expr, ArithmeticExpression):
+            return _arithmetic(expr.op, self.eval(expr.left), self.eval(expr.right))
+        elif isinstance(expr, BooleanCompare):
+            op = str(expr.op).lower()
+            if op == "and":
+                return _as_bool(self.eval(expr.left), self.index) & _as_bool(self.eval(expr.right), self.index)
+            elif op == "or":
+                return _as_bool(self.eval(expr.left), self.index) | _as_bool(self.eval(expr.right), self.index)
+            elif op in compare_ops:
+                return _compare(compare_ops[op], self.eval(expr.left), self.eval(expr.right), self.index)
+            raise UnsupportedQuery("Unsupported operator: " + op)
+        elif isinstance(expr, ColumnBoolean):
+            return _as_bool(self.eval(expr.expression), self.index)
+        elif isinstance(expr, LogicalNot):
+            return ~_as_bool(self.eval(expr.expression), self.index)
+        elif isinstance(expr, PredicatedExpression):
+            return self._predicate(expr)
+        elif isinstance(expr, CaseExpression):
+            return self._case(expr)
+        elif isinstance(expr, IIFFunction):
+            test = _as_bool(self.eval(expr.test), self.index)
+            return _choose([(test, self.eval(expr.yes))], self.eval(expr.no), self.index)
+        elif isinstance(expr, MathFunction):
+            name = str(expr.name).lower()
+            if name not in funcs:
+                raise UnsupportedQuery("Unsupported function: " + name)
+            val = self.eval(expr.expression)
+            return None if val is None else funcs[name](_numeric(val))
+        elif isinstance(expr, PowerFunction):
+            val = self.eval(expr.expression)
+            return None if val is None else np.power(_numeric(val), expr.power.value)
+        elif isinstance(expr, RoundFunction):
+            val = self.eval(expr.expression)
+            decimals = expr.decimals.value if expr.decimals is not None else 0
+            return None if val is None else np.round(_numeric(val), decimals if decimals else 0)
+        elif isinstance(expr, CoalesceFunction):
+            res = None
+            for e in expr.expressions:
+                val = self.eval(e)
+                if res is None:
+                    res = val
+                elif not _is_scalar(res) and val is not None:
+                    res = res.fillna(val)
+            return res
+        elif isinstance(expr, BareFunction):
+            name = str(expr.name).lower()
+            if name in ["random", "rand"]:
+                return pd.Series(np.random.random(len(self.index)), index=self.index)
+            elif name == "pi":
+                return np.pi
+            raise UnsupportedQuery("Unsupported function: " + name)
+        elif isinstance(expr, RankingFunction):
+            return self._row_number(expr)
+        else:
+            raise UnsupportedQuery("Unsupported expression: " + str(type(expr).__name__))
+
+    def _predicate(self, expr):
+        val = self.eval(expr.expression)
+        pred = expr.predicate
+        if isinstance(pred, IsCondition):
+            if str(pred.value).upper() != "NULL":
+                raise UnsupportedQuery("Only IS NULL predicates are supported")
+            res = _broadcast(val, self.index).isna().astype("boolean")
+        elif isinstance(pred, InCondition):
+            values = [self.eval(e) for e in pred.expressions]
+            if not all([_is_scalar(v) for v in values]):
+                raise UnsupportedQuery("IN lists must be literals")
+            val = _broadcast(val, self.index)
+            res = val.isin(values).astype("boolean")
+            res[val.isna()] = pd.NA
+        elif isinstance(pred, BetweenCondition):
+            val = _broadcast(val, self.index)
+            res = (
+                _compare(operator.ge, val, self.eval(pred.lower), self.index)
+                & _compare(operator.le, val, self.eval(pred.upper), self.index)
+            )
+        else:
+            raise UnsupportedQuery("Unsupported predicate: " + str(type(pred).__name__))
+        return ~res if pred.is_not else res
+
+    def _case(self, expr):
+        whens = []
+        for we in expr.when_exprs:
+            if expr.expression is not None:
+                cond = _compare(operator.eq, self.eval(expr.expression), self.eval(we.expression), self.index)
+            else:
+                cond = _as_bool(self.eval(we.expression), self.index)
+            whens.append((cond, self.eval(we.then)))
+        default = self.eval(expr.else_expr) if expr.else_expr is not None else None
+        return _choose(whens, default, self.index)
+
+    def _row_number(self, expr):
+        if str(expr.name).upper() != "ROW_NUMBER":
+            raise UnsupportedQuery("Unsupported ranking function: " + str(expr.name))
+        over = expr.over
+        n = len(self.index)
+        if over.partition is not None:
+            partition, _ = pd.factorize(_broadcast(self.eval(over.partition), self.index))
+        else:
+            partition = np.zeros(n, dtype=np.int64)
+        sort_keys = []
+        if over.order is not None:
+            for si in over.order.sortItems:
+                values = _broadcast(self.eval(si.expression), self.index)
+                descending = si.order is not None and str(si.order).upper() == "DESC"
+                sort_keys.append((values, descending))
+        order = _sort_order([(pd.Series(partition), False)] + sort_keys)
+        # number rows within each run of equal partition codes
+        sorted_partition = partition[order]
+        positions = np.arange(n)
+        starts = np.ones(n, dtype=bool)
+        starts[1:] = sorted_partition[1:] != sorted_partition[:-1]
+        run_start = np.maximum.accumulate(np.where(starts, positions, 0))
+        row_num = np.empty(n, dtype=np.int64)
+        row_num[order] = positions - run_start + 1
+        return pd.Series(row_num, index=self.index)
+
+
+class GroupEvaluator(RowEvaluator):
+    """
+    Evaluates expressions to one value per group.  Aggregate functions are
+    computed over the rows of each group, and grouping expressions resolve
+    to the group keys.
+    """
+    def __init__(self, engine, rel, groups, grouping):
+        super().__init__(engine, rel)
+        self.groups = groups
+        self.grouping = grouping
+        self.rows = RowEvaluator(engine, rel)
+
+    @property
+    def index(self):
+        return self.groups.index
+
+    def eval(self, expr):
+        for idx, ge in enumerate(self.grouping):
+            if expr == ge:
+                return self.groups.keys[idx]
+        return super().eval(expr)
+
+    def column(self, expr):
+        name = DataFrameEngine._strip(expr.name).split(".")[-1].lower()
+        for idx, ge in enumerate(self.grouping):
+            if isinstance(ge, Column) and DataFrameEngine._strip(ge.name).split(".")[-1].lower() == name:
+                return self.groups.keys[idx]
+        raise UnsupportedQuery("Column must appear in GROUP BY or an aggregate function: " + str(expr))
+
+    def aggregate(self, expr):
+        name = str(expr.name).upper()
+        distinct = expr.quantifier is not None and str(expr.quantifier).upper() == "DISTINCT"
+        if isinstance(expr.expression, AllColumns):
+            if name != "COUNT":
+                raise UnsupportedQuery("Only COUNT can be applied to *")
+            return self.groups.size()
+        values = _broadcast(self.rows.eval(expr.expression), self.rows.index)
+        how = {"SUM": "sum", "COUNT": "count", "AVG": "avg", "MIN": "min", "MAX": "max"}.get(name)
+        if how is None:
+            raise UnsupportedQuery("Unsupported aggregate function: " + name)
+        return self.groups.aggregate(values, how, distinct)
+
+
+#
+#   Helpers for SQL semantics over pandas columns
+#
+def _is_scalar(val):
+    return not isinstance(val, (pd.Series, np.ndarray))
+
+def _broadcast(val, index):
+    if _is_scalar(val):
+        return pd.Series([val] * len(index), index=index, dtype=object if val is None else None)
+    return val
+
+def _numeric(val):
+    if isinstance(val, pd.Series) and val.dtype == object:
+        return pd.to_numeric(val)
+    return val
+
+def _is_integer(val):
+    if isinstance(val, pd.Series):
+        return val.dtype.kind in "iu"
+    return isinstance(val, (int, np.integer)) and not isinstance(val, bool)
+
+def _arithmetic(op, left, right):
+    if left is None or right is None:
+        return None
+    left = _numeric(left)
+    right = _numeric(right)
+    if op == "/" or op == "%":
+        both_int = _is_integer(left) and _is_integer(right)
+        if _is_scalar(right):
+            if right == 0:
+                return None
+            divisor = right
+        else:
+            divisor = right.astype(float).where(right != 0)
+        if op == "/":
+            res = left / divisor
+            if both_int:
+                res = np.trunc(res)
+        else:
+            res = np.fmod(left, divisor)
+        if both_int and not _is_scalar(res):
+            # SQLite keeps integer results integral
+            res = res.astype("Int64") if res.isna().any() else res.astype(np.int64)
+        elif both_int:
+            res = int(res)
+        return res
+    if op == "+":
+        return left + right
+    elif op == "-":
+        return left - right
+    elif op == "*":
+        return left * right
+    raise UnsupportedQuery("Unsupported operator: " + str(op))
+
+def _is_text(val):
+    if isinstance(val, pd.Series):
+        return val.dtype.kind in "OSU" and pd.api.types.infer_dtype(val, skipna=True) == "string"
+    return isinstance(val, str)
+
+def _is_number(val):
+    if isinstance(val, pd.Series):
+        return val.dtype.kind in "iufb"
+    return isinstance(val, (int, float, np.number, np.bool_))
+
+def _compare(op, left, right, index):
+    if left is None or right is None:
+        return pd.Series(pd.NA, index=index, dtype="boolean")
+    if _is_scalar(left) and _is_scalar(right):
+        return op(left, right)
+    if (_is_number(left) and _is_text(right)) or (_is_text(left) and _is_number(right)):
+        # SQLite converts between text and numbers by column affinity
+        raise UnsupportedQuery("Comparison between text and numbers")
+    try:
+        res = op(left, right)
+    except TypeError:
+        raise UnsupportedQuery("Comparison between mismatched types")
+    res = res.astype("boolean")
+    nulls = np.zeros(len(index), dtype=bool)
+    for side in [left, right]:
+        if not _is_scalar(side):
+            nulls |= side.isna().to_numpy()
+    if nulls.any():
+        res[nulls] = pd.NA
+    return res
+
+def _as_bool(val, index):
+    if val is None:
+        return pd.Series(pd.NA, index=index, dtype="boolean")
+    if _is_scalar(val):
+        return pd.Series(bool(val), index=index, dtype="boolean")
+    if val.dtype == object:
+        return val.map(lambda v: None if v is None else bool(v)).astype("boolean")
+    return val.astype("boolean")
+
+def _mask(val, rel):
+    return _as_bool(val, rel.index).fillna(False).to_numpy(dtype=bool)
+
+def _choose(whens, default, index):
+    """
+    Vectorized CASE: the first true condition wins, otherwise default.
+    """
+    default_null = default is None
+    res = _broadcast(np.nan if default_null else default, index)
+    for cond, then in reversed(whens):
+        cond = cond.fillna(False).to_numpy(dtype=bool) if not _is_scalar(cond) else np.full(len(index), bool(cond))
+        if not cond.any():
+            continue
+        then = np.nan if then is None else then
+        res = res.mask(cond, then)
+    return res
+
+def _sort_order(sort_keys):
+    """
+    Returns positions that stably sort rows by the given (values, descending)
+    keys, with earlier keys taking precedence.
+    """
+    arrays = []
+    for values, descending in sort_keys:
+        if values.dtype.kind in "iufb":
+            arr = values.to_numpy(dtype=float, na_value=np.nan)
+            # SQLite sorts NULL first
+            arr = np.where(np.isnan(arr), -np.inf, arr)
+        else:
+            arr, _ = pd.factorize(values, sort=True)
+        arrays.append(-arr if descending else arr)
+    return np.lexsort(tuple(reversed(arrays)))
+
+def _output_name(ne):
+    if ne.name is not None:
+        return str(ne.name)
+    if isinstance(ne.expression, Column):
+        return DataFrameEngine._strip(ne.expression.name).split(".")[-1]
+    return str(ne.expression)
+
+def _to_list(series):
+    values = series.tolist()
+    nulls = series.isna().to_numpy()
+    if nulls.any():
+        values = [None if null else v for v, null in zip(values, nulls)]
+    return values
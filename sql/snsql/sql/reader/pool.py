@@ -0,0 +1,126 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+from .base import SqlReader
+
+
+class ConnectionPool:
+    """
+        A bounded pool of DB-API connections.  Connections are opened on
+        demand by calling connect, up to size at once, and reused after
+        they are released.  acquire blocks while all connections are in use.
+    """
+    def __init__(self, connect, size=4):
+        if size < 1:
+            raise ValueError("Connection pool size must be at least 1")
+        self.connect = connect
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._all = []
+    def acquire(self, timeout=None):
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError(f"No connection available after {timeout} seconds")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            conn = self.connect()
+        except:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._all.append(conn)
+        return conn
+    def release(self, conn):
+        self._idle.put(conn)
+        self._slots.release()
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+    def close(self):
+        """Closes every connection opened by the pool."""
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            if hasattr(conn, "close"):
+                conn.close()
+        self._idle = queue.LifoQueue()
+
+
+class PooledReader(SqlReader):
+    """
+        Runs each query on a connection checked out from a ConnectionPool,
+        with the reader for the given engine.  Concurrent queries run on
+        different connections, up to the size of the pool.
+    """
+    def __init__(self, pool, engine, **kwargs):
+        super().__init__(engine)
+        self.pool = pool
+        self.reader_class = SqlReader.get_reader_class(engine)
+        self.ENGINE = self.reader_class.ENGINE
+        self._kwargs = kwargs
+        self._readers = {}
+        self._lock = threading.Lock()
+
+    def _reader(self, conn):
+        with self._lock:
+            reader = self._readers.get(id(conn))
+            if reader is None or reader.conn is not conn:
+                reader = self.reader_class(conn=conn, **self._kwargs)
+                self._readers[id(conn)] = reader
+            return reader
+
+    @contextmanager
+    def checkout(self):
+        """Yields a reader bound to a pooled connection, and releases it on exit."""
+        with self.pool.connection() as conn:
+            yield self._reader(conn)
+
+    def execute(self, query, *ignore, accuracy:bool=False):
+        with self.checkout() as reader:
+            return reader.execute(query, accuracy=accuracy)
+    def _execute_ast(self, query, *ignore, accuracy:bool=False):
+        with self.checkout() as reader:
+            return reader._execute_ast(query, accuracy=accuracy)
+    def execute_batches(self, query, batch_size):
+        conn = self.pool.acquire()
+        try:
+            col_names, batches = self._reader(conn).execute_batches(query, batch_size)
+        except:
+            self.pool.release(conn)
+            raise
+        return col_names, _PooledBatches(batches, lambda: self.pool.release(conn))
+
+
+class _PooledBatches:
+    """
+        Iterates over batches from a pooled connection, and releases the
+        connection once the batches are exhausted, closed, or collected.
+    """
+    def __init__(self, batches, release):
+        self.batches = batches
+        self._release = release
+    def __iter__(self):
+        return self
+    def __next__(self):
+        if self._release is None:
+            raise StopIteration
+        try:
+            return next(self.batches)
+        except:
+            self.close()
+            raise
+    def close(self):
+        if self._release is not None:
+            release, self._release = self._release, None
+            release()
+    def __del__(self):
+        self.close()
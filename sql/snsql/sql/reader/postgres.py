@@ -39,11 +39,7 @@ class PostgresReader(SqlReader):
     def execute(self, query, *ignore, accuracy:bool=False):
         if not isinstance(query, str):
             raise ValueError("Please pass strings to execute.  To execute ASTs, use execute_typed.")
-        cnxn = self.conn
-        if cnxn is None:
-            cnxn = self.api.connect(self.connection_string)
-        cursor = cnxn.cursor()
-        cursor.execute(str(query))
+        cursor = self._cursor(query)
         if cursor.description is None:
             return []
         else:
@@ -51,6 +47,19 @@ class PostgresReader(SqlReader):
             rows = [row for row in cursor]
             return col_names + rows
 
+    def execute_batches(self, query, batch_size):
+        if not isinstance(query, str):
+            raise ValueError("Please pass strings to execute.  To execute ASTs, use execute_typed.")
+        return self._cursor_batches(self._cursor(query), batch_size)
+
+    def _cursor(self, query):
+        cnxn = self.conn
+        if cnxn is None:
+            cnxn = self.api.connect(self.connection_string)
+        cursor = cnxn.cursor()
+        cursor.execute(str(query))
+        return cursor
+
     def _update_connection_string(self):
         self.connection_string = "user='{0}' host='{1}'".format(self.user, self.host)
         self.connection_string += (
@@ -1,3 +1,4 @@
+import itertools
 import os
 from sqlite3.dbapi2 import connect
 
@@ -43,11 +44,32 @@ class PrestoReader(SqlReader):
             tuples for rows.  This will NOT fix the query to target the
             specific SQL dialect.  Call execute_typed to fix dialect.
         """
-        import prestodb
-        self.api = prestodb.dbapi
+        if not isinstance(query, str):
+            raise ValueError("Please pass strings to execute.  To execute ASTs, use execute_typed.")
+        cursor = self._cursor(query)
+        rows = cursor.fetchall()
+        if cursor.description is None:
+            return []
+        else:
+            col_names = [tuple(desc[0] for desc in cursor.description)]
+            rows = [row for row in rows]
+            return col_names + rows
 
+    def execute_batches(self, query, batch_size):
         if not isinstance(query, str):
             raise ValueError("Please pass strings to execute.  To execute ASTs, use execute_typed.")
+        cursor = self._cursor(query)
+        # the column description is only available once rows have been fetched
+        first = cursor.fetchmany(batch_size)
+        if cursor.description is None:
+            return (), iter([])
+        col_names, rest = self._cursor_batches(cursor, batch_size)
+        return col_names, itertools.chain([list(first)] if first else [], rest)
+
+    def _cursor(self, query):
+        import prestodb
+        self.api = prestodb.dbapi
+
         if self.conn is not None:
             cnxn = self.conn
         else:
@@ -60,13 +82,7 @@ class PrestoReader(SqlReader):
             )
         cursor = cnxn.cursor()
         cursor.execute(str(query).replace(";", ""))
-        rows = cursor.fetchall()
-        if cursor.description is None:
-            return []
-        else:
-            col_names = [tuple(desc[0] for desc in cursor.description)]
-            rows = [row for row in rows]
-            return col_names + rows
+        return cursor
 
     def update_connection_string(self):
         self.connection_string = None
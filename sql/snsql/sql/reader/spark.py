@@ -1,4 +1,4 @@
-from .base import Serializer, SqlReader, NameCompare
+from .base import Serializer, SqlReader, NameCompare, batched
 from .engine import Engine
 
 from snsql._ast.tokens import FuncName, Literal
@@ -20,6 +20,10 @@ class SparkReader(SqlReader):
         res = self.api.sql(query)
         return res
 
+    def execute_batches(self, query, batch_size):
+        res = self.execute(query)
+        return tuple(res.columns), batched(res.toLocalIterator(), batch_size)
+
     def _to_df(rows):
         return rows
 
@@ -47,12 +47,7 @@ class SqlServerReader(SqlReader):
     def execute(self, query, *ignore, accuracy:bool=False):
         if not isinstance(query, str):
             raise ValueError("Please pass strings to execute.  To execute ASTs, use execute_typed.")
-        if self.conn is not None:
-            cnxn = self.conn
-        else:
-            cnxn = self.api.connect(self.connection_string)
-        cursor = cnxn.cursor()
-        cursor.execute(str(query))
+        cursor = self._cursor(query)
         if cursor.description is None:
             return []
         else:
@@ -60,6 +55,20 @@ class SqlServerReader(SqlReader):
             rows = [row for row in cursor]
             return col_names + rows
 
+    def execute_batches(self, query, batch_size):
+        if not isinstance(query, str):
+            raise ValueError("Please pass strings to execute.  To execute ASTs, use execute_typed.")
+        return self._cursor_batches(self._cursor(query), batch_size)
+
+    def _cursor(self, query):
+        if self.conn is not None:
+            cnxn = self.conn
+        else:
+            cnxn = self.api.connect(self.connection_string)
+        cursor = cnxn.cursor()
+        cursor.execute(str(query))
+        return cursor
+
     def update_connection_string(self):
         self.connection_string = "Server={0}{1};UID={2}".format(
             self.host, "" if self.port is None else "," + str(self.port), self.user
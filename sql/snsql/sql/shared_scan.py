@@ -0,0 +1,106 @@
+"""
+Merges rewritten subqueries that scan the same rows into one query.
+
+Every private query is rewritten into an exact aggregate subquery over a
+chain of derived tables: the clamped columns of the source table, filtered
+by the WHERE clause, optionally reservoir sampled per key, and grouped by
+the GROUP BY expressions.  Queries with different aggregates over the same
+FROM, WHERE, GROUP BY and sampling differ only in the select lists of the
+outermost and innermost query of that chain.  Those queries can be sent to
+the database as a single query whose select lists are the union of theirs,
+and the exact result split back into one result per query.
+"""
+from snsql._ast.ast import AliasedSubquery, AllColumns, From, Query, Relation, Select
+
+# aliases the rewriter gives to the derived tables it wraps around the source
+_rewriter_aliases = ["per_key_random", "per_key_all", "clamped", "not_clamped"]
+
+def _derived(query):
+    """Returns the rewriter's derived table under query, or None."""
+    relations = query.source.relations
+    if len(relations) != 1 or relations[0].joins:
+        return None
+    primary = relations[0].primary
+    if isinstance(primary, AliasedSubquery) and str(primary.alias) in _rewriter_aliases:
+        return primary
+    return None
+
+def _innermost(query):
+    """Returns the query that selects clamped columns from the source."""
+    derived = _derived(query)
+    while derived is not None:
+        query = derived.query
+        derived = _derived(query)
+    return query
+
+def _with_selects(query, outer, inner):
+    """
+    Returns a copy of the subquery chain with the outermost select list
+    replaced by outer and the innermost by inner.  Nodes other than the
+    queries on the chain are shared, not copied.
+    """
+    def rebuild(q, select):
+        derived = _derived(q)
+        if derived is None:
+            return Query(inner, q.source, q.where, q.agg, q.having, q.order, q.limit)
+        source = From([Relation(AliasedSubquery(rebuild(derived.query, derived.query.select), derived.alias), None)])
+        return Query(select, source, q.where, q.agg, q.having, q.order, q.limit)
+    return rebuild(query, outer)
+
+def scan_key(subquery):
+    """
+    Returns a string that is equal for two rewritten subqueries if and only
+    if they read the same rows with the same grouping, whatever they select.
+    """
+    if _derived(subquery) is None:
+        return str(subquery)
+    empty = Select(None, [])
+    return str(_with_selects(subquery, empty, empty))
+
+def _union(selects):
+    """
+    Unions the named expressions of several select lists by name.  Raises
+    ValueError if a name is used for different expressions.
+    """
+    merged = {}
+    for select in selects:
+        for ne in select.namedExpressions:
+            name = str(ne.name) if ne.name is not None else str(ne.expression)
+            if name in merged and str(merged[name].expression) != str(ne.expression):
+                raise ValueError(f"Column {name} has different expressions in the merged queries")
+            merged.setdefault(name, ne)
+    named = list(merged.values())
+    if len(named) > 1:
+        # a lone COUNT(*) selects all columns; the other columns are enough
+        named = [ne for ne in named if not isinstance(ne.expression, AllColumns)]
+    return Select(None, named)
+
+def merge_subqueries(subqueries):
+    """
+    Returns the text of one query that computes every column of the given
+    rewritten subqueries, which must share a scan_key.  Raises ValueError if
+    the subqueries can't be merged.
+    """
+    if len(set(scan_key(s) for s in subqueries)) != 1:
+        raise ValueError("Only subqueries that read the same rows can be merged")
+    first = subqueries[0]
+    if _derived(first) is None:
+        return str(first)
+    outer = _union([s.select for s in subqueries])
+    inner = _union([_innermost(s).select for s in subqueries])
+    return str(_with_selects(first, outer, inner))
+
+def split_exact(exact_aggregates, merged_names, names):
+    """
+    Returns the columns named in names from the exact result of a merged
+    query, with a header row of those names.  Accepts a list of rows with a
+    header, or a Spark DataFrame.
+    """
+    if isinstance(exact_aggregates, list):
+        lower = [n.lower() for n in merged_names]
+        idx = [lower.index(n.lower()) for n in names]
+        return [list(names)] + [tuple(row[i] for i in idx) for row in exact_aggregates[1:]]
+    elif hasattr(exact_aggregates, "select") and hasattr(exact_aggregates, "columns"):
+        # Spark DataFrame
+        return exact_aggregates.select(*names)
+    raise ValueError("Unexpected type for exact_aggregates")
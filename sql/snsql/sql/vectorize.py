@@ -0,0 +1,308 @@
+"""
+Compiles outer query expressions into functions over NumPy columns.
+
+The outer SELECT and HAVING of a private query are evaluated after noise
+has been added, with one binding per output column of the rewritten
+subquery.  Instead of walking the expression tree once per row, the
+functions built here walk it once per query, and each node operates on
+whole columns.  Results match ``evaluate`` on the same values.  Nodes,
+or column values, without a vectorized equivalent raise NotVectorizable,
+and the caller should evaluate that expression row by row instead.
+"""
+import numpy as np
+
+from snsql._ast.tokens import Column, Literal, Op
+from snsql._ast.expression import NestedExpression, NamedExpression
+from snsql._ast.expressions import logical, numeric
+from snsql._ast.expressions.sql import AggFunction
+from snsql._ast.expressions.string import CoalesceFunction
+from snsql._ast.expressions.types import CastFunction
+
+
+class NotVectorizable(ValueError):
+    """The expression, or the values it was given, can't be evaluated on columns."""
+    pass
+
+
+def as_columns(names, arrays):
+    """
+    Builds the bindings for compiled expressions from a list of column
+    names and a matching list of arrays.  Object arrays holding only
+    numbers, or only strings, are converted to typed arrays.
+    """
+    return dict((name.lower(), _infer(arr)) for name, arr in zip(names, arrays))
+
+
+def compile_expression(expr):
+    """
+    Returns a function taking a dictionary of columns from ``as_columns`` and
+    a row count, and returning a NumPy array with one value per row.
+    Raises NotVectorizable if the expression has no vectorized form.
+    """
+    f = _compile(expr)
+    def evaluate(columns, n_rows):
+        with np.errstate(all="ignore"):
+            return _broadcast(f(columns, n_rows), n_rows)
+    return evaluate
+
+
+def truth(vals):
+    """Returns a boolean mask that is True where a value would pass an ``if``."""
+    return _numeric(vals).astype(bool)
+
+
+def _infer(arr):
+    if arr.dtype != object:
+        return arr
+    vals = arr.tolist()
+    types = set(map(type, vals))
+    if not types:
+        return arr
+    if all(issubclass(t, (int, float, np.number)) for t in types):
+        inferred = np.array(vals)
+        return inferred if inferred.dtype.kind in "biuf" else arr
+    elif all(issubclass(t, str) for t in types):
+        return np.array(vals)
+    return arr
+
+
+def _broadcast(v, n_rows):
+    if isinstance(v, np.ndarray) and v.ndim == 1:
+        return v
+    if v is None or isinstance(v, str):
+        arr = np.empty(n_rows, dtype=object)
+        arr.fill(v)
+        return arr
+    return np.full(n_rows, v)
+
+
+def _numeric(v):
+    if isinstance(v, np.ndarray):
+        if v.dtype.kind in "biuf":
+            return v
+    elif isinstance(v, (bool, int, float, np.number, np.bool_)):
+        return v
+    raise NotVectorizable("Expected numeric values")
+
+
+def _is_string(v):
+    if isinstance(v, np.ndarray):
+        return v.dtype.kind == "U"
+    return isinstance(v, str)
+
+
+def _compile(expr):
+    if isinstance(expr, (NestedExpression, NamedExpression, AggFunction)):
+        return _compile(expr.expression)
+    elif isinstance(expr, Literal):
+        value = expr.value
+        return lambda columns, n_rows: value
+    elif isinstance(expr, Column):
+        name = str(expr).lower().replace('"', "")
+        return lambda columns, n_rows: columns.get(name)
+    elif isinstance(expr, numeric.ArithmeticExpression):
+        return _arithmetic(expr)
+    elif isinstance(expr, numeric.MathFunction):
+        if expr.name.lower() not in numeric.funcs:
+            raise NotVectorizable(f"Unknown function {expr.name}")
+        func = numeric.funcs[expr.name.lower()]
+        inner = _compile(expr.expression)
+        return lambda columns, n_rows: func(_numeric(inner(columns, n_rows)))
+    elif isinstance(expr, numeric.PowerFunction):
+        if not isinstance(expr.power, Literal):
+            raise NotVectorizable("Power must be a literal")
+        power = expr.power.value
+        inner = _compile(expr.expression)
+        return lambda columns, n_rows: np.power(_numeric(inner(columns, n_rows)), power)
+    elif isinstance(expr, numeric.RoundFunction):
+        decimals = expr.decimals.value
+        inner = _compile(expr.expression)
+        return lambda columns, n_rows: np.round(_numeric(inner(columns, n_rows)), decimals if decimals else 0)
+    elif isinstance(expr, numeric.TruncFunction):
+        return _trunc(expr)
+    elif isinstance(expr, logical.BooleanCompare):
+        return _compare(_compile(expr.left), expr.op.lower(), _compile(expr.right))
+    elif isinstance(expr, (logical.ColumnBoolean, logical.NestedBoolean)):
+        return _parse_bool(_compile(expr.expression))
+    elif isinstance(expr, logical.LogicalNot):
+        inner = _compile(expr.expression)
+        return lambda columns, n_rows: np.logical_not(_numeric(inner(columns, n_rows)))
+    elif isinstance(expr, logical.PredicatedExpression):
+        return _predicated(expr)
+    elif isinstance(expr, logical.CaseExpression):
+        return _case(expr)
+    elif isinstance(expr, logical.IIFFunction):
+        test = _compile(expr.test)
+        yes = _compile(expr.yes)
+        no = _compile(expr.no)
+        def iif(columns, n_rows):
+            cond = _numeric(test(columns, n_rows)) == True
+            return _select([cond], [yes(columns, n_rows)], no(columns, n_rows), n_rows)
+        return iif
+    elif isinstance(expr, CoalesceFunction):
+        return _coalesce(expr)
+    elif isinstance(expr, CastFunction):
+        return _cast(expr)
+    else:
+        raise NotVectorizable(f"No vectorized form for {type(expr).__name__}")
+
+
+def _arithmetic(expr):
+    left = _compile(expr.left)
+    right = _compile(expr.right)
+    op = expr.op
+    if op not in numeric.ops:
+        raise NotVectorizable(f"Unknown operator {op}")
+    func = numeric.ops[op]
+    def arithmetic(columns, n_rows):
+        l = _numeric(left(columns, n_rows))
+        r = _numeric(right(columns, n_rows))
+        if op == "/":
+            if np.asarray(r).dtype.kind == "f" and np.isnan(r).any():
+                raise NotVectorizable("Can't divide by NaN")
+            # division by zero is defined as zero
+            zero = np.trunc(r) == 0
+            return np.where(zero, 0, l / np.where(zero, 1, r))
+        elif op == "%" and np.any(r == 0):
+            raise NotVectorizable("Modulo by zero")
+        try:
+            return func(l, r)
+        except TypeError as e:
+            raise NotVectorizable(str(e))
+    return arithmetic
+
+
+def _trunc(expr):
+    decimals = expr.decimals.value
+    shift = float(10 ** (decimals if decimals is not None else 0))
+    inner = _compile(expr.expression)
+    def trunc(columns, n_rows):
+        exp = _numeric(inner(columns, n_rows))
+        v = np.floor(np.multiply(exp, shift, dtype=float)) / shift
+        if np.asarray(exp).dtype.kind in "iu":
+            v = v.astype(np.int64)
+        return v
+    return trunc
+
+
+def _compare(left, op, right):
+    if op not in logical.ops:
+        raise NotVectorizable(f"Unknown operator {op}")
+    func = logical.ops[op]
+    def compare(columns, n_rows):
+        l = left(columns, n_rows)
+        r = right(columns, n_rows)
+        if op in ["and", "or"] or not (_is_string(l) and _is_string(r)):
+            l = _numeric(l)
+            r = _numeric(r)
+        return np.asarray(func(l, r), dtype=bool)
+    return compare
+
+
+def _parse_bool(inner):
+    def parse_bool(columns, n_rows):
+        v = _numeric(inner(columns, n_rows))
+        if np.asarray(v).dtype.kind == "b":
+            return v
+        if not np.all((v == 0) | (v == 1)):
+            # parse_bool passes other numbers through unchanged
+            return v
+        return np.asarray(v, dtype=bool)
+    return parse_bool
+
+
+def _predicated(expr):
+    inner = _compile(expr.expression)
+    predicate = expr.predicate
+    if isinstance(predicate, logical.InCondition):
+        values = [_compile(v) for v in predicate.expressions.seq]
+        def test(v, columns, n_rows):
+            choices = [_numeric(c(columns, n_rows)) for c in values]
+            res = np.zeros(np.shape(v), dtype=bool)
+            for c in choices:
+                res = res | (v == c)
+            return res
+    elif isinstance(predicate, logical.BetweenCondition):
+        lower = predicate.lower.value
+        upper = predicate.upper.value
+        def test(v, columns, n_rows):
+            return (v > lower) & (v < upper)
+    elif isinstance(predicate, logical.IsCondition) and predicate.value.text == "NULL":
+        def predicated(columns, n_rows):
+            v = _broadcast(inner(columns, n_rows), n_rows)
+            res = np.equal(v, None) if v.dtype == object else np.zeros(n_rows, dtype=bool)
+            return ~res if predicate.is_not else res
+        return predicated
+    else:
+        raise NotVectorizable(f"No vectorized form for {type(predicate).__name__}")
+    def predicated(columns, n_rows):
+        v = _numeric(inner(columns, n_rows))
+        res = np.asarray(test(v, columns, n_rows), dtype=bool)
+        return ~res if predicate.is_not else res
+    return predicated
+
+
+def _select(conds, values, default, n_rows):
+    conds = [truth(_broadcast(c, n_rows)) for c in conds]
+    values = [_broadcast(v, n_rows) for v in values]
+    default = _broadcast(default, n_rows)
+    kinds = set(v.dtype.kind for v in values + [default])
+    if "O" in kinds or ("U" in kinds and len(kinds) > 1):
+        values = [v.astype(object) for v in values]
+        default = default.astype(object)
+    try:
+        return np.select(conds, values, default)
+    except (TypeError, ValueError) as e:
+        raise NotVectorizable(str(e))
+
+
+def _case(expr):
+    if expr.expression is not None:
+        conds = [_compile(logical.BooleanCompare(expr.expression, Op("="), we.expression)) for we in expr.when_exprs]
+    else:
+        conds = [_compile(we.expression) for we in expr.when_exprs]
+    thens = [_compile(we.then) for we in expr.when_exprs]
+    otherwise = _compile(expr.else_expr) if expr.else_expr else None
+    def case(columns, n_rows):
+        default = otherwise(columns, n_rows) if otherwise else None
+        return _select(
+            [c(columns, n_rows) for c in conds],
+            [t(columns, n_rows) for t in thens],
+            default,
+            n_rows
+        )
+    return case
+
+
+def _coalesce(expr):
+    exprs = [_compile(e) for e in expr.expressions]
+    def coalesce(columns, n_rows):
+        out = None
+        for e in exprs:
+            v = _broadcast(e(columns, n_rows), n_rows)
+            if out is None:
+                if v.dtype != object:
+                    return v
+                out = v.copy()
+            else:
+                missing = np.equal(out, None)
+                out[missing] = v[missing]
+            if not np.equal(out, None).any():
+                break
+        return out
+    return coalesce
+
+
+def _cast(expr):
+    inner = _compile(expr.expression)
+    dbtype = expr.dbtype
+    def cast(columns, n_rows):
+        v = _numeric(inner(columns, n_rows))
+        if dbtype == "integer":
+            if not np.isfinite(v).all():
+                raise NotVectorizable("Can't cast non-finite values to integer")
+            return np.trunc(v).astype(np.int64)
+        elif dbtype == "float":
+            return np.asarray(v, dtype=float)
+        raise NotVectorizable(f"No vectorized cast to {dbtype}")
+    return cast
@@ -2,7 +2,7 @@ from typing import Union, Sequence, Iterable
 import operator
 import numpy as np
 from numpy.lib.arraysetops import isin
-from pandas.core.indexing import IndexSlice
+from snsql._ast.tokens import node_attributes
 
 ops = {
     ">": operator.gt,
@@ -64,7 +64,7 @@ class AllAttributes:
         return '@*'
     def evaluate(self, node, idx):
         node = traverse_short(node)
-        d = node.__dict__
+        d = node_attributes(node)
         return [Attribute(k, d[k]) for k in d.keys() if d[k] is not None]
 
 class Attribute:
@@ -206,6 +206,16 @@ class RootDescendantSelect:
     def evaluate(self, node, idx):
         r = []
         node = traverse_short(node)
+        if isinstance(self.target, Identifier) and not isinstance(self.condition, IndexSelector) and hasattr(node, '_index_lookup'):
+            # indexed trees list the matching nodes in document order.  Index
+            # conditions are positional at each level of the walk, so they walk.
+            found = node._index_lookup(self.target.name)
+            if found is not None:
+                r = list(flatten(found))
+                if r != [] and self.condition is not None:
+                    r = [self.condition.evaluate(n, idx) for n, idx in zip(r, range(len(r)))]
+                    r = [n for n in r if n is not None]
+                return list(flatten(r))
         # first look at self
         if isinstance(self.target, Identifier):
             cname = node.__class__.__name__
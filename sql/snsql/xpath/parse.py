@@ -8,6 +8,8 @@ from snsql.xpath.parser.XPathErrorListener import SyntaxErrorListener  # type: i
 from antlr4 import *  # type: ignore
 from snsql.xpath.ast import *
 
+import functools
+
 
 class XPath:
     def start_parser(self, stream):
@@ -20,11 +22,12 @@ class XPath:
         return parser
 
     def parse(self, statement):
-        istream = InputStream(statement)
-        parser = self.start_parser(istream)
-        v = StatementVisitor()
-        s = v.visit(parser.statement())
-        return s
+        """
+            Returns the compiled Statement for an XPath string.  Statements
+            don't change when evaluated, so they are shared by every caller
+            that parses the same string.
+        """
+        return _compile(statement)
 
     def parse_only(self, statement):
         istream = InputStream(statement)
@@ -33,6 +36,14 @@ class XPath:
         return None
 
 
+@functools.lru_cache(maxsize=1024)
+def _compile(statement):
+    istream = InputStream(statement)
+    parser = XPath().start_parser(istream)
+    v = StatementVisitor()
+    return v.visit(parser.statement())
+
+
 class StatementVisitor(XPathVisitor):
     def visitStatement(self, ctx):
         return self.visit(ctx.innerStatement())
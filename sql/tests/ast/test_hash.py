@@ -0,0 +1,74 @@
+import copy
+import pickle
+
+from snsql._ast.ast import Column, NamedExpression, Literal
+from snsql._ast.tokens import Sql, InternTable
+from snsql.sql.parse import QueryParser
+
+query = "SELECT educ, SUM(age) * 2 AS a, SUM(age) * 2 + 1 AS b, AVG(age) / (SUM(age) * 2) AS c FROM PUMS.PUMS GROUP BY educ"
+
+def _expressions(q):
+    return [ne.expression for ne in q.select.namedExpressions]
+
+class TestCachedHash:
+    def test_same_hash(self):
+        a, b = _expressions(QueryParser().query(query)), _expressions(QueryParser().query(query))
+        assert([hash(e) for e in a] == [hash(e) for e in b])
+        assert([hash(e) for e in a[1:]] == [hash(tuple(e.children())) for e in a[1:]])
+        assert([e.symbol_name() for e in a] == [e.symbol_name() for e in b])
+    def test_mutation(self):
+        q = QueryParser().query(query)
+        expr = q.select.namedExpressions[1].expression
+        before = hash(expr)
+        expr.right = Literal(3)
+        assert(hash(expr) != before)
+        assert(hash(expr) == hash(tuple(expr.children())))
+        q.select.namedExpressions[0] = NamedExpression(None, Column("sex"))
+        assert(str(q.select.namedExpressions[0]) == "sex")
+    def test_frozen(self):
+        q = QueryParser().query(query)
+        expr = q.select.namedExpressions[1].expression
+        before = hash(expr)
+        assert(q.freeze() is q and expr._hash == before)
+        assert(expr.left._hash == hash(tuple(expr.left.children())))
+        expr.thaw()
+        expr.right = Literal(3)
+        assert(getattr(expr, "_hash", None) is None and hash(expr) != before)
+        q.freeze()
+        assert(expr._hash == hash(tuple(expr.children())))
+    def test_copies(self):
+        expr = _expressions(QueryParser().query(query))[2].freeze()
+        h = hash(expr)
+        assert(hash(copy.deepcopy(expr)) == h)
+        assert(getattr(pickle.loads(pickle.dumps(expr)), "_hash", None) is None)
+        assert(hash(pickle.loads(pickle.dumps(expr))) == h)
+    def test_attributes(self):
+        q = QueryParser().query(query)
+        hash(q.select.namedExpressions[1].expression)
+        assert('_hash' not in [a.name for a in q.xpath("//ArithmeticExpression/@*")])
+
+class TestInternTable:
+    def test_shared(self):
+        q = QueryParser().query(query)
+        text = str(q)
+        table = InternTable()
+        table.intern(q)
+        assert(str(q) == text)
+        a, b, c = _expressions(q)[1:]
+        assert(b.left is a)
+        assert(c.right.expression is a)
+        nodes = q.find_nodes(Sql)
+        assert(len(set([id(n) for n in nodes])) < len(nodes))
+    def test_across_queries(self):
+        table = InternTable()
+        a = table.intern(QueryParser().query(query))
+        b = table.intern(QueryParser().query(query))
+        assert(a is not b)
+        assert(_expressions(a)[1] is _expressions(b)[1])
+        assert(_expressions(b)[1]._hash == hash(tuple(_expressions(b)[1].children())))
+    def test_distinct(self):
+        table = InternTable()
+        q = table.intern(QueryParser().query("SELECT COUNT(*) AS n, COUNT(age) AS m, SUM(age) AS s FROM PUMS.PUMS"))
+        a, b, c = _expressions(q)
+        assert(a is not b and b is not c)
+        assert(str(q) == "SELECT COUNT ( * ) AS n, COUNT ( age ) AS m, SUM ( age ) AS s FROM PUMS.PUMS")
@@ -0,0 +1,37 @@
+import copy
+import pickle
+
+from snsql._ast.ast import Query, TableColumn
+from snsql._ast.tokens import Sql, SqlRel, Symbol, Token, Identifier, node_attributes
+from snsql.sql.parse import QueryParser
+
+query = "SELECT educ, SUM(age) * 2 AS a, CASE WHEN sex = '1' THEN 1 ELSE 0 END AS b FROM PUMS.PUMS WHERE age > 18 GROUP BY educ ORDER BY a LIMIT 10"
+
+class TestSlots:
+    def test_no_dict(self):
+        q = QueryParser().query(query)
+        nodes = [n for n in q.find_nodes(Sql) if not isinstance(n, (SqlRel, TableColumn))]
+        assert(len(nodes) > 20)
+        assert(not any([hasattr(n, "__dict__") for n in nodes]))
+        assert(hasattr(q, "__dict__"))
+        assert(not hasattr(Symbol(None), "__dict__"))
+    def test_tokens(self):
+        t = Token("SUM")
+        assert(not hasattr(t, "__dict__"))
+        assert(t.text == "SUM" and type(t.text) is str)
+        assert(str(t) == "SUM" and t == "SUM" and hash(t) == hash("SUM"))
+        assert(Identifier("a") == Identifier("a"))
+        assert(pickle.loads(pickle.dumps(t)) == t)
+    def test_attributes(self):
+        q = QueryParser().query(query)
+        ne = q.select.namedExpressions[1]
+        assert(list(node_attributes(ne).keys()) == ["name", "expression"])
+        assert(sorted(node_attributes(ne.expression).keys()) == ["left", "op", "right"])
+        hash(ne.expression)
+        assert("_hash" not in node_attributes(ne.expression))
+    def test_copies(self):
+        q = QueryParser().query(query)
+        for c in [copy.deepcopy(q), pickle.loads(pickle.dumps(q))]:
+            assert(str(c) == str(q))
+            assert(type(c) is Query)
+            assert([type(n) for n in c.find_nodes(Sql)] == [type(n) for n in q.find_nodes(Sql)])
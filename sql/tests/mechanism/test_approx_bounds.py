@@ -1,4 +1,4 @@
-from snsql.sql._mechanisms.approx_bounds import approx_bounds
+from snsql.sql._mechanisms.approx_bounds import approx_bounds, approx_bounds_chunks, bounds_histogram, quantile, _edges
 import numpy as np
 
 class TestApproximateBounds:
@@ -38,3 +38,35 @@ class TestApproximateBounds:
         min, max = approx_bounds(vals, 10.0)
         assert (min == 1.0)
         assert (max >= 2**35 and max <= 2**37)
+    def test_histogram_edges(self):
+        vals = np.concatenate([2.0 ** np.arange(-3, 60), -(2.0 ** np.arange(-3, 60)), [0.0, -1.0, 1.0]])
+        for v in vals:
+            hist = bounds_histogram([v])
+            assert(hist.sum() == 1)
+            l, u = _edges(int(np.flatnonzero(hist)[0]))
+            assert(l <= v < u)
+    def test_histogram_merge(self):
+        vals = np.random.default_rng(0).normal(0, 1e6, 10000)
+        chunks = np.array_split(vals, 7)
+        assert(np.array_equal(bounds_histogram(vals), sum(bounds_histogram(c) for c in chunks)))
+        assert(bounds_histogram([1.0, np.nan]).sum() == 1)
+    def test_bounds_chunks(self):
+        vals = [2**10, 2**20, 2**30, 2**40] * 100
+        min, max = approx_bounds_chunks((vals[i:i + 30] for i in range(0, len(vals), 30)), 1.0)
+        assert(min > 2**8 and min < 2**12)
+        assert(max > 2**38 and max < 2**42)
+
+class TestQuantile:
+    def test_median(self):
+        vals = np.arange(1000)
+        median = quantile(vals, 0.5, 1.0, 0, 1000)
+        assert(400 < median < 600)
+    def test_clamped(self):
+        vals = [-50, 150] * 100
+        assert(0 <= quantile(vals, 0.5, 1.0, 0, 100) <= 100)
+    def test_tied_values(self):
+        # the only nonzero gaps are far from the quantile, and their weights
+        # underflow unless they are normalized in log space
+        vals = [50] * 2000
+        v = quantile(vals, 0.5, 1.0, 0, 100)
+        assert(0 <= v <= 100)
@@ -0,0 +1,64 @@
+from snsql.sql._mechanisms import Laplace, DiscreteLaplace, DiscreteGaussian
+import numpy as np
+
+class TestColumnRelease:
+    def test_laplace_array(self):
+        mech = Laplace(1.0, sensitivity=1.0)
+        vals = np.arange(1000, dtype=float)
+        noisy = mech.release(vals)
+        assert(len(noisy) == 1000)
+        assert(all(isinstance(v, float) for v in noisy))
+        assert(abs(np.mean(np.array(noisy) - vals)) < 1.0)
+    def test_discrete_laplace_array(self):
+        mech = DiscreteLaplace(1.0, sensitivity=1)
+        vals = np.arange(1000)
+        noisy = mech.release(vals)
+        assert(len(noisy) == 1000)
+        assert(all(isinstance(v, int) for v in noisy))
+        assert(abs(np.mean(np.array(noisy) - vals)) < 1.0)
+    def test_discrete_gaussian_array(self):
+        mech = DiscreteGaussian(1.0, delta=10E-6, sensitivity=1)
+        noisy = mech.release([10.4, 20.6, 30])
+        assert(len(noisy) == 3)
+        assert(all(isinstance(v, int) for v in noisy))
+    def test_empty(self):
+        mech = DiscreteLaplace(1.0, sensitivity=1)
+        assert(mech.release([]) == [])
+        assert(mech.release(np.array([])) == [])
+
+class TestMeasurementCache:
+    def test_measurement_reused(self):
+        mech = DiscreteLaplace(1.0, sensitivity=1)
+        meas = mech._get_measurement(vector=True)
+        mech.release([1, 2, 3])
+        assert(mech._get_measurement(vector=True) is meas)
+        assert(mech._get_measurement(vector=False) is not meas)
+    def test_release_array(self):
+        mech = Laplace(1.0, sensitivity=1.0)
+        noisy = mech.release_array(memoryview(np.zeros(10)))
+        assert(isinstance(noisy, np.ndarray))
+        assert(noisy.shape == (10,))
+    def test_pickle(self):
+        import pickle
+        mech = DiscreteLaplace(1.0, sensitivity=1)
+        mech.release([1, 2, 3])
+        mech2 = pickle.loads(pickle.dumps(mech))
+        assert(mech2.scale == mech.scale)
+        assert(len(mech2.release([1, 2, 3])) == 3)
+
+class TestIntegerRelease:
+    def test_large_integers(self):
+        from snsql.sql._mechanisms.base import _integer_values
+        big = 2 ** 53 + 1
+        assert(_integer_values(np.array([big], dtype=np.int64))[0] == big)
+        assert(_integer_values(np.array([big, None], dtype=object)[:1])[0] == big)
+        assert(list(_integer_values([10.4, 20.6, True])) == [10, 21, 1])
+    def test_release_columns(self):
+        from snsql.sql.private_reader import _release_columns
+        mech = DiscreteLaplace(1.0, sensitivity=1)
+        mech.release = lambda vals: [int(v) for v in vals]
+        big = 2 ** 53 + 1
+        col = np.empty(2, dtype=object)
+        col[:] = [big, None]
+        released = _release_columns([col], [mech], None, None)
+        assert(released[0].dtype == np.int64 and list(released[0]) == [big, 0])
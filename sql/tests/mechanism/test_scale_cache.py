@@ -0,0 +1,103 @@
+import json
+import os
+
+import pytest
+
+from snsql.sql._mechanisms import DiscreteLaplace, DiscreteGaussian, ScaleCache, scale_cache
+
+class TestScaleCache:
+    def test_mechanism_reuses_scale(self):
+        mech = DiscreteLaplace(0.37, sensitivity=7, max_contrib=2)
+        hits = scale_cache.hits
+        mech2 = DiscreteLaplace(0.37, sensitivity=7, max_contrib=2)
+        assert(scale_cache.hits == hits + 1)
+        assert(mech2.scale == mech.scale)
+    def test_key_includes_delta(self):
+        mech = DiscreteGaussian(0.5, delta=10E-5, sensitivity=3)
+        mech2 = DiscreteGaussian(0.5, delta=10E-7, sensitivity=3)
+        assert(mech2.scale > mech.scale)
+    def test_lru_eviction(self):
+        cache = ScaleCache(max_size=2)
+        cache.put(('a',), 1.0)
+        cache.put(('b',), 2.0)
+        assert(cache.get(('a',)) == 1.0)
+        cache.put(('c',), 3.0)
+        assert(('b',) not in cache)
+        assert(('a',) in cache)
+        assert(len(cache) == 2)
+    def test_get_or_compute(self):
+        cache = ScaleCache()
+        calls = []
+        def search():
+            calls.append(1)
+            return 4.2
+        assert(cache.get_or_compute(('x',), search) == 4.2)
+        assert(cache.get_or_compute(('x',), search) == 4.2)
+        assert(len(calls) == 1)
+        assert(cache.hits == 1 and cache.misses == 1)
+    def test_persist(self, tmp_path):
+        path = os.path.join(tmp_path, "scales.json")
+        cache = ScaleCache(path=path)
+        key = ('discrete_laplace', 0.0, 1.0, 1, 1.0, 0.0)
+        cache.put(key, 1.5)
+        cache.flush()
+        assert(os.path.exists(path))
+        cache2 = ScaleCache(path=path)
+        assert(cache2.get(key) == 1.5)
+    def test_batched_saves(self, tmp_path):
+        path = os.path.join(tmp_path, "scales.json")
+        cache = ScaleCache(path=path, save_every=3)
+        for i in range(2):
+            cache.put(('discrete_laplace', 0.0, 1.0, 1, float(i + 1), 0.0), 1.5)
+        assert(not os.path.exists(path))
+        cache.put(('discrete_laplace', 0.0, 1.0, 1, 3.0, 0.0), 1.5)
+        assert(len(ScaleCache(path=path)) == 3)
+        cache.put(('discrete_laplace', 0.0, 1.0, 1, 4.0, 0.0), 1.5)
+        cache.persist(None)
+        assert(len(ScaleCache(path=path)) == 4)
+    def test_tampered(self, tmp_path):
+        path = os.path.join(tmp_path, "scales.json")
+        cache = ScaleCache(path=path)
+        cache.put(('discrete_laplace', 0.0, 1.0, 1, 1.0, 0.0), 1.5)
+        cache.flush()
+        with open(path) as f:
+            saved = json.load(f)
+        for scale in [0.0, -1.0, "1.5", None, float("inf")]:
+            saved["scales"][0][1] = scale
+            with open(path, "w") as f:
+                f.write(json.dumps(saved).replace("Infinity", "1e999"))
+            with pytest.raises(ValueError):
+                ScaleCache(path=path)
+        with pytest.raises(ValueError):
+            cache.put(('discrete_laplace', 0.0, 1.0, 1, 2.0, 0.0), float("nan"))
+    def test_other_version(self, tmp_path):
+        path = os.path.join(tmp_path, "scales.json")
+        with open(path, "w") as f:
+            json.dump([[['discrete_laplace', 0.0, 1.0, 1, 1.0, 0.0], 1.5]], f)
+        with pytest.warns(UserWarning):
+            assert(len(ScaleCache(path=path)) == 0)
+    def test_too_small_scale(self, tmp_path):
+        path = os.path.join(tmp_path, "scales.json")
+        mech = DiscreteLaplace(0.41, sensitivity=3, max_contrib=2)
+        key = ('discrete_laplace', 0.0, 3.0, 2, 0.41, 0.0)
+        cache = ScaleCache(path=path)
+        cache.put(key, 1e-9)
+        cache.flush()
+        scale_cache.persist(path)
+        try:
+            scale_cache.clear()
+            scale_cache.load(path)
+            with pytest.warns(UserWarning):
+                mech2 = DiscreteLaplace(0.41, sensitivity=3, max_contrib=2)
+            assert(mech2.scale == mech.scale)
+            assert(scale_cache.get(key) == mech.scale)
+            scale_cache.put(key, mech.scale)
+            scale_cache.flush()
+            scale_cache.clear()
+            scale_cache.load(path)
+            hits = scale_cache.hits
+            assert(DiscreteLaplace(0.41, sensitivity=3, max_contrib=2).scale == mech.scale)
+            assert(scale_cache.hits == hits + 1)
+        finally:
+            scale_cache.persist(None)
+            scale_cache.clear()
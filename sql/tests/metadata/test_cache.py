@@ -0,0 +1,91 @@
+import copy
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+
+from snsql import metadata
+from snsql.metadata import Metadata, Int
+
+git_root_dir = subprocess.check_output("git rev-parse --show-toplevel".split(" ")).decode("utf-8").strip()
+meta_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS.yaml"))
+
+class TestFileCache:
+    def test_cached(self):
+        metadata.clear_file_cache()
+        a = Metadata.from_(meta_path)
+        assert(os.path.abspath(meta_path) in metadata._file_cache)
+        b = Metadata.from_(meta_path)
+        assert(a is not b and a["PUMS.PUMS"] is not b["PUMS.PUMS"])
+        a["PUMS.PUMS"].censor_dims = False
+        assert(b["PUMS.PUMS"].censor_dims == True)
+    def test_changed_file(self, tmp_path):
+        path = str(tmp_path / "pums.yaml")
+        shutil.copy(meta_path, path)
+        assert(Metadata.from_file(path)["PUMS.PUMS"]["age"].upper == 100)
+        with open(path) as f:
+            text = f.read()
+        with open(path, "w") as f:
+            f.write(text.replace("upper: 100", "upper: 120"))
+        assert(Metadata.from_file(path)["PUMS.PUMS"]["age"].upper == 120)
+
+class TestFingerprint:
+    def test_stable(self):
+        a, b = Metadata.from_file(meta_path), Metadata.from_file(open(meta_path))
+        assert(a.fingerprint == b.fingerprint)
+        assert(a.fingerprint != Metadata.from_file(meta_path.replace("PUMS.yaml", "PUMS_pid.yaml")).fingerprint)
+    def test_edited(self):
+        meta = Metadata.from_file(meta_path)
+        before = meta.fingerprint
+        meta["PUMS.PUMS"]["income"].upper = 10
+        assert(meta.fingerprint != before)
+        meta["PUMS.PUMS"]["income"].upper = Metadata.from_file(meta_path)["PUMS.PUMS"]["income"].upper
+        assert(meta.fingerprint == before)
+
+    def test_cached(self):
+        meta = Metadata.from_file(meta_path)
+        fingerprint = meta.fingerprint
+        assert(meta._fingerprint == fingerprint and meta.fingerprint is fingerprint)
+        meta["PUMS.PUMS"].compare = None
+        assert(meta.fingerprint is fingerprint)
+    def test_invalidated(self):
+        meta = Metadata.from_file(meta_path)
+        table = meta["PUMS.PUMS"]
+        seen = [meta.fingerprint]
+        table.max_ids = 2
+        seen.append(meta.fingerprint)
+        table.m_columns["extra"] = Int("extra", lower=0, upper=1)
+        seen.append(meta.fingerprint)
+        table.m_columns["extra"].upper = 2
+        seen.append(meta.fingerprint)
+        del table.m_columns["extra"]
+        seen.append(meta.fingerprint)
+        meta.m_tables["PUMS.Other"] = meta.m_tables.pop("PUMS.PUMS")
+        seen.append(meta.fingerprint)
+        meta.engine = "postgres"
+        seen.append(meta.fingerprint)
+        assert(all([a != b for a, b in zip(seen, seen[1:])]))
+        assert(seen[4] == seen[1])
+    def test_copies(self):
+        meta = Metadata.from_file(meta_path)
+        for c in [copy.deepcopy(meta), pickle.loads(pickle.dumps(meta))]:
+            assert(c.fingerprint == meta.fingerprint)
+            c["PUMS.PUMS"]["age"].lower = 10
+            assert(c.fingerprint != meta.fingerprint)
+        assert(meta.fingerprint == Metadata.from_file(meta_path).fingerprint)
+
+class TestSnapshot:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "pums.json")
+        meta = Metadata.from_file(meta_path)
+        meta.to_file(path, "PUMS")
+        snapshot = Metadata.from_file(path)
+        assert(snapshot.fingerprint == meta.fingerprint)
+        assert(snapshot.engine == meta.engine and snapshot.dbname == "PUMS")
+    def test_no_yaml(self, tmp_path):
+        path = str(tmp_path / "pums.json")
+        Metadata.from_file(meta_path).to_file(path, "PUMS")
+        code = f"from snsql.metadata import Metadata\nMetadata.from_file({path!r})\nimport sys\nprint('yaml' in sys.modules)"
+        res = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        assert(res.stdout.strip() == "False")
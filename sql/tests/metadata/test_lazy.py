@@ -0,0 +1,89 @@
+import copy
+import os
+import subprocess
+
+import pandas as pd
+import pytest
+import yaml
+
+from snsql.metadata import Metadata, DictCatalog, FileCatalog
+from snsql.sql.privacy import Privacy
+from snsql.sql.private_reader import PrivateReader
+from snsql.sql.reader.pandas import PandasReader
+
+git_root_dir = subprocess.check_output("git rev-parse --show-toplevel".split(" ")).decode("utf-8").strip()
+meta_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS.yaml"))
+csv_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS.csv"))
+
+def large_catalog(tables=20):
+    with open(meta_path) as f:
+        c_s = yaml.safe_load(f)
+    pums = c_s["PUMS"]["PUMS"]["PUMS"]
+    for i in range(tables):
+        c_s["PUMS"]["PUMS"][f"T{i}"] = dict(pums, row_privacy=False, max_ids=3)
+    c_s["PUMS"][""] = {"Flat": dict(pums)}
+    return c_s
+
+class TestLazyMetadata:
+    def test_lookup(self):
+        meta = Metadata.from_dict(large_catalog(), lazy=True)
+        assert(len(meta.m_tables) == 22 and meta.loaded_tables() == [])
+        assert(meta["PUMS.T3"].name == "T3")
+        assert(meta["T4"] is None and meta["PUMS.Missing"] is None)
+        assert(meta["Flat"].schema == "")
+        assert([t.name for t in meta.loaded_tables()] == ["T3", "Flat"])
+        assert(meta["PUMS.T3"] is meta["PUMS.T3"])
+    def test_same_as_eager(self):
+        lazy, eager = Metadata.from_file(meta_path, lazy=True), Metadata.from_file(meta_path)
+        lazy_table, eager_table = lazy["PUMS.PUMS"], eager["PUMS.PUMS"]
+        assert(str(lazy_table) == str(eager_table) and lazy_table.row_privacy)
+        assert(lazy_table.fingerprint == eager_table.fingerprint)
+        assert(len(Metadata.from_dict(large_catalog(), lazy=True).tables()) == 22)
+    def test_fingerprint(self):
+        meta = Metadata.from_dict(large_catalog(), lazy=True)
+        before = meta.fingerprint
+        meta["PUMS.T3"]
+        meta["PUMS.T4"]
+        assert(meta.fingerprint == before)
+        assert(Metadata.from_dict(large_catalog(), lazy=True).fingerprint == before)
+        meta["PUMS.T3"]["age"].upper = 90
+        assert(meta.fingerprint != before)
+        del meta.m_tables["PUMS.T5"]
+        assert(len(set([before, meta.fingerprint, Metadata.from_dict(large_catalog(), lazy=True).fingerprint])) == 2)
+    def test_copy(self):
+        meta = Metadata.from_dict(large_catalog(), lazy=True)
+        meta["PUMS.T1"].max_ids = 5
+        c = copy.deepcopy(meta)
+        assert(c.m_tables.catalog is meta.m_tables.catalog)
+        assert(c["PUMS.T1"].max_ids == 5 and c["PUMS.T1"] is not meta["PUMS.T1"])
+        assert(c.m_tables.unloaded() == meta.m_tables.unloaded())
+    def test_private_reader(self):
+        pums = pd.read_csv(csv_path)
+        meta = Metadata.from_dict(large_catalog(), lazy=True)
+        priv = PrivateReader(PandasReader(pums, meta_path), meta, privacy=Privacy(epsilon=1.0))
+        assert(meta.loaded_tables() == [])
+        res = priv.execute("SELECT COUNT(age) FROM PUMS.PUMS GROUP BY sex")
+        assert(len(res) == 3)
+        assert([t.name for t in meta.loaded_tables()] == ["PUMS"])
+        assert(priv._options.row_privacy and priv._options.max_contrib == 1)
+
+class TestCatalogProviders:
+    def test_dict_catalog(self):
+        catalog = DictCatalog(large_catalog(2)["PUMS"])
+        assert(catalog.table_names() == [("PUMS", "PUMS"), ("PUMS", "T0"), ("PUMS", "T1"), ("", "Flat")])
+        meta = Metadata([], "pandas", dbname="PUMS", catalog=catalog)
+        assert(meta["PUMS.PUMS.T1"].max_ids == 3)
+    def test_file_catalog(self, tmp_path):
+        folder = str(tmp_path / "catalog")
+        eager = Metadata.from_dict(large_catalog(3))
+        catalog = FileCatalog.from_metadata(eager, folder)
+        assert(os.path.exists(os.path.join(folder, "PUMS", "T2.json")))
+        assert(os.path.exists(os.path.join(folder, "Flat.json")))
+        meta = Metadata([], "pandas", dbname="PUMS", catalog=FileCatalog(folder))
+        assert(len(catalog.table_names()) == 5 and meta.loaded_tables() == [])
+        assert(str(meta["PUMS.T2"]) == str(eager["PUMS.T2"]))
+        assert(len(meta.loaded_tables()) == 1)
+        assert(Metadata(meta.tables(), eager.engine, dbname="PUMS").fingerprint == eager.fingerprint)
+    def test_missing_folder(self, tmp_path):
+        with pytest.raises(ValueError):
+            FileCatalog(str(tmp_path / "missing"))
@@ -213,3 +213,45 @@ class TestMultiplier:
             assert(len(res) == 5)
             eps, _ = priv.get_privacy_cost(query)
             assert(eps <= 5.0)
+
+class TestAccumulators:
+    def _recompute(self, steps, tol):
+        delta = 1 - (1 - tol) * np.prod([(1 - delta) for _, delta in steps])
+        basic = np.sum([eps for eps, _ in steps])
+        left = np.sum([((np.exp(eps) - 1) * eps) / ((np.exp(eps) + 1)) for eps, _ in steps])
+        sq = np.sum([eps * eps for eps, _ in steps])
+        optimal_a = left + np.sqrt(2 * sq * np.log(np.exp(1) + (np.sqrt(sq)/tol)))
+        optimal_b = left + np.sqrt(2 * sq * np.log(1/tol))
+        return (min(basic, optimal_a, optimal_b), delta)
+    def test_mixed_steps(self):
+        odo = OdometerHeterogeneous(Privacy(epsilon=1.0, delta=1/1000))
+        rng = np.random.default_rng(0)
+        for eps, delta in zip(rng.uniform(0.01, 2.0, 500), rng.uniform(0.0, 1/1000, 500)):
+            odo.spend(Privacy(epsilon=float(eps), delta=float(delta)))
+        assert(odo.k == 500)
+        assert(np.allclose(odo.spent, self._recompute(odo.steps, odo.tol)))
+        odo.reset()
+        assert(odo.spent == (0.0, 0.0))
+        assert(odo.steps == [])
+    def test_checkpoint(self, tmp_path):
+        privacy = Privacy(epsilon=0.1, delta=1/1000)
+        odo = OdometerHeterogeneous(privacy)
+        for eps in [0.1, 0.5, 0.2]:
+            odo.spend(Privacy(epsilon=eps, delta=1/10000))
+        path = str(tmp_path / "odometer.npz")
+        np.savez(path, **odo.checkpoint())
+        restored = OdometerHeterogeneous(privacy)
+        restored.restore(np.load(path))
+        assert(restored.k == 3)
+        assert(restored.tol == odo.tol)
+        assert(np.allclose(restored.spent, odo.spent))
+        restored.spend()
+        odo.spend()
+        assert(np.allclose(restored.spent, odo.spent))
+    def test_pickle(self):
+        import pickle
+        odo = OdometerHeterogeneous(Privacy(epsilon=0.1, delta=1/1000))
+        odo.spend()
+        copied = pickle.loads(pickle.dumps(odo))
+        copied.spend()
+        assert(copied.k == 2 and odo.k == 1)
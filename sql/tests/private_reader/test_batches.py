@@ -0,0 +1,74 @@
+import os
+import sqlite3
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+from snsql import *
+from snsql.metadata import Metadata
+from snsql.sql.reader.base import SqlReader, batched
+
+git_root_dir = subprocess.check_output("git rev-parse --show-toplevel".split(" ")).decode("utf-8").strip()
+
+meta_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS.yaml"))
+csv_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS.csv"))
+
+df = pd.read_csv(csv_path)
+privacy = Privacy(epsilon=1.0, delta=0.01)
+
+def _reader():
+    # keep every group, so results can be compared with the data
+    meta = Metadata.from_file(meta_path)
+    meta["PUMS.PUMS"].censor_dims = False
+    return from_df(df, privacy=privacy, metadata=meta)
+
+class TestBatches:
+    def test_batches(self):
+        reader = _reader()
+        query = "SELECT age, COUNT(*) AS n FROM PUMS.PUMS GROUP BY age"
+        batches = list(reader.execute_batches(query, batch_size=10))
+        assert(len(batches) > 1)
+        assert(all([b[0] == ['age', 'n'] for b in batches]))
+        assert(all([len(b) <= 11 for b in batches]))
+        ages = [row[0] for b in batches for row in b[1:]]
+        assert(sorted(ages) == sorted(df['age'].unique().tolist()))
+    def test_iter_order_by(self):
+        reader = _reader()
+        query = "SELECT age, COUNT(*) AS n FROM PUMS.PUMS GROUP BY age ORDER BY n DESC, age"
+        rows = list(reader.execute_iter(query, batch_size=7))
+        assert(rows[0] == ['age', 'n'])
+        assert(len(rows) == df['age'].nunique() + 1)
+        assert(rows[1:] == sorted(rows[1:], key=lambda row: (-row[1], row[0])))
+    def test_limit(self):
+        reader = _reader()
+        query = "SELECT age, COUNT(*) AS n FROM PUMS.PUMS GROUP BY age ORDER BY age LIMIT 12"
+        rows = list(reader.execute_iter(query, batch_size=5))
+        assert(len(rows) == 13)
+        assert([row[0] for row in rows[1:]] == sorted(df['age'].unique().tolist())[:12])
+        rows = list(reader.execute_iter("SELECT TOP 3 age, COUNT(*) AS n FROM PUMS.PUMS GROUP BY age", batch_size=2))
+        assert(len(rows) == 4)
+    def test_columnar(self):
+        reader = _reader()
+        query = "SELECT sex, COUNT(*) AS n FROM PUMS.PUMS GROUP BY sex ORDER BY sex"
+        batches = list(reader.execute_batches(query, batch_size=1, columnar=True))
+        assert(len(batches) == 2)
+        assert(batches[0]['n'].dtype == np.int64)
+    def test_spends_on_call(self):
+        reader = _reader()
+        reader.execute_batches("SELECT COUNT(*) AS n FROM PUMS.PUMS")
+        assert(reader.odometer.spent[0] > 0.0)
+
+class TestCursorBatches:
+    def test_fetchmany(self):
+        conn = sqlite3.connect(":memory:")
+        conn.execute("CREATE TABLE t (a INTEGER, b TEXT)")
+        conn.executemany("INSERT INTO t VALUES (?, ?)", [(i, str(i)) for i in range(25)])
+        cursor = conn.cursor()
+        cursor.execute("SELECT a, b FROM t")
+        col_names, batches = SqlReader._cursor_batches(None, cursor, 10)
+        batches = list(batches)
+        assert(col_names == ('a', 'b'))
+        assert([len(b) for b in batches] == [10, 10, 5])
+    def test_batched(self):
+        assert(list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]])
@@ -0,0 +1,101 @@
+import os
+import subprocess
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from snsql import *
+from snsql.metadata import Metadata
+from snsql.sql.private_reader import _object_array, _sort_order
+from snsql.sql.reader.base import SortKey
+
+git_root_dir = subprocess.check_output("git rev-parse --show-toplevel".split(" ")).decode("utf-8").strip()
+
+meta_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS_pid.yaml"))
+csv_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS_pid.csv"))
+
+df = pd.read_csv(csv_path)
+privacy = Privacy(epsilon=1.0, delta=0.01)
+
+class TestColumnar:
+    def test_shape_and_types(self):
+        reader = from_df(df, privacy=privacy, metadata=meta_path)
+        query = "SELECT sex, COUNT(*) AS n, AVG(age) AS age FROM PUMS.PUMS GROUP BY sex"
+        rows = reader.execute(query)
+        res = reader.execute(query, columnar=True)
+        assert(list(res.keys()) == rows[0])
+        assert(all([len(col) == len(rows) - 1 for col in res.values()]))
+        assert(res['n'].dtype == np.int64)
+        assert(res['age'].dtype == np.float64)
+        assert(sorted(res['sex']) == sorted([row[0] for row in rows[1:]]))
+    def test_having_order_limit(self):
+        reader = from_df(df, privacy=privacy, metadata=meta_path)
+        query = "SELECT educ, COUNT(*) AS n, SUM(income) / COUNT(*) AS x FROM PUMS.PUMS GROUP BY educ HAVING n > 50 ORDER BY n DESC LIMIT 3"
+        res = reader.execute(query, columnar=True)
+        assert(len(res['n']) <= 3)
+        assert(all(res['n'] > 50))
+        assert(list(res['n']) == sorted(res['n'], reverse=True))
+    def test_spends_odometer(self):
+        reader = from_df(df, privacy=privacy, metadata=meta_path)
+        query = "SELECT COUNT(*) AS n FROM PUMS.PUMS"
+        reader.execute(query, columnar=True)
+        spent = reader.odometer.spent
+        reader.execute(query)
+        assert(spent[0] > 0.0)
+        assert(reader.odometer.spent[0] == pytest.approx(spent[0] * 2))
+    def test_no_postprocess(self):
+        reader = from_df(df, privacy=privacy, metadata=meta_path)
+        res = reader.execute("SELECT sex, COUNT(*) AS n FROM PUMS.PUMS GROUP BY sex", columnar=True, postprocess=False)
+        assert('keycount' in res)
+    def test_execute_df(self):
+        reader = from_df(df, privacy=privacy, metadata=meta_path)
+        res = reader.execute_df("SELECT sex, COUNT(*) AS n FROM PUMS.PUMS GROUP BY sex")
+        assert(list(res.columns) == ['sex', 'n'])
+        assert(len(res) == 2)
+        assert(res['n'].dtype == np.int64)
+    def test_same_release(self):
+        reader = from_df(df, privacy=privacy, metadata=meta_path)
+        query = "SELECT educ, COUNT(*) AS n FROM PUMS.PUMS GROUP BY educ"
+        rows = list(reader.execute(query, postprocess=False))
+        res = reader.execute(query, columnar=True, postprocess=False)
+        subquery = reader._rewrite(query)[0]
+        kc_pos = reader._get_keycount_position(subquery)
+        tau = reader.tau
+        assert(tau is not None and all([row[kc_pos] > tau for row in rows]))
+        assert(all(res['keycount'] > tau))
+        reader.tau = None
+        assert(reader._censor_threshold(reader._get_mechanisms(subquery), kc_pos) == tau)
+        assert(reader.tau is None)
+
+class TestSortOrder:
+    def _expected(self, columns, sort_fields, limit=None):
+        rows = [[col[i] for col in columns] for i in range(len(columns[0]))]
+        order = sorted(range(len(rows)), key=lambda i: SortKey(rows[i], sort_fields))
+        return order[:limit] if limit is not None else order
+    def test_matches_sort_key(self):
+        rng = np.random.default_rng(0)
+        columns = [
+            rng.integers(0, 5, 1000),
+            rng.choice(['a', 'b', 'c'], 1000).astype(object),
+            rng.integers(0, 3, 1000).astype(float),
+        ]
+        for sort_fields in [[(False, 0)], [(True, 0), (False, 1)], [(False, 1), (True, 2), (False, 0)]]:
+            for limit in [None, 0, 1, 7, 250, 2000]:
+                order = _sort_order(columns, sort_fields, limit)
+                assert(order.tolist() == self._expected(columns, sort_fields, limit))
+    def test_mixed_values(self):
+        with pytest.raises(TypeError):
+            _sort_order([_object_array([3, 'x', 1])], [(False, 0)])
+        assert(_sort_order([_object_array(['b', 'a', 'c'])], [(False, 0)], 2).tolist() == [1, 0])
+    def test_order_by_limit(self):
+        meta = Metadata.from_file(meta_path)
+        meta["PUMS.PUMS"].censor_dims = False
+        reader = from_df(df, privacy=privacy, metadata=meta)
+        query = "SELECT age, educ, COUNT(*) AS n FROM PUMS.PUMS GROUP BY age, educ ORDER BY n DESC, age LIMIT 10"
+        res = reader.execute(query, columnar=True)
+        assert(len(res['n']) == 10)
+        assert(all(res['n'][:-1] >= res['n'][1:]))
+        rows = reader.execute(query)
+        assert(len(rows) == 11)
+        assert(all([a[2] >= b[2] for a, b in zip(rows[1:-1], rows[2:])]))
@@ -0,0 +1,86 @@
+import os
+import subprocess
+
+import pandas as pd
+
+from snsql import *
+from snsql.metadata import Metadata
+from snsql.sql.parse import QueryParser
+from snsql.sql.shared_scan import merge_subqueries, scan_key, split_exact
+
+git_root_dir = subprocess.check_output("git rev-parse --show-toplevel".split(" ")).decode("utf-8").strip()
+
+meta_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS.yaml"))
+csv_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS.csv"))
+pid_meta_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS_pid.yaml"))
+pid_csv_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS_pid.csv"))
+
+df = pd.read_csv(csv_path)
+privacy = Privacy(epsilon=1.0, delta=0.01)
+
+queries = [
+    "SELECT educ, COUNT(*) AS n FROM PUMS.PUMS WHERE age > 30 GROUP BY educ",
+    "SELECT educ, AVG(income) AS income, SUM(age) AS age FROM PUMS.PUMS WHERE age > 30 GROUP BY educ",
+    "SELECT educ, VARIANCE(age) AS v FROM PUMS.PUMS WHERE age > 30 GROUP BY educ ORDER BY educ LIMIT 3",
+    "SELECT sex, COUNT(*) AS n FROM PUMS.PUMS WHERE age > 30 GROUP BY sex",
+    "SELECT COUNT(*) AS n FROM PUMS.PUMS",
+    "SELECT SUM(age) AS age FROM PUMS.PUMS",
+]
+
+def _reader():
+    meta = Metadata.from_file(meta_path)
+    meta["PUMS.PUMS"].censor_dims = False
+    return from_df(df, privacy=privacy, metadata=meta)
+
+def _count_scans(reader):
+    calls = []
+    execute_ast = reader.reader._execute_ast
+    def counted(query, *args, **kwargs):
+        calls.append(query)
+        return execute_ast(query, *args, **kwargs)
+    reader.reader._execute_ast = counted
+    return calls
+
+class TestExecuteBatch:
+    def test_one_scan_per_shape(self):
+        reader = _reader()
+        calls = _count_scans(reader)
+        results = reader.execute_batch(queries)
+        assert(len(calls) == 3)
+        assert(len(results) == len(queries))
+        assert(results[0][0] == ['educ', 'n'])
+        assert(results[1][0] == ['educ', 'income', 'age'])
+        assert(len(results[2]) == 4)
+        assert(sorted([row[0] for row in results[3][1:]]) == sorted(df[df.age > 30]['sex'].astype(str).unique().tolist()))
+        assert(len(results[4]) == 2 and len(results[5]) == 2)
+    def test_exact_split(self):
+        reader = _reader()
+        subqueries = [reader._rewrite(q)[0] for q in queries[:3]]
+        assert(len(set(scan_key(s) for s in subqueries)) == 1)
+        merged = QueryParser(reader.metadata).query(merge_subqueries(subqueries))
+        exact = reader.reader._execute_ast(merged)
+        merged_names = [s.name for s in merged._select_symbols]
+        for subquery in subqueries:
+            names = [s.name for s in subquery._select_symbols]
+            alone = reader.reader._execute_ast(subquery)
+            split = split_exact(exact, merged_names, names)
+            assert(split[0] == names)
+            assert(sorted(split[1:]) == sorted([tuple(row) for row in alone[1:]]))
+    def test_lone_count_star(self):
+        reader = _reader()
+        subqueries = [reader._rewrite(q)[0] for q in queries[4:]]
+        merged = merge_subqueries(subqueries)
+        assert('*' not in merged.split('FROM PUMS.PUMS')[0].split('FROM (')[-1])
+        exact = reader.reader._execute_ast(QueryParser(reader.metadata).query(merged))
+        assert(exact[1][0] == len(df))
+    def test_odometer(self):
+        reader = _reader()
+        reader.execute_batch(queries)
+        assert(reader.odometer.spent == reader.get_privacy_cost(queries))
+    def test_reservoir_sample(self):
+        reader = from_df(pd.read_csv(pid_csv_path), privacy=privacy, metadata=pid_meta_path)
+        calls = _count_scans(reader)
+        results = reader.execute_batch(queries[:3])
+        assert(len(calls) == 1)
+        assert(str(calls[0]).count('ROW_NUMBER') == 1)
+        assert([r[0] for r in results] == [['educ', 'n'], ['educ', 'income', 'age'], ['educ', 'v']])
@@ -1,11 +1,12 @@
 import os
 import subprocess
 
+import numpy as np
 import pandas as pd
 import math
 import pytest
 
-from snsql.sql.dpsu import preprocess_df_from_query, run_dpsu
+from snsql.sql.dpsu import preprocess_df_from_query, policy_laplace, run_dpsu, run_dpsu_chunks
 from snsql.metadata import Metadata
 from snsql.sql import PrivateReader
 from snsql import *
@@ -30,6 +31,25 @@ class TestDPSU:
         assert final_df is not None
         assert(len(final_df["group_cols"][0]) == 1)
 
+    def test_policy_laplace(self):
+        query = "SELECT ngram FROM reddit.reddit GROUP BY ngram"
+        final_df = policy_laplace(preprocess_df_from_query(schema, df, query), 3.0, math.exp(-10), 5)
+
+        assert list(final_df) == ["author", "group_cols"]
+        assert len(final_df) <= len(df)
+
+    def test_run_dpsu_chunks(self, monkeypatch):
+        # no noise, so the saturated items are always above the threshold
+        monkeypatch.setattr("snsql.sql.dpsu.laplace", lambda loc, scale, size: np.zeros(size))
+        users = np.repeat(np.arange(2000), 3)
+        items = np.tile([0, 1, 2], 2000)
+        items[-1] = 99
+        chunked_df = pd.DataFrame({"user": users, "item": items, "tag": "x"})
+        chunks = (chunked_df.iloc[i:i + 1000] for i in range(0, len(chunked_df), 1000))
+        released = run_dpsu_chunks(chunks, "user", ["item", "tag"], 1.0)
+
+        assert sorted(released) == [(0, "x"), (1, "x"), (2, "x")]
+
     @pytest.mark.skip("strange error in CI")
     def test_run_dpsu(self):
         query = "SELECT ngram, COUNT(*) FROM reddit.reddit GROUP BY ngram"
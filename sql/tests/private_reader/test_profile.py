@@ -0,0 +1,121 @@
+import os
+import sqlite3
+import subprocess
+
+import pandas as pd
+
+from snsql import *
+from snsql.metadata import Metadata
+from snsql.sql.profile import QueryProfile
+
+git_root_dir = subprocess.check_output("git rev-parse --show-toplevel".split(" ")).decode("utf-8").strip()
+
+meta_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS.yaml"))
+csv_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS.csv"))
+
+df = pd.read_csv(csv_path)
+privacy = Privacy(epsilon=1.0, delta=0.01)
+
+query = "SELECT educ, COUNT(*) AS n, AVG(age) AS age FROM PUMS.PUMS GROUP BY educ ORDER BY n DESC LIMIT 5"
+
+def _reader():
+    meta = Metadata.from_file(meta_path)
+    meta["PUMS.PUMS"].censor_dims = False
+    return from_df(df, privacy=privacy, metadata=meta)
+
+class TestQueryProfile:
+    def test_stages(self):
+        reader = _reader()
+        profile = QueryProfile()
+        res = reader.execute(query, profile=profile)
+        names = [s.name for s in profile.stages]
+        assert(names == ["parse", "rewrite", "mechanisms", "database", "noise", "postprocess", "sort"])
+        assert(profile.query == query)
+        assert(profile.cache_hit == False)
+        assert(all([s.seconds >= 0.0 for s in profile.stages]))
+        assert(profile.total == sum([s.seconds for s in profile.stages]))
+        n_educ = df.educ.nunique()
+        rows = dict((s.name, s.rows) for s in profile.stages)
+        assert(rows["database"] == n_educ)
+        assert(rows["noise"] == n_educ)
+        assert(rows["sort"] == 5)
+        assert(len(res) == 6)
+    def test_cache_hit(self):
+        reader = _reader()
+        reader.execute(query)
+        profile = QueryProfile()
+        reader.execute(query, profile=profile)
+        assert(profile.cache_hit == True)
+        assert([s.name for s in profile.stages][0] == "database")
+    def test_columnar(self):
+        reader = _reader()
+        profile = QueryProfile()
+        res = reader.execute("SELECT sex, COUNT(*) AS n FROM PUMS.PUMS GROUP BY sex LIMIT 1", columnar=True, profile=profile)
+        assert([s.name for s in profile.stages][-3:] == ["noise", "postprocess", "limit"])
+        assert(profile.stages[-1].rows == 1)
+        assert(len(res["n"]) == 1)
+    def test_observers(self):
+        reader = _reader()
+        seen = []
+        reader.observers.append(seen.append)
+        reader.execute(query)
+        reader.execute_df("SELECT COUNT(*) AS n FROM PUMS.PUMS")
+        assert(len(seen) == 2)
+        assert(seen[0].query == query)
+        assert(seen[1].seconds("database") > 0.0)
+        assert(seen[1].to_dict()["stages"][0]["name"] == "parse")
+    def test_serialize(self, tmp_path):
+        path = str(tmp_path / "pums.db")
+        with sqlite3.connect(path) as conn:
+            df.to_sql("PUMS", conn, index=False)
+        conn = sqlite3.connect(":memory:")
+        conn.execute(f"ATTACH DATABASE '{path}' AS PUMS")
+        reader = from_connection(conn, privacy=privacy, metadata=meta_path, engine="postgres")
+        profile = QueryProfile()
+        reader.execute(query, profile=profile)
+        names = [s.name for s in profile.stages]
+        assert(names.index("serialize") + 1 == names.index("database"))
+    def test_batches(self):
+        reader = _reader()
+        seen = []
+        reader.observers.append(seen.append)
+        batches = reader.execute_batches("SELECT age, COUNT(*) AS n FROM PUMS.PUMS GROUP BY age LIMIT 20", batch_size=10)
+        assert(seen == [])
+        assert(sum([len(b) - 1 for b in batches]) == 20)
+        names = [s.name for s in seen[0].stages]
+        assert(names == ["parse", "rewrite", "mechanisms", "database", "noise", "postprocess", "limit"])
+        rows = dict((s.name, s.rows) for s in seen[0].stages)
+        # batches stop being read once the limit is reached
+        assert(rows["database"] == rows["noise"] == 20 and rows["limit"] == 20)
+    def test_iter(self):
+        reader = _reader()
+        profile = QueryProfile()
+        rows = list(reader.execute_iter(query, batch_size=3, profile=profile))
+        assert(len(rows) == 6)
+        assert([s.name for s in profile.stages][-4:] == ["database", "noise", "postprocess", "sort"])
+        assert(profile.stages[-1].rows == 5 and profile.query == query)
+        seen = []
+        reader.observers.append(seen.append)
+        it = reader.execute_iter("SELECT age, COUNT(*) AS n FROM PUMS.PUMS GROUP BY age", batch_size=10)
+        next(it)
+        next(it)
+        it.close()
+        assert(len(seen) == 1 and seen[0].cache_hit == False)
+    def test_execute_batch(self):
+        reader = _reader()
+        seen = []
+        reader.observers.append(seen.append)
+        queries = [
+            "SELECT educ, COUNT(*) AS n FROM PUMS.PUMS GROUP BY educ",
+            "SELECT educ, AVG(age) AS age FROM PUMS.PUMS GROUP BY educ",
+            "SELECT COUNT(*) AS n FROM PUMS.PUMS",
+        ]
+        reader.execute_batch(queries)
+        assert([p.query for p in seen] == queries)
+        for p in seen:
+            assert([s.name for s in p.stages] == ["parse", "rewrite", "mechanisms", "database", "noise", "postprocess"])
+        assert(seen[0].stages[3] is seen[1].stages[3])
+        assert(seen[0].stages[3] is not seen[2].stages[3])
+        profiles = [QueryProfile(), None, QueryProfile()]
+        reader.execute_batch(queries, profiles=profiles)
+        assert(profiles[0].cache_hit == True and profiles[2].stages[0].name == "database")
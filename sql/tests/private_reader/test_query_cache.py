@@ -0,0 +1,85 @@
+import os
+import subprocess
+import copy
+
+import pandas as pd
+
+from snsql import *
+from snsql.metadata import Metadata
+from snsql.sql.query_cache import QueryCache, normalize_query
+
+git_root_dir = subprocess.check_output("git rev-parse --show-toplevel".split(" ")).decode("utf-8").strip()
+meta_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS.yaml"))
+csv_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS.csv"))
+pums = pd.read_csv(csv_path)
+privacy = Privacy(epsilon=1.0, delta=0.01)
+
+class TestQueryCache:
+    def test_hit_and_miss(self):
+        reader = from_df(pums, privacy=privacy, metadata=meta_path)
+        reader.execute('SELECT sex, COUNT(*) AS n FROM PUMS.PUMS GROUP BY sex')
+        assert(reader.query_cache.misses == 1)
+        assert(reader.query_cache.hits == 0)
+        reader.execute('SELECT sex,  COUNT(*) AS n\nFROM PUMS.PUMS GROUP BY sex')
+        assert(reader.query_cache.hits == 1)
+        assert(len(reader.query_cache) == 1)
+    def test_cached_ast_is_copied(self):
+        reader = from_df(pums, privacy=privacy, metadata=meta_path)
+        query = 'SELECT AVG(age) AS age FROM PUMS.PUMS'
+        subquery, outer = reader._rewrite(query)
+        subquery2, outer2 = reader._rewrite(query)
+        assert(subquery is not subquery2)
+        assert(str(subquery) == str(subquery2))
+        mechs = [s.mechanism for s in subquery._select_symbols if s.mechanism]
+        mechs2 = [s.mechanism for s in subquery2._select_symbols if s.mechanism]
+        assert(len(mechs) == len(mechs2) and len(mechs) > 0)
+        assert(all([m is not m2 and m.scale == m2.scale for m, m2 in zip(mechs, mechs2)]))
+    def test_metadata_change(self):
+        meta = Metadata.from_file(meta_path)
+        reader = from_df(pums, privacy=privacy, metadata=copy.deepcopy(meta))
+        query = 'SELECT SUM(age) AS age FROM PUMS.PUMS'
+        subquery, _ = reader._rewrite(query)
+        reader.metadata['PUMS.PUMS']['age'].upper = 50
+        subquery2, _ = reader._rewrite(query)
+        assert(reader.query_cache.misses == 2)
+        assert(str(subquery) != str(subquery2))
+    def test_privacy_change(self):
+        reader = from_df(pums, privacy=Privacy(epsilon=1.0, delta=0.01), metadata=meta_path)
+        query = 'SELECT COUNT(age) AS n FROM PUMS.PUMS'
+        reader.execute(query)
+        reader.privacy.epsilon = 0.5
+        reader.execute(query)
+        assert(reader.query_cache.misses == 2)
+        assert(reader.odometer.k == 2)
+    def test_eviction(self):
+        cache = QueryCache(max_size=2)
+        cache.put('a', [1])
+        cache.put('b', [2])
+        cache.get('a')
+        cache.put('c', [3])
+        assert('b' not in cache)
+        assert(cache.evictions == 1)
+        assert(cache.get('a') == [1])
+    def test_disabled(self):
+        cache = QueryCache(max_size=0)
+        cache.put('a', [1])
+        assert(cache.get('a') is None)
+    def test_normalize(self):
+        assert(normalize_query(' SELECT  a\n FROM t ') == 'SELECT a FROM t')
+        assert(normalize_query("SELECT a FROM t WHERE b = 'x  y'") == "SELECT a FROM t WHERE b = 'x  y'")
+        q = "SELECT a -- note\nFROM t"
+        assert(normalize_query(q) == q)
+    def test_normalize_identifiers(self):
+        assert(normalize_query('SELECT "a  b",  c FROM t') == 'SELECT "a  b", c FROM t')
+        assert(normalize_query('SELECT "a  b" FROM t') != normalize_query('SELECT "a b" FROM t'))
+        assert(normalize_query("SELECT [a  b],  `c  d` FROM t") == "SELECT [a  b], `c  d` FROM t")
+        assert(normalize_query("SELECT 'it''s  x',  \"q\"\"  r\" FROM t") == "SELECT 'it''s  x', \"q\"\"  r\" FROM t")
+    def test_lazy_metadata(self):
+        meta = Metadata.from_file(meta_path, lazy=True)
+        reader = from_df(pums, privacy=privacy, metadata=meta)
+        query = 'SELECT sex, COUNT(*) AS n FROM PUMS.PUMS GROUP BY sex'
+        key = reader._query_cache_key(query)
+        reader.execute(query)
+        assert(reader._query_cache_key(query) == key)
+        reader.execute(query)
+        assert(reader.query_cache.hits == 1 and len(reader.query_cache) == 1)
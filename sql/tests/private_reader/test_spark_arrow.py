@@ -0,0 +1,44 @@
+from snsql import *
+
+privacy = Privacy(epsilon=3.0, delta=0.1)
+
+class TestSparkArrow:
+    def test_group_by(self, test_databases):
+        priv = test_databases.get_private_reader(
+            privacy=privacy,
+            database="PUMS_pid",
+            engine="spark"
+        )
+        if priv:
+            priv.spark_arrow = True
+            query = 'SELECT educ, COUNT(*) AS n, AVG(income) AS income FROM PUMS.PUMS GROUP BY educ ORDER BY n DESC'
+            res = priv.execute(query)
+            assert(hasattr(res, 'mapInPandas'))
+            res = test_databases.to_tuples(res)
+            assert(list(res[0]) == ['educ', 'n', 'income'])
+            assert(len(res) > 1)
+            counts = [row[1] for row in res[1:]]
+            assert(counts == sorted(counts, reverse=True))
+    def test_having_limit(self, test_databases):
+        priv = test_databases.get_private_reader(
+            privacy=privacy,
+            database="PUMS_pid",
+            engine="spark"
+        )
+        if priv:
+            priv.spark_arrow = True
+            query = 'SELECT educ, COUNT(*) AS n FROM PUMS.PUMS GROUP BY educ HAVING n > 20 ORDER BY educ LIMIT 3'
+            res = test_databases.to_tuples(priv.execute(query))
+            assert(len(res) <= 4)
+            assert(all([row[1] > 20 for row in res[1:]]))
+    def test_no_postprocess(self, test_databases):
+        priv = test_databases.get_private_reader(
+            privacy=privacy,
+            database="PUMS_pid",
+            engine="spark"
+        )
+        if priv:
+            priv.spark_arrow = True
+            query = 'SELECT sex, COUNT(*) AS n FROM PUMS.PUMS GROUP BY sex'
+            res = test_databases.to_tuples(priv.execute(query, postprocess=False))
+            assert(list(res[0]) == ['keycount', 'sex', 'count_star'])
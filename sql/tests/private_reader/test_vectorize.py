@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from snsql.sql.parse import QueryParser
+from snsql.sql.vectorize import NotVectorizable, as_columns, compile_expression
+
+names = ['a', 'b', 'n', 's']
+rng = np.random.default_rng(0)
+values = [
+    rng.normal(50, 30, 40),
+    np.round(rng.normal(0, 2, 40)),
+    np.array([int(v) for v in rng.integers(-5, 20, 40)], dtype=object),
+    np.array([str(v) for v in rng.integers(0, 3, 40)], dtype=object),
+]
+
+expressions = [
+    "a / b",
+    "a / n + b * 2 - 1",
+    "n % 7",
+    "ABS(a) + SQRT(ABS(b)) + LOG(ABS(a) + 1)",
+    "POWER(b, 2)",
+    "ROUND(a, 2)",
+    "TRUNCATE(a, 1)",
+    "TRUNCATE(n, 0)",
+    "CASE WHEN a > 60 THEN 'high' WHEN a > 30 THEN 'mid' ELSE 'low' END",
+    "CASE WHEN a > 60 THEN a END",
+    "CASE s WHEN '1' THEN a ELSE b END",
+    "IIF(s = '2', a, 0)",
+    "COALESCE(a, 0)",
+    "CAST(a AS INTEGER)",
+]
+
+conditions = [
+    "a > 40 AND NOT b < 0",
+    "n IN (1, 2, 3) OR n BETWEEN 10 AND 15",
+    "s = '1' OR s IS NULL",
+    "NOT (a < b OR b > 1)",
+]
+
+def _rows(expr):
+    row_values = [list(v) for v in values]
+    return [
+        expr.evaluate(dict((name, col[i]) for name, col in zip(names, row_values)))
+        for i in range(len(values[0]))
+    ]
+
+def _check(expr):
+    columns = as_columns(names, values)
+    vectorized = compile_expression(expr)(columns, len(values[0])).tolist()
+    expected = _rows(expr)
+    assert(len(vectorized) == len(expected))
+    for v, e in zip(vectorized, expected):
+        if isinstance(e, float):
+            assert(v == pytest.approx(e))
+        else:
+            assert(v == e)
+
+class TestVectorize:
+    def test_matches_evaluate(self):
+        for text in expressions:
+            _check(QueryParser().query(f"SELECT {text} AS x FROM t").select.namedExpressions[0].expression)
+    def test_conditions_match_evaluate(self):
+        for text in conditions:
+            _check(QueryParser().query(f"SELECT a FROM t WHERE {text}").where.condition)
+    def test_not_vectorizable(self):
+        expr = QueryParser().query("SELECT UPPER(s) AS x FROM t").select.namedExpressions[0].expression
+        with pytest.raises(NotVectorizable):
+            compile_expression(expr)
+        expr = QueryParser().query("SELECT s + 1 AS x FROM t").select.namedExpressions[0].expression
+        with pytest.raises(NotVectorizable):
+            compile_expression(expr)(as_columns(names, values), len(values[0]))
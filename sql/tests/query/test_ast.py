@@ -43,6 +43,16 @@ class TestAst:
         with pytest.raises(ValueError) as err:
             QueryParser().parse_only("SELECT [FOO.BAR] FROM HR;")
         err.match("^Lexer error")
+    def test_diagnostics_match(self):
+        for goodpath in good_files:
+            batch = open(goodpath).read()
+            fast = [str(q) for q in QueryParser().queries(batch)]
+            slow = [str(q) for q in QueryParser(diagnostics=True).queries(batch)]
+            assert(fast == slow)
+    def test_diagnostics_bad_token(self):
+        with pytest.raises(ValueError) as err:
+            QueryParser(diagnostics=True).parse_only("SELECT * FROM FOO WHENCE ZIP ZAG")
+        err.match("^Bad token")
     def test_all_good_queries(self):
         for goodpath in good_files:
             gqt = GoodQueryTester(goodpath)
@@ -0,0 +1,24 @@
+import subprocess
+import sys
+
+def _loaded(stmt, modules):
+    # a fresh interpreter, so modules loaded by other tests don't count
+    code = f"{stmt}\nimport sys\nprint(' '.join([m for m in {modules!r} if m in sys.modules]))"
+    res = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return res.stdout.split()
+
+class TestLazyImports:
+    def test_import_snsql(self):
+        assert(_loaded("import snsql", ["numpy", "pandas", "antlr4", "opendp", "snsql.sql.private_reader"]) == [])
+    def test_private_reader(self):
+        loaded = _loaded("from snsql import from_connection, Privacy", ["pandas", "antlr4", "opendp", "snsql.sql.reader.spark"])
+        assert(loaded == [])
+    def test_first_use(self):
+        stmt = "\n".join([
+            "from snsql import from_df, Privacy",
+            "import pandas as pd",
+            "from snsql.sql.reader import PandasReader",
+            "import snsql",
+            "assert snsql.from_df is from_df",
+        ])
+        assert(_loaded(stmt, ["pandas", "snsql.sql.reader.pandas", "snsql.sql.private_reader"]) == ["pandas", "snsql.sql.reader.pandas", "snsql.sql.private_reader"])
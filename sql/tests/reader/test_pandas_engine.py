@@ -0,0 +1,157 @@
+import os
+import pytest
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+from snsql import *
+from snsql.metadata import Metadata
+from snsql.sql.parse import QueryParser
+from snsql.sql.reader.pandas import PandasReader
+from snsql.sql.reader.pandas_engine import DataFrameEngine, UnsupportedQuery
+
+git_root_dir = subprocess.check_output("git rev-parse --show-toplevel".split(" ")).decode("utf-8").strip()
+meta_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS_pid.yaml"))
+csv_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS_pid.csv"))
+
+schema = Metadata.from_file(meta_path)
+df = pd.read_csv(csv_path)
+df.loc[::7, 'income'] = np.nan
+privacy = Privacy(epsilon=1.0, delta=0.01)
+
+queries = [
+    "SELECT COUNT(*) AS n, SUM(income) AS s FROM PUMS.PUMS",
+    "SELECT sex, COUNT(*) AS n, SUM(age) AS a, AVG(income) AS i, MIN(age) AS lo, MAX(age) AS hi FROM PUMS.PUMS GROUP BY sex",
+    "SELECT sex, educ, COUNT(DISTINCT age) AS n FROM PUMS.PUMS WHERE age > 30 AND NOT married = 1 GROUP BY sex, educ",
+    "SELECT age / 7 AS a, age % 7 AS b, income / 3.0 AS c, CASE WHEN age < 30 THEN 'y' WHEN age < 60 THEN 'm' ELSE 'o' END AS d FROM PUMS.PUMS",
+    "SELECT COUNT(*) AS n FROM PUMS.PUMS WHERE income IS NULL OR age BETWEEN 20 AND 25",
+    "SELECT COUNT(*) AS n FROM PUMS.PUMS WHERE educ IN (9, 10, 11) AND income > 1000",
+    "SELECT COALESCE(income, -1) AS x FROM PUMS.PUMS",
+    "SELECT educ, SUM(income) AS s FROM PUMS.PUMS GROUP BY educ HAVING COUNT(*) > 20",
+    "SELECT SUM(income) AS s, COUNT(*) AS n FROM PUMS.PUMS WHERE age > 1000",
+]
+
+def _normalize(rows):
+    # SQLite results come back with NaN for NULL in float columns
+    return [
+        tuple([None if isinstance(v, float) and np.isnan(v) else round(v, 6) if isinstance(v, float) else v for v in row])
+        for row in rows
+    ]
+
+def _execute(reader, query, native):
+    reader.native = native
+    try:
+        return reader._execute_ast(QueryParser(schema).query(query))
+    finally:
+        reader.native = True
+
+class TestPandasEngine:
+    def test_matches_sql(self):
+        reader = PandasReader(df, schema)
+        engine = DataFrameEngine(reader.df, list(reader.metadata.m_tables.keys()))
+        for query in queries:
+            native = engine.execute(QueryParser(schema).query(query))
+            sql = _execute(reader, query, False)
+            assert(native[0] == sql[0])
+            assert(_normalize(native[1:]) == _normalize(sql[1:]))
+    def test_null_aggregates(self):
+        engine = DataFrameEngine(df, ["PUMS.PUMS"])
+        res = engine.execute(QueryParser(schema).query("SELECT SUM(income) AS s, COUNT(*) AS n FROM PUMS.PUMS WHERE age > 1000"))
+        assert(res[1] == (None, 0))
+    def test_per_key_sample(self):
+        reader = from_df(df, privacy=privacy, metadata=meta_path)
+        subquery, _ = reader._rewrite("SELECT COUNT(*) AS n FROM PUMS.PUMS")
+        per_key = subquery.source.relations[0].primary.query
+        engine = DataFrameEngine(reader.reader.df, ["PUMS.PUMS"])
+        res = engine.execute(per_key)
+        row_num = res[0].index('row_num')
+        assert(all([row[row_num] == 1 for row in res[1:]]))
+        assert(len(res) == len(df) + 1)
+    def test_row_number(self):
+        dup = pd.concat([df, df, df])
+        engine = DataFrameEngine(dup, ["PUMS.PUMS"])
+        query = QueryParser(schema).query("SELECT pid, ROW_NUMBER() OVER (PARTITION BY pid ORDER BY RANDOM()) AS row_num FROM PUMS.PUMS")
+        res = engine.execute(query)
+        counts = {}
+        for pid, row_num in res[1:]:
+            counts.setdefault(pid, []).append(row_num)
+        assert(all([sorted(v) == [1, 2, 3] for v in counts.values()]))
+    def test_fallback(self):
+        engine = DataFrameEngine(df, ["PUMS.PUMS"])
+        query = "SELECT UPPER(sex) AS s FROM PUMS.PUMS"
+        with pytest.raises(UnsupportedQuery):
+            engine.execute(QueryParser(schema).query(query))
+        reader = PandasReader(df, schema)
+        res = reader._execute_ast(QueryParser(schema).query(query))
+        assert(len(res) == len(df) + 1)
+    def test_text_and_numbers(self):
+        engine = DataFrameEngine(df, ["PUMS.PUMS"])
+        reader = PandasReader(df, schema)
+        for op in ["=", "<>"]:
+            for cond in [f"sex {op} '1'", f"'1' {op} sex"]:
+                query = f"SELECT COUNT(*) AS n FROM PUMS.PUMS WHERE {cond}"
+                with pytest.raises(UnsupportedQuery):
+                    engine.execute(QueryParser(schema).query(query))
+                assert(_execute(reader, query, True) == _execute(reader, query, False))
+        assert(_execute(reader, "SELECT COUNT(*) AS n FROM PUMS.PUMS WHERE sex = '1'", True)[1][0] == (df.sex == 1).sum())
+    def test_private_reader(self):
+        reader = from_df(df, privacy=privacy, metadata=meta_path)
+        res = reader.execute("SELECT sex, AVG(age) AS age FROM PUMS.PUMS GROUP BY sex")
+        assert(len(res) == 3)
+
+class TestSqliteConnection:
+    def test_connection_reused(self):
+        reader = PandasReader(df.copy(), schema)
+        reader.execute("SELECT COUNT(*) AS n FROM PUMS.PUMS")
+        conn = reader._conn
+        version = reader._loaded_version
+        reader.execute("SELECT AVG(age) AS age FROM PUMS.PUMS")
+        assert(reader._conn is conn)
+        assert(reader._loaded_version == version)
+    def test_reload_on_change(self):
+        reader = PandasReader(df.copy(), schema)
+        n = reader.execute("SELECT COUNT(*) AS n FROM PUMS.PUMS")[1][0]
+        reader.df = pd.concat([reader.df, reader.df])
+        assert(reader.execute("SELECT COUNT(*) AS n FROM PUMS.PUMS")[1][0] == 2 * n)
+        reader.df.loc[:, 'age'] = 0
+        reader.reload()
+        assert(reader.execute("SELECT SUM(age) AS age FROM PUMS.PUMS")[1][0] == 0)
+    def test_edit_in_place(self):
+        reader = PandasReader(df.copy(), schema)
+        query = "SELECT SUM(age) AS age FROM PUMS.PUMS"
+        total = reader.execute(query)[1][0]
+        conn = reader._conn
+        reader.df.loc[reader.df.index[0], 'age'] += 1000
+        assert(reader.execute(query)[1][0] == total + 1000)
+        assert(reader._execute_ast(QueryParser(schema).query(query))[1][0] == total + 1000)
+        assert(reader._conn is conn)
+
+class TestNoMutation:
+    def test_df_unchanged(self):
+        pums = pd.read_csv(csv_path)
+        columns = list(pums.columns)
+        reader = PandasReader(pums, schema)
+        reader.execute("SELECT COUNT(*) AS n FROM PUMS.PUMS")
+        reader._execute_ast(QueryParser(schema).query("SELECT AVG(age) AS age FROM PUMS.PUMS"))
+        assert(list(pums.columns) == columns)
+    def test_sanitized_names(self):
+        pums = pd.read_csv(csv_path).rename(columns={'age': 'age (years)'})
+        meta = Metadata.from_file(meta_path)
+        table = meta['PUMS.PUMS']
+        age = table.m_columns.pop('age')
+        age.name = 'age (years)'
+        table.m_columns['age (years)'] = age
+        reader = PandasReader(pums, meta)
+        assert(list(pums.columns) == list(pd.read_csv(csv_path).rename(columns={'age': 'age (years)'}).columns))
+        sql = reader.execute("SELECT SUM(age__0_years_1_) AS age FROM PUMS.PUMS")
+        native = reader._execute_ast(QueryParser(reader.metadata).query("SELECT SUM(age__0_years_1_) AS age FROM PUMS.PUMS"))
+        assert(sql[1][0] == native[1][0] == pums['age (years)'].sum())
+    def test_row_number_key(self):
+        pums = pd.read_csv(csv_path).drop(columns=['pid'])
+        meta = Metadata.from_file(os.path.join(git_root_dir, os.path.join("datasets", "PUMS.yaml")))
+        reader = PandasReader(pums, meta)
+        assert('primary_key' not in pums.columns)
+        sql = reader.execute("SELECT COUNT(DISTINCT primary_key) AS n, MAX(primary_key) AS m FROM PUMS.PUMS")
+        native = reader._execute_ast(QueryParser(reader.metadata).query("SELECT COUNT(DISTINCT primary_key) AS n, MAX(primary_key) AS m FROM PUMS.PUMS"))
+        assert(sql[1] == native[1] == (len(pums), len(pums) - 1))
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from snsql import *
+from snsql.sql.private_reader import PrivateReader
+from snsql.sql.reader.pool import ConnectionPool, PooledReader
+
+git_root_dir = subprocess.check_output("git rev-parse --show-toplevel".split(" ")).decode("utf-8").strip()
+
+meta_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS.yaml"))
+csv_path = os.path.join(git_root_dir, os.path.join("datasets", "PUMS.csv"))
+
+df = pd.read_csv(csv_path)
+privacy = Privacy(epsilon=1.0, delta=0.01)
+
+@pytest.fixture
+def connect(tmp_path):
+    # SQLite stands in for a database server; each connection sees PUMS.PUMS
+    path = str(tmp_path / "pums.db")
+    with sqlite3.connect(path) as conn:
+        df.to_sql("PUMS", conn, index=False)
+    opened = []
+    def connect():
+        conn = sqlite3.connect(":memory:", check_same_thread=False)
+        conn.execute(f"ATTACH DATABASE '{path}' AS PUMS")
+        opened.append(conn)
+        return conn
+    connect.opened = opened
+    return connect
+
+class TestConnectionPool:
+    def test_bounded(self, connect):
+        pool = ConnectionPool(connect, size=2)
+        a = pool.acquire()
+        b = pool.acquire()
+        assert(a is not b)
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.01)
+        pool.release(a)
+        assert(pool.acquire(timeout=0.01) is a)
+        assert(len(connect.opened) == 2)
+    def test_waits_for_release(self, connect):
+        pool = ConnectionPool(connect, size=1)
+        conn = pool.acquire()
+        got = []
+        t = threading.Thread(target=lambda: got.append(pool.acquire()))
+        t.start()
+        time.sleep(0.05)
+        assert(got == [])
+        pool.release(conn)
+        t.join(1)
+        assert(got == [conn])
+    def test_batches_release(self, connect):
+        pool = ConnectionPool(connect, size=1)
+        reader = PooledReader(pool, "postgres")
+        _, batches = reader.execute_batches("SELECT age FROM PUMS.PUMS", 100)
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.01)
+        assert(sum(len(b) for b in batches) == len(df))
+        pool.release(pool.acquire(timeout=0.01))
+        _, batches = reader.execute_batches("SELECT age FROM PUMS.PUMS", 100)
+        batches.close()
+        pool.release(pool.acquire(timeout=0.01))
+
+class TestPooledPrivateReader:
+    def test_execute(self, connect):
+        reader = PrivateReader.from_pool(connect, privacy=privacy, metadata=meta_path, engine="postgres", size=2)
+        res = reader.execute("SELECT sex, COUNT(*) AS n FROM PUMS.PUMS GROUP BY sex")
+        assert(res[0] == ['sex', 'n'])
+        assert(len(res) == 3)
+    def test_execute_async(self, connect):
+        reader = PrivateReader.from_pool(connect, privacy=privacy, metadata=meta_path, engine="postgres", size=3)
+        queries = [
+            "SELECT COUNT(*) AS n FROM PUMS.PUMS",
+            "SELECT sex, AVG(age) AS age FROM PUMS.PUMS GROUP BY sex",
+            "SELECT educ, SUM(income) AS income FROM PUMS.PUMS GROUP BY educ",
+        ] * 4
+        async def run():
+            return await asyncio.gather(*[reader.execute_async(q) for q in queries])
+        results = asyncio.run(run())
+        assert(len(results) == len(queries))
+        assert(all([r[0] == ['n'] for r in results[::3]]))
+        assert(len(connect.opened) <= 3)
+        assert(reader.odometer.spent == reader.get_privacy_cost(queries))
+    def test_options_snapshot(self, connect):
+        reader = PrivateReader.from_pool(connect, privacy=privacy, metadata=meta_path, engine="postgres", size=2)
+        query = "SELECT sex, COUNT(*) AS n FROM PUMS.PUMS GROUP BY sex"
+        subquery, outer, options = reader._rewrite_with_options(query)
+        assert(options is not reader._options)
+        # another query refreshes the shared options before this one runs
+        reader._options.max_contrib = 7
+        reader._options.censor_dims = False
+        res = reader._execute_rewritten(subquery, outer, options=options, postprocess=False)
+        assert(reader.tau is not None and all([row[0] > reader.tau for row in res]))
@@ -0,0 +1,82 @@
+import copy
+import pickle
+from os import listdir
+from os.path import isfile, join, dirname
+
+from snsql._ast.ast import Column, Query, Select, Table, NamedExpression, AggFunction, BooleanCompare
+from snsql._ast.tokens import Sql, Identifier, Literal, FuncName
+from snsql.sql.parse import QueryParser
+from snsql.xpath.parse import XPath
+
+testpath = join(dirname(dirname(__file__)), "query", "queries")
+corpus = []
+for d in listdir(testpath):
+    if isfile(join(testpath, d)):
+        continue
+    for f in listdir(join(testpath, d)):
+        if "_fail" not in f:
+            corpus.extend(QueryParser().queries(open(join(testpath, d, f)).read()))
+corpus = [str(q) for q in corpus]
+
+types = [Sql, Query, Select, Table, Column, NamedExpression, AggFunction, BooleanCompare, Literal, Identifier]
+paths = [
+    '//Column',
+    '//AggFunction',
+    '//Table',
+    '//NamedExpression[@name]',
+    "//Column[@name='age']",
+    '//Query',
+    '//Select//Column',
+    '//Column[1]',
+    '/Select/NamedExpression',
+]
+
+def _walked(query_string):
+    return QueryParser().query(query_string)
+
+def _indexed(query_string):
+    return QueryParser(index_nodes=True).query(query_string)
+
+def _names(nodes):
+    return [(type(n).__name__, str(n)) for n in nodes]
+
+class TestNodeIndex:
+    def test_find_nodes(self):
+        assert(len(corpus) > 50)
+        for query_string in corpus:
+            walked, indexed = _walked(query_string), _indexed(query_string)
+            assert(indexed._index() is not None)
+            for t in types:
+                assert(_names(walked.find_nodes(t)) == _names(indexed.find_nodes(t)))
+                for w, i in zip(walked.find_nodes(Sql), indexed.find_nodes(Sql)):
+                    assert(_names(w.find_nodes(t)) == _names(i.find_nodes(t)))
+                    assert(str(w.find_node(t)) == str(i.find_node(t)))
+    def test_xpath(self):
+        for query_string in corpus:
+            walked, indexed = _walked(query_string), _indexed(query_string)
+            for path in paths:
+                assert(_names(walked.xpath(path)) == _names(indexed.xpath(path)))
+                assert(_names(walked.select.xpath(path)) == _names(indexed.select.xpath(path)))
+    def test_copies_not_indexed(self):
+        q = _indexed("SELECT a, SUM(b) FROM t GROUP BY a")
+        assert(copy.deepcopy(q)._index() is None)
+        assert(pickle.loads(pickle.dumps(q))._index() is None)
+        assert(len(copy.deepcopy(q).find_nodes(Column)) == 3)
+    def test_drop_index(self):
+        q = _indexed("SELECT a, b FROM t")
+        q.drop_index()
+        assert(q._index() is None)
+        q.select.namedExpressions[0].expression = AggFunction(FuncName("SUM"), None, Column("c"))
+        assert(_names(q.find_nodes(Column)) == [("Column", "c"), ("Column", "b")])
+        assert(len(q.xpath('//AggFunction')) == 1)
+    def test_attributes(self):
+        walked, indexed = _walked("SELECT a FROM t"), _indexed("SELECT a FROM t")
+        names = [a.name for a in indexed.xpath("//Query/@*")]
+        assert(names == [a.name for a in walked.xpath("//Query/@*")])
+        assert('_node_index' not in names)
+
+class TestXPathCache:
+    def test_same_statement(self):
+        p = XPath()
+        assert(p.parse("//Column[@name='age']") is XPath().parse("//Column[@name='age']"))
+        assert(p.parse("//Column") is not p.parse("//Table"))